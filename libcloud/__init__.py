@@ -19,24 +19,66 @@ libcloud provides a unified interface to the cloud computing resources.
 @var __version__: Current version of libcloud
 """
 
-__all__ = ["__version__", "enable_debug"]
+__all__ = ["__version__", "enable_debug", "enable_profiling"]
 
 __version__ = "0.5.0-dev"
 
-def enable_debug(fo):
+def enable_debug(fo, max_body_size=None, sample_rate=1.0):
     """
     Enable library wide debugging to a file-like object.
 
+    Requests are logged as JSON lines by a background thread.
+
     @param fo: Where to append debugging information
     @type fo: File like object, only write operations are used.
+
+    @param max_body_size: Number of bytes of each body which are logged
+    @type max_body_size: C{int}
+
+    @param sample_rate: Fraction of the requests which are logged
+    @type sample_rate: C{float}
     """
     from libcloud.base import (ConnectionKey,
+                               LoggingConnection,
                                LoggingHTTPConnection,
                                LoggingHTTPSConnection)
-    LoggingHTTPSConnection.log = fo
-    LoggingHTTPConnection.log = fo
+    from libcloud.common.debug import DebugLogger, MAX_BODY_SIZE
+    LoggingConnection.logger = DebugLogger(fo,
+                                           max_body_size=max_body_size or
+                                                         MAX_BODY_SIZE,
+                                           sample_rate=sample_rate)
     ConnectionKey.conn_classes = (LoggingHTTPConnection, LoggingHTTPSConnection)
 
+def enable_profiling(fo=None):
+    """
+    Enable profiling of the public driver methods.
+
+    @param fo: Where the report is written at exit, if given
+    @type fo: File like object, only write operations are used.
+
+    @return: A L{libcloud.common.profiling.Profiler}, its C{report} method
+             returns the stats collected so far.
+    """
+    from libcloud.common import profiling
+    return profiling.enable(fo)
+
+def _getenv_float(name, default):
+    """
+    Return the value of the environment variable C{name} as a float, or
+    C{default} if it isn't set or (with a warning) isn't a number.
+    """
+    import os
+    import warnings
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        warnings.warn("Invalid %s value %r, using %s" %
+                      (name, value, default))
+        return default
+
 def _init_once():
     """
     Utility function that is ran once on Library import.
@@ -45,7 +87,16 @@ def _init_once():
     is where we will log debug information about the provider transports.
 
     If LIBCLOUD_DEBUG is not a path, C{/tmp/libcloud_debug.log} is used by
-    default.
+    default. LIBCLOUD_DEBUG_SAMPLE_RATE can be set to only log a fraction of
+    the requests.
+
+    LIBCLOUD_PROFILE works the same way and enables the profiling of the
+    driver methods, the report is written to C{/tmp/libcloud_profile.log} at
+    exit by default.
+
+    LIBCLOUD_XML_PARSER selects the XML parser backend (see
+    L{libcloud.common.xmlparser}) and LIBCLOUD_JSON_CODEC the JSON one (see
+    L{libcloud.common.jsoncodec}).
     """
     import os
     d = os.getenv("LIBCLOUD_DEBUG")
@@ -53,6 +104,33 @@ def _init_once():
         if d.isdigit():
             d = "/tmp/libcloud_debug.log"
         fo = open(d, "a")
-        enable_debug(fo)
+        enable_debug(fo, sample_rate=_getenv_float(
+            "LIBCLOUD_DEBUG_SAMPLE_RATE", 1.0))
+
+    p = os.getenv("LIBCLOUD_PROFILE")
+    if p:
+        if p.isdigit():
+            p = "/tmp/libcloud_profile.log"
+        enable_profiling(open(p, "a"))
+
+    x = os.getenv("LIBCLOUD_XML_PARSER")
+    if x:
+        from libcloud.common import xmlparser
+        try:
+            xmlparser.set_backend(x)
+        except (ValueError, ImportError), e:
+            import warnings
+            warnings.warn("Can't use the %r XML parser, keeping the "
+                          "default one: %s" % (x, e))
+
+    j = os.getenv("LIBCLOUD_JSON_CODEC")
+    if j:
+        from libcloud.common import jsoncodec
+        try:
+            jsoncodec.set_backend(j)
+        except (ValueError, ImportError), e:
+            import warnings
+            warnings.warn("Can't use the %r JSON codec, keeping the "
+                          "default one: %s" % (j, e))
 
 _init_once()
@@ -0,0 +1,121 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+API call accounting.
+
+Records the tree of driver calls and requests made under each top level
+driver call, to find the methods which hide extra round trips:
+
+    from libcloud.common.accounting import Tracker
+
+    with Tracker() as tracker:
+        driver.get_object('container', 'object')
+    print tracker.format()
+
+which prints something like:
+
+    get_object: 2 requests
+      get_container: 1 request
+        GET /container 204
+      HEAD /container/object 200
+
+On Python 2.5 use L{Tracker.start} and L{Tracker.stop} instead.
+"""
+
+from libcloud.common import hooks
+
+__all__ = [
+    "Tracker"
+    ]
+
+class Tracker(object):
+    """
+    Collects the top level driver calls (L{hooks.Call}) made while it is
+    started.
+
+    @ivar requests: Records of the requests made outside of any driver
+                    call, e.g. by a method bound before the tracker was
+                    started.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.requests = []
+
+    def start(self):
+        hooks.add_call_listener(self._on_call)
+        hooks.add_listener(self._on_request)
+        return self
+
+    def stop(self):
+        hooks.remove_listener(self._on_request)
+        hooks.remove_call_listener(self._on_call)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def count_requests(self, method=None):
+        """
+        Return the number of requests made by the top level calls of
+        C{method}, including the nested calls. By default all the requests
+        are counted, including the ones made outside of driver calls.
+        """
+        count = len([record for call in self.calls
+                     if method is None or call.method == method
+                     for record in call.iter_requests()])
+        if method is None:
+            count += len(self.requests)
+        return count
+
+    def format(self):
+        """
+        Return the call trees as text.
+        """
+        lines = []
+        _format_items(self.calls, self.requests, 0, lines)
+        return '\n'.join(lines)
+
+    def _on_call(self, call):
+        if call.parent is None:
+            self.calls.append(call)
+
+    def _on_request(self, record):
+        if hooks.get_current_call() is None:
+            self.requests.append(record)
+
+def _format_items(calls, requests, depth, lines):
+    # Requests and calls in the order they were made
+    items = [(record.start, record) for record in requests]
+    items.extend([(call.start, call) for call in calls])
+    items.sort(key=lambda item: item[0])
+
+    for start, item in items:
+        if isinstance(item, hooks.Call):
+            count = len(list(item.iter_requests()))
+            lines.append('%s%s: %d %s' % ('  ' * depth, item.method, count,
+                                          count == 1 and 'request' or
+                                          'requests'))
+            _format_items(item.children, item.requests, depth + 1, lines)
+        else:
+            line = '%s%s %s %s' % ('  ' * depth, item.method, item.action,
+                                   item.status)
+            if not item.operation.startswith(item.method):
+                # Name of the call for APIs with a single endpoint
+                line += ' (%s)' % (item.operation)
+            lines.append(line)
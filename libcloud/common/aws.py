@@ -13,8 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from xml.etree import ElementTree as ET
-
+from libcloud.common import xmlparser
 from libcloud.common.base import Response
 from libcloud.common.types import MalformedResponseError
 
@@ -23,7 +22,7 @@ class AWSBaseResponse(Response):
         if not self.body:
             return None
         try:
-          body = ET.XML(self.body)
+          body = xmlparser.fromstring(self.body)
         except:
           raise MalformedResponseError("Failed to parse XML", body=self.body,
                                        driver=self.driver)
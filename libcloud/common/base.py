@@ -13,19 +13,53 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import errno
 import httplib
+import re
 import urllib
-import StringIO
+import socket
 import ssl
-
-from pipes import quote as pquote
+import threading
+import time
+import zlib
 
 import libcloud
 
+from libcloud.common import concurrency
+from libcloud.common import hooks
+from libcloud.common import jsoncodec
+from libcloud.common import pool
+from libcloud.common import resolver
+from libcloud.common import xmlparser
+from libcloud.common.debug import LoggedResponse
 from libcloud.httplib_ssl import LibcloudHTTPSConnection
-from httplib import HTTPConnection as LibcloudHTTPConnection
+
+# Socket errors raised when sending a request over a keep-alive connection
+# the server has closed
+STALE_CONNECTION_ERRNOS = (errno.ECONNRESET, errno.EPIPE)
+
+# Path segments which look like ids (numbers, UUIDs, hashes)
+ID_SEGMENT_RE = re.compile(r'^([0-9]+|[0-9a-fA-F-]{8,})$')
+
+class LibcloudHTTPConnection(httplib.HTTPConnection):
+    """
+    HTTPConnection which resolves host names through the shared resolver
+    cache and races the resolved addresses.
+
+    @cvar record: L{RequestRecord} the connection timings are added to.
+    """
+    record = None
+
+    def connect(self):
+        self.sock = resolver.create_connection(
+            (self.host, self.port), self.timeout,
+            getattr(self, 'source_address', None), record=self.record)
+
+        if getattr(self, '_tunnel_host', None):
+            self._tunnel()
 
 class RawResponse(object):
+    record = None
 
     def __init__(self, response=None):
         self._status = None
@@ -37,9 +71,37 @@ class RawResponse(object):
     @property
     def response(self):
         if not self._response:
-            self._response = self.connection.connection.getresponse()
+            try:
+                self._response = self.connection.connection.getresponse()
+            except Exception, e:
+                self._finish_record(error=e)
+                raise
+            if self.record is not None:
+                self.record.status = self._response.status
+            self._finish_record()
         return self._response
 
+    def read(self, amt=None):
+        """
+        Read up to C{amt} bytes of the body (all of it if C{amt} is None).
+        """
+        if amt is None:
+            return self.response.read()
+        return self.response.read(amt)
+
+    def close(self):
+        """
+        Close the connection, e.g. to give up on an upload.
+        """
+        self._finish_record()
+        self.connection.connection.close()
+
+    def _finish_record(self, error=None):
+        # The request is reported once, however the response is consumed
+        record, self.record = self.record, None
+        if record is not None:
+            record.finish(error=error)
+
     @property
     def status(self):
         if not self._status:
@@ -58,6 +120,127 @@ class RawResponse(object):
             self._reason = self.response.reason
         return self._reason
 
+class TransferStats(object):
+    """
+    Number of response body bytes received on the wire and after decoding.
+
+    Every connection exposes its counters as C{transfer_stats}; they are
+    updated for all the non-raw responses while C{allow_compression} is on.
+    """
+
+    def __init__(self):
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        self._lock = threading.Lock()
+
+    def add(self, wire_bytes, decoded_bytes):
+        self._lock.acquire()
+        try:
+            self.wire_bytes += wire_bytes
+            self.decoded_bytes += decoded_bytes
+        finally:
+            self._lock.release()
+
+class DecodingResponse(object):
+    """
+    Wraps an httplib response and decodes a gzip or deflate encoded body
+    chunk by chunk while it is read.
+
+    Everything except read() is delegated to the wrapped response.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, response, stats=None):
+        """
+        @type response: C{httplib.HTTPResponse}
+        @param response: Response to wrap.
+
+        @type stats: L{TransferStats}
+        @param stats: Optional counters updated with the wire and decoded
+                      size of the body.
+        """
+        self._response = response
+        self._stats = stats
+        self._buffer = ''
+        self.wire_bytes = 0
+
+        headers = dict([(key.lower(), value)
+                        for key, value in response.getheaders()])
+        encoding = headers.get('content-encoding', '').strip().lower()
+
+        if encoding in ('gzip', 'x-gzip'):
+            self._decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            self._decoder = zlib.decompressobj()
+        else:
+            self._decoder = None
+        self._detect_raw_deflate = encoding == 'deflate'
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+    def read(self, amt=None):
+        """
+        Read and decode up to C{amt} bytes of the body (all of it if C{amt}
+        is None).
+        """
+        if amt is None:
+            chunks = [self._buffer]
+            self._buffer = ''
+            while True:
+                data = self._read_chunk()
+                if data is None:
+                    break
+                chunks.append(data)
+            return ''.join(chunks)
+
+        while len(self._buffer) < amt:
+            data = self._read_chunk()
+            if data is None:
+                break
+            self._buffer += data
+
+        data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    def _read_chunk(self):
+        """
+        Return the next decoded chunk or C{None} once the body is exhausted.
+        """
+        data = self._response.read(self.chunk_size)
+        if not data:
+            if self._decoder is None:
+                return None
+            decoded, self._decoder = self._decoder.flush(), None
+            self._update_stats(0, len(decoded))
+            return decoded or None
+
+        if self._decoder is None:
+            decoded = data
+        else:
+            decoded = self._decode(data)
+
+        self._update_stats(len(data), len(decoded))
+        return decoded
+
+    def _decode(self, data):
+        if not self._detect_raw_deflate:
+            return self._decoder.decompress(data)
+
+        self._detect_raw_deflate = False
+        try:
+            return self._decoder.decompress(data)
+        except zlib.error:
+            # Some servers send a raw deflate stream without the zlib header
+            self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self._decoder.decompress(data)
+
+    def _update_stats(self, wire_bytes, decoded_bytes):
+        self.wire_bytes += wire_bytes
+        if self._stats is not None:
+            self._stats.add(wire_bytes, decoded_bytes)
+
 class Response(object):
     """
     A Base Response class to derive from.
@@ -113,135 +296,320 @@ class Response(object):
         """
         return self.status == httplib.OK or self.status == httplib.CREATED
 
-#TODO: Move this to a better location/package
-class LoggingConnection():
+    def close(self):
+        """
+        Nothing to release, the body has been read and the connection
+        returned to the pool when the response was created.
+        """
+        pass
+
+class StreamingResponse(Response):
     """
-    Debug class to log all HTTP(s) requests as they could be made
-    with the C{curl} command.
+    A response whose body is read from the socket as it is consumed instead
+    of being loaded in memory first.
 
-    @cvar log: file-like object that logs entries are written to.
+    C{body} and C{object} are not set, the body is read with L{read},
+    L{iter_lines}, L{iterparse} or L{iter_json_array}. Once it has been fully read the
+    connection goes back to the pool; call L{close} to give up on the rest
+    of the body.
     """
-    log = None
-
-    def _log_response(self, r):
-        rv = "# -------- begin %d:%d response ----------\n" % (id(self), id(r))
-        ht = ""
-        v = r.version
-        if r.version == 10:
-            v = "HTTP/1.0"
-        if r.version == 11:
-            v = "HTTP/1.1"
-        ht += "%s %s %s\r\n" % (v, r.status, r.reason)
-        body = r.read()
-        for h in r.getheaders():
-            ht += "%s: %s\r\n" % (h[0].title(), h[1])
-        ht += "\r\n"
-        # this is evil. laugh with me. ha arharhrhahahaha
-        class fakesock:
-            def __init__(self, s):
-                self.s = s
-            def makefile(self, mode, foo):
-                return StringIO.StringIO(self.s)
-        rr = r
-        if r.chunked:
-            ht += "%x\r\n" % (len(body))
-            ht += body
-            ht += "\r\n0\r\n"
-        else:
-            ht += body
-        rr = httplib.HTTPResponse(fakesock(ht),
-                                  method=r._method,
-                                  debuglevel=r.debuglevel)
-        rr.begin()
-        rv += ht
-        rv += ("\n# -------- end %d:%d response ----------\n"
-               % (id(self), id(r)))
-        return (rr, rv)
+    chunk_size = 64 * 1024
+
+    def __init__(self, response, http_connection=None):
+        """
+        @type response: C{httplib.HTTPResponse}
+        @param response: Response to stream the body from.
+
+        @type http_connection: C{httplib.HTTPConnection}
+        @param http_connection: Connection the response is read from.
+        """
+        self.response = response
+        self.http_connection = http_connection
+        self.status = response.status
+        self.headers = dict(response.getheaders())
+        self.error = response.reason
+        self.bytes_read = 0
+        self._closed = False
 
-    def _log_curl(self, method, url, body, headers):
-        cmd = ["curl", "-i"]
+    def read(self, amt=None):
+        """
+        Read up to C{amt} bytes of the body (all of it if C{amt} is None).
+        """
+        data = self.response.read(amt)
+        self.bytes_read += len(data)
+        if amt is None or not data:
+            self.close()
+        return data
 
-        cmd.extend(["-X", pquote(method)])
+    def __iter__(self):
+        while True:
+            data = self.read(self.chunk_size)
+            if not data:
+                break
+            yield data
 
-        for h in headers:
-            cmd.extend(["-H", pquote("%s: %s" % (h, headers[h]))])
+    def iter_lines(self):
+        """
+        Yield the lines of the body, without their line endings.
+        """
+        # Start of the current line, split across chunks
+        parts = []
+        for data in self:
+            lines = data.split('\n')
+            if len(lines) == 1:
+                parts.append(data)
+                continue
+
+            parts.append(lines[0])
+            lines[0] = ''.join(parts)
+            parts = [lines.pop()]
+            for line in lines:
+                yield line.rstrip('\r')
+
+        pending = ''.join(parts)
+        if pending:
+            yield pending.rstrip('\r')
+
+    def iterparse(self, path, namespace=None):
+        """
+        Incrementally parse an XML body and yield the elements at C{path}.
 
-        # TODO: in python 2.6, body can be a file-like object.
-        if body is not None and len(body) > 0:
-            cmd.extend(["--data-binary", pquote(body)])
+        Every element is removed from the tree once the caller is done with
+        it, so memory use is bounded by the size of a single element.
 
-        cmd.extend([pquote("https://%s:%d%s" % (self.host, self.port, url))])
-        return " ".join(cmd)
+        @type path: C{str}
+        @param path: Path of the elements relative to the root element,
+                     e.g. C{"imagesSet/item"}.
 
-class LoggingHTTPSConnection(LoggingConnection, LibcloudHTTPSConnection):
+        @type namespace: C{str}
+        @param namespace: Namespace of the document (if any).
+        """
+        if namespace:
+            tags = ['{%s}%s' % (namespace, tag) for tag in path.split('/')]
+        else:
+            tags = path.split('/')
+
+        stack = []
+        current = []
+        for event, element in xmlparser.iterparse(self,
+                                                  events=('start', 'end')):
+            if event == 'start':
+                if stack:
+                    current.append(element.tag)
+                stack.append(element)
+                continue
+
+            stack.pop()
+            if current == tags:
+                yield element
+                if stack:
+                    stack[-1].remove(element)
+            if current:
+                current.pop()
+
+    def iter_json_array(self, key=None):
+        """
+        Incrementally decode a JSON body and yield the items of an array.
+
+        The rest of the body is read once the array ends, so the connection
+        can be reused. Breaking out of the loop closes the connection.
+
+        @type key: C{str}
+        @param key: Key of the array in the top level object. If None, the
+                    body must be an array.
+        """
+        try:
+            for item in jsoncodec.iter_array(self, key, self.chunk_size):
+                yield item
+            while self.read(self.chunk_size):
+                pass
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Release the connection, or close it if the body hasn't been fully
+        read.
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        if self.connection is not None and self.response.isclosed():
+            self.connection._release_connection(self.response,
+                                                self.http_connection)
+        elif self.http_connection is not None:
+            self.http_connection.close()
+
+class LoggingConnection():
     """
-    Utility Class for logging HTTPS connections
+    Debug mixin which logs all the HTTP(s) requests and their responses as
+    JSON lines (see L{libcloud.common.debug}).
+
+    Bodies are not buffered: the start of a response body is kept as the
+    caller reads it and the entry is logged once it has been fully read.
+    Streamed uploads only have their size logged.
+
+    @cvar logger: L{DebugLogger} the entries are written to.
     """
+    logger = None
+    protocol = None
+    connection_cls = None
 
-    def getresponse(self):
-        r = LibcloudHTTPSConnection.getresponse(self)
-        if self.log is not None:
-            r, rv = self._log_response(r)
-            self.log.write(rv + "\n")
-            self.log.flush()
-        return r
+    _entry = None
+    _in_request = False
 
     def request(self, method, url, body=None, headers=None):
+        headers = headers or {}
         headers.update({'X-LC-Request-ID': str(id(self))})
-        if self.log is not None:
-            pre = "# -------- begin %d request ----------\n"  % id(self)
-            self.log.write(pre +
-                           self._log_curl(method, url, body, headers) + "\n")
-            self.log.flush()
-        return LibcloudHTTPSConnection.request(self, method, url, body, headers)
+
+        self._in_request = True
+        try:
+            result = self.connection_cls.request(self, method, url, body,
+                                                 headers)
+        finally:
+            self._in_request = False
+
+        entry = self._entry
+        if entry is not None and isinstance(body, basestring):
+            entry['request_body'] = body[:self.logger.max_body_size]
+            entry['request_body_size'] = len(body)
+        return result
+
+    def putrequest(self, method, url, *args, **kwargs):
+        logger = self.logger
+        if logger is not None and logger.sample():
+            self._entry = {
+                'id': id(self),
+                'time': time.time(),
+                'method': method,
+                'url': '%s://%s:%d%s' % (self.protocol, self.host, self.port,
+                                         url),
+                'request_headers': {},
+                'request_body_size': 0
+            }
+        else:
+            self._entry = None
+        return self.connection_cls.putrequest(self, method, url, *args,
+                                              **kwargs)
+
+    def putheader(self, header, *values):
+        if self._entry is not None:
+            self._entry['request_headers'][header] = \
+                '\r\n\t'.join([str(v) for v in values])
+        return self.connection_cls.putheader(self, header, *values)
+
+    def send(self, data):
+        # Body of a streamed upload, sent after endheaders()
+        entry = self._entry
+        if (entry is not None and not self._in_request and
+            entry.get('streaming') and isinstance(data, basestring)):
+            entry['request_body_size'] += len(data)
+        return self.connection_cls.send(self, data)
+
+    def endheaders(self, *args, **kwargs):
+        result = self.connection_cls.endheaders(self, *args, **kwargs)
+        if self._entry is not None:
+            self._entry['streaming'] = not self._in_request
+        return result
+
+    def getresponse(self):
+        response = self.connection_cls.getresponse(self)
+        entry, self._entry = self._entry, None
+        if entry is None or self.logger is None:
+            return response
+
+        entry.pop('streaming', None)
+        entry['status'] = response.status
+        entry['reason'] = response.reason
+        entry['response_headers'] = dict(response.getheaders())
+        return LoggedResponse(response, entry, self.logger)
+
+class LoggingHTTPSConnection(LoggingConnection, LibcloudHTTPSConnection):
+    """
+    Utility Class for logging HTTPS connections
+    """
+    protocol = 'https'
+    connection_cls = LibcloudHTTPSConnection
 
 class LoggingHTTPConnection(LoggingConnection, LibcloudHTTPConnection):
     """
     Utility Class for logging HTTP connections
     """
+    protocol = 'http'
+    connection_cls = LibcloudHTTPConnection
 
-    def getresponse(self):
-        r = LibcloudHTTPConnection.getresponse(self)
-        if self.log is not None:
-            r, rv = self._log_response(r)
-            self.log.write(rv + "\n")
-            self.log.flush()
-        return r
+def _is_stale_connection_error(error, request_sent):
+    """
+    Return True if C{error} means that an idle keep-alive connection had
+    been closed by the server before it got the request, so the request can
+    be sent again whatever its method.
 
-    def request(self, method, url, body=None, headers=None):
-        headers.update({'X-LC-Request-ID': str(id(self))})
-        if self.log is not None:
-            pre = "# -------- begin %d request ----------\n"  % id(self)
-            self.log.write(pre +
-                           self._log_curl(method, url, body, headers) + "\n")
-            self.log.flush()
-        return LibcloudHTTPConnection.request(self, method, url,
-                                               body, headers)
+    @type request_sent: C{bool}
+    @param request_sent: True if the request had been sent when the error
+                         was raised.
+    """
+    if isinstance(error, httplib.BadStatusLine):
+        # The connection was closed without a single byte of response
+        return error.line in ('', "''")
+    return (not request_sent and isinstance(error, socket.error) and
+            error.errno in STALE_CONNECTION_ERRNOS)
+
+def _thread_local_property(name, doc=None):
+    """
+    Return a property which stores its value in the instance's C{_local}
+    thread local storage.
+    """
+    def fget(self):
+        return getattr(self._local, name, None)
+
+    def fset(self, value):
+        setattr(self._local, name, value)
+
+    return property(fget, fset, doc=doc)
 
 class ConnectionKey(object):
     """
     A Base Connection class to derive from.
+
+    Per request state (the underlying connection, action and method) is
+    kept in thread local storage, so a single instance (and the driver which
+    owns it) can be shared by multiple threads.
     """
     #conn_classes = (LoggingHTTPSConnection)
     conn_classes = (LibcloudHTTPConnection, LibcloudHTTPSConnection)
 
     responseCls = Response
     rawResponseCls = RawResponse
-    connection = None
+    streamResponseCls = StreamingResponse
     host = '127.0.0.1'
     port = (80, 443)
     secure = 1
     driver = None
-    action = None
+    keep_alive = True
+    timeout = None
+    retry_policy = None
+    rate_limiter = None
+    allow_compression = True
+    max_concurrency = 4
+
+    connection = _thread_local_property('connection',
+                                        'Connection used by this thread.')
+    action = _thread_local_property('action',
+                                    'Action of the current request.')
+    method = _thread_local_property('method',
+                                    'HTTP method of the current request.')
 
     def __init__(self, key, secure=True, host=None, force_port=None):
         """
         Initialize `user_id` and `key`; set `secure` to an C{int} based on
         passed value.
         """
+        self._local = threading.local()
         self.key = key
         self.secure = secure and 1 or 0
         self.ua = []
+        self.transfer_stats = TransferStats()
         if host:
             self.host = host
 
@@ -265,7 +633,11 @@ class ConnectionKey(object):
 
         kwargs = {'host': host, 'port': port}
 
-        connection = self.conn_classes[self.secure](**kwargs)
+        if self.keep_alive:
+            connection = pool.get_pool(conn_cls=self.conn_classes[self.secure],
+                                       secure=self.secure, **kwargs).get()
+        else:
+            connection = self.conn_classes[self.secure](**kwargs)
         # You can uncoment this line, if you setup a reverse proxy server
         # which proxies to your endpoint, and lets you easily capture
         # connections in cleartext when you setup the proxy to do SSL
@@ -298,7 +670,9 @@ class ConnectionKey(object):
                 data='',
                 headers=None,
                 method='GET',
-                raw=False):
+                raw=False,
+                timeout=None,
+                stream=False):
         """
         Request a given `action`.
 
@@ -322,8 +696,42 @@ class ConnectionKey(object):
         @type method: C{str}
         @param method: An HTTP method such as "GET" or "POST".
 
+        @type timeout: C{float} or C{tuple}
+        @param timeout: Optional timeout in seconds or a (connect, read)
+            tuple which overrides the connection's C{timeout}.
+
+        @type stream: C{bool}
+        @param stream: If True, return a I{streamResponseCls} which reads
+            the body as it is consumed instead of a parsed I{responseCls}.
+
         @return: An instance of type I{responseCls}
         """
+        if not hooks.has_listeners():
+            return self._request(action, params, data, headers, method, raw,
+                                 timeout, stream, None)
+
+        record = hooks.RequestRecord(self.driver.name, action, method,
+                                     self.get_operation_name(action,
+                                                             params or {},
+                                                             method))
+        try:
+            response = self._request(action, params, data, headers, method,
+                                     raw, timeout, stream, record)
+        except Exception, e:
+            record.finish(error=e)
+            raise
+
+        # Raw responses report once the caller reads or closes the response
+        if not raw:
+            record.finish()
+        return response
+
+    def _request(self, action, params, data, headers, method, raw, timeout,
+                 stream, record):
+        """
+        Send a request (see L{request}), updating C{record} with its
+        timings if it isn't None.
+        """
         if params is None:
             params = {}
         if headers is None:
@@ -331,13 +739,20 @@ class ConnectionKey(object):
 
         self.action = action
         self.method = method
+        if record is not None:
+            signing = time.time()
         # Extend default parameters
         params = self.add_default_params(params)
         # Extend default headers
         headers = self.add_default_headers(headers)
+        if record is not None:
+            record.add_timing('sign', time.time() - signing)
         # We always send a content length and user-agent header
         headers.update({'User-Agent': self._user_agent()})
         headers.update({'Host': self.host})
+        # Raw responses are streamed to the caller as they are
+        if self.allow_compression and not raw:
+            headers.setdefault('Accept-Encoding', 'gzip, deflate')
         # Encode data if necessary
         if data != '' and data != None:
             data = self.encode_data(data)
@@ -352,31 +767,251 @@ class ConnectionKey(object):
 
         # Removed terrible hack...this a less-bad hack that doesn't execute a
         # request twice, but it's still a hack.
-        self.connect()
-        try:
-            # @TODO: Should we just pass File object as body to request method
-            # instead of dealing with splitting and sending the file ourselves?
-            if raw:
-                self.connection.putrequest(method, action)
-
-                for key, value in headers.iteritems():
-                    self.connection.putheader(key, value)
-
-                self.connection.endheaders()
+        retry_policy = self.retry_policy
+        rate_limiter = self.rate_limiter
+        if rate_limiter is not None:
+            rate_limit_name = self.get_rate_limit_name(action, params, method)
+        attempt = 0
+        while True:
+            if rate_limiter is not None:
+                rate_limiter.acquire(getattr(self.driver, 'type', None),
+                                     self.host, rate_limit_name)
+            self.connect()
+            # An open socket means we got an idle keep-alive connection
+            # from the pool
+            reused = getattr(self.connection, 'sock', None) is not None
+            if record is not None:
+                self.connection.record = record
+                record.attempts += 1
+                sent = time.time()
+                connecting = self._get_connect_time(record)
             else:
-                self.connection.request(method=method, url=url, body=data,
-                                        headers=headers)
-        except ssl.SSLError, e:
-            raise ssl.SSLError(str(e))
+                self.connection.record = None
+            request_sent = False
+            try:
+                self._set_timeout(timeout)
+                self._send_request(method=method, url=url, action=action,
+                                   data=data, headers=headers, raw=raw)
+                request_sent = True
+                if raw:
+                    http_response = None
+                else:
+                    http_response = self.connection.getresponse()
+                if record is not None:
+                    record.add_timing('wait', time.time() - sent -
+                        (self._get_connect_time(record) - connecting))
+            except ssl.SSLError, e:
+                raise ssl.SSLError(str(e))
+            except (httplib.HTTPException, socket.error), e:
+                self.connection.close()
+                # The server may close an idle keep-alive connection at any
+                # time, so retry at once on a fresh socket if it didn't get
+                # our request.
+                if reused and _is_stale_connection_error(e, request_sent):
+                    continue
+                if (raw or retry_policy is None or
+                    not retry_policy.should_retry(method, attempt, error=e)):
+                    raise
+                delay = retry_policy.get_delay(attempt)
+            else:
+                if (raw or retry_policy is None or
+                    not retry_policy.should_retry(method, attempt,
+                                                  status=http_response.status)):
+                    break
+                retry_after = http_response.getheader('retry-after', None)
+                http_response.read()
+                self._release_connection(http_response)
+                delay = retry_policy.get_delay(attempt, retry_after)
+
+            attempt += 1
+            hooks.sleep(delay, 'retry')
+
+        if retry_policy is not None and attempt == 0:
+            retry_policy.record_success()
+
+        if record is not None:
+            if data:
+                record.bytes_sent = len(data)
+            if not raw:
+                record.status = http_response.status
+            received = time.time()
 
         if raw:
             response = self.rawResponseCls()
+            response.record = record
         else:
-            response = self.responseCls(self.connection.getresponse())
+            if self.allow_compression:
+                body_response = DecodingResponse(http_response,
+                                                 self.transfer_stats)
+            else:
+                body_response = http_response
+
+            # A streamed body releases the connection once it has been read
+            streaming = False
+            response = None
+            try:
+                if stream:
+                    response = self.streamResponseCls(body_response,
+                                                      self.connection)
+                    streaming = response.success()
+                    if not streaming:
+                        # Errors are small, parse them as usual
+                        response = self.responseCls(body_response)
+                else:
+                    response = self.responseCls(body_response)
+            finally:
+                if not streaming:
+                    self._release_connection(http_response)
+
+                if record is not None:
+                    record.add_timing('body', time.time() - received)
+                    if self.allow_compression:
+                        record.bytes_received = body_response.wire_bytes
+                    else:
+                        record.bytes_received = len(getattr(response, 'body',
+                                                            None) or '')
 
         response.connection = self
         return response
 
+    def request_many(self, requests, max_concurrency=None,
+                     return_exceptions=False):
+        """
+        Send independent requests concurrently over pooled connections.
+
+        @type requests: C{list}
+        @param requests: Requests to send. Each one is either an action
+            (C{str}) or a C{dict} of keyword arguments for L{request}.
+
+        @type max_concurrency: C{int}
+        @param max_concurrency: Maximum number of requests in flight at once
+            (defaults to the connection's C{max_concurrency}).
+
+        @type return_exceptions: C{bool}
+        @param return_exceptions: If True, a request which failed has its
+            exception put in the result list instead of it being raised.
+
+        @return: A C{list} of I{responseCls} instances in the same order as
+                 C{requests}. Otherwise the first error (in request order)
+                 is raised once all the requests have completed.
+        """
+        requests = [isinstance(spec, basestring) and {'action': spec} or spec
+                    for spec in requests]
+        max_concurrency = min(max_concurrency or self.max_concurrency,
+                              len(requests))
+
+        workers = concurrency.get_request_pool()
+        # Requests made from a request pool thread (e.g. by a listener) run
+        # inline: waiting for the pool from one of its threads could
+        # deadlock
+        if max_concurrency <= 1 or workers.in_worker():
+            futures = [concurrency.call(self.request, **spec)
+                       for spec in requests]
+        else:
+            futures = concurrency.call_many(
+                workers, [(self.request, (), spec) for spec in requests],
+                max_concurrency)
+            for future in futures:
+                future.exception()
+
+        if return_exceptions:
+            return [future.exception() or future.result()
+                    for future in futures]
+        return [future.result() for future in futures]
+
+    def _set_timeout(self, timeout):
+        """
+        Apply the connect and read timeouts to the current connection.
+
+        @type timeout: C{float} or C{tuple}
+        @param timeout: Timeout in seconds or a (connect, read) tuple. If
+            None, the connection's C{timeout} is used.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        if timeout is None:
+            timeout = socket.getdefaulttimeout()
+
+        if isinstance(timeout, tuple):
+            connect_timeout, read_timeout = timeout
+        else:
+            connect_timeout = read_timeout = timeout
+
+        connection = self.connection
+        if getattr(connection, 'sock', None) is None:
+            connection.timeout = connect_timeout
+            if connect_timeout == read_timeout:
+                return
+            connection.connect()
+
+        sock = getattr(connection, 'sock', None)
+        if sock is not None:
+            sock.settimeout(read_timeout)
+
+    def _send_request(self, method, url, action, data, headers, raw):
+        """
+        Send the request over the current connection.
+
+        The body of raw requests is not sent, it is streamed by the caller.
+        """
+        # @TODO: Should we just pass File object as body to request method
+        # instead of dealing with splitting and sending the file ourselves?
+        if raw:
+            self.connection.putrequest(method, action)
+
+            for key, value in headers.iteritems():
+                self.connection.putheader(key, value)
+
+            self.connection.endheaders()
+            return
+
+        self.connection.request(method=method, url=url, body=data,
+                                headers=headers)
+
+    def _release_connection(self, http_response, connection=None):
+        """
+        Return a connection (the current one by default) to the pool if the
+        response body has been fully read and the connection can be used for
+        another request.
+        """
+        if not self.keep_alive or not http_response.isclosed():
+            return
+
+        connection = connection or self.connection
+        pool.get_pool(conn_cls=self.conn_classes[self.secure],
+                      host=connection.host, port=connection.port,
+                      secure=self.secure).put(connection)
+
+    def _get_connect_time(self, record):
+        timings = record.timings
+        return (timings.get('resolve', 0) + timings.get('connect', 0) +
+                timings.get('tls', 0))
+
+    def get_operation_name(self, action, params, method):
+        """
+        Return the name of the API call a request makes, used to aggregate
+        the requests (e.g. in L{libcloud.common.metrics}).
+
+        Defaults to the method and the path with the segments which look
+        like ids replaced by C{{id}}, so the number of names stays small.
+        Connections whose API has a single endpoint should return the name
+        of the API call instead.
+        """
+        segments = [ID_SEGMENT_RE.match(segment) and '{id}' or segment
+                    for segment in action.split('/')]
+        return '%s %s' % (method, '/'.join(segments))
+
+    def get_rate_limit_name(self, action, params, method):
+        """
+        Return the name under which a request is rate limited (see
+        L{RateLimiter}).
+
+        Defaults to the HTTP method, so mutating calls can be limited
+        separately from reads. Connections whose API has a single endpoint
+        should return the name of the API call instead.
+        """
+        return method
+
     def add_default_params(self, params):
         """
         Adds default parameters (such as API key, version, etc.)
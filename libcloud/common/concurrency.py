@@ -0,0 +1,357 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Non-blocking driver API built on a bounded pool of worker threads.
+
+Driver methods run on the shared worker pool and return a L{Future}, so a
+caller can have many calls in flight without managing threads itself.
+Drivers are safe to share between threads and reuse pooled keep-alive
+connections, so no driver code has to change.
+
+Usage:
+    from libcloud.common.concurrency import AsyncDriver
+
+    driver = AsyncDriver(EC2NodeDriver(key, secret))
+    futures = [driver.list_nodes(), driver.list_images()]
+    nodes, images = [future.result() for future in futures]
+"""
+
+import sys
+import atexit
+import inspect
+import threading
+import Queue
+
+from libcloud.common import hooks
+from libcloud.common.types import LibcloudError
+
+__all__ = [
+    "DEFAULT_POOL_SIZE",
+    "REQUEST_POOL_SIZE",
+    "Future",
+    "WorkerPool",
+    "AsyncDriver",
+    "call",
+    "call_many",
+    "get_default_pool",
+    "get_request_pool"
+    ]
+
+# Number of worker threads in the default pool
+DEFAULT_POOL_SIZE = 10
+
+# Number of worker threads in the pool which sends the requests of
+# ConnectionKey.request_many
+REQUEST_POOL_SIZE = 10
+
+class Future(object):
+    """
+    The result of a call which is running on a worker pool.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._done = False
+        self._result = None
+        self._exc_info = None
+        self._callbacks = []
+
+    def done(self):
+        """
+        Return True if the call has completed.
+        """
+        return self._done
+
+    def result(self, timeout=None):
+        """
+        Wait for the call to complete and return its result or re-raise its
+        exception.
+
+        @type timeout: C{float}
+        @param timeout: Maximum number of seconds to wait (forever if None).
+        """
+        self._wait(timeout)
+        if self._exc_info:
+            raise self._exc_info[0], self._exc_info[1], self._exc_info[2]
+        return self._result
+
+    def exception(self, timeout=None):
+        """
+        Wait for the call to complete and return the exception it raised or
+        C{None} on success.
+        """
+        self._wait(timeout)
+        if self._exc_info:
+            return self._exc_info[1]
+        return None
+
+    def add_done_callback(self, callback):
+        """
+        Call C{callback} with this future once it has completed (right away
+        if it already has). Callbacks run in the worker thread.
+        """
+        self._condition.acquire()
+        try:
+            if not self._done:
+                self._callbacks.append(callback)
+                return
+        finally:
+            self._condition.release()
+
+        callback(self)
+
+    def set_result(self, result):
+        self._complete(result, None)
+
+    def set_exception(self, exc_info):
+        """
+        @type exc_info: C{tuple}
+        @param exc_info: Exception information as returned by
+                         C{sys.exc_info()}.
+        """
+        self._complete(None, exc_info)
+
+    def _complete(self, result, exc_info):
+        self._condition.acquire()
+        try:
+            self._result = result
+            self._exc_info = exc_info
+            self._done = True
+            callbacks, self._callbacks = self._callbacks, []
+            self._condition.notifyAll()
+        finally:
+            self._condition.release()
+
+        for callback in callbacks:
+            callback(self)
+
+    def _wait(self, timeout):
+        self._condition.acquire()
+        try:
+            if not self._done:
+                self._condition.wait(timeout)
+            if not self._done:
+                raise LibcloudError('Timed out waiting for the call to '
+                                    'complete')
+        finally:
+            self._condition.release()
+
+class WorkerPool(object):
+    """
+    A bounded pool of daemon threads which run submitted calls in order.
+
+    Threads are started on demand, up to C{size}. Calls submitted while all
+    the threads are busy wait in a queue.
+    """
+
+    def __init__(self, size=DEFAULT_POOL_SIZE):
+        self.size = size
+        self._queue = Queue.Queue()
+        self._workers = []
+        self._idle = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Schedule C{func(*args, **kwargs)} and return a L{Future} for its
+        result.
+        """
+        future = Future()
+        # Requests made by the worker belong to the current driver call
+        self._queue.put((future, func, args, kwargs,
+                         hooks.get_current_call()))
+
+        self._lock.acquire()
+        try:
+            if (self._queue.qsize() > self._idle and
+                len(self._workers) < self.size):
+                worker = threading.Thread(target=self._work)
+                worker.setDaemon(True)
+                worker.start()
+                self._workers.append(worker)
+        finally:
+            self._lock.release()
+
+        return future
+
+    def in_worker(self):
+        """
+        Return True if the current thread is one of this pool's threads.
+        """
+        return getattr(self._local, 'worker', False)
+
+    def shutdown(self):
+        """
+        Stop the threads once they have run all the queued calls.
+        """
+        self._lock.acquire()
+        try:
+            workers, self._workers = self._workers, []
+        finally:
+            self._lock.release()
+
+        for worker in workers:
+            self._queue.put(None)
+        for worker in workers:
+            worker.join()
+
+    def _work(self):
+        self._local.worker = True
+        while True:
+            self._set_idle(1)
+            item = self._queue.get()
+            self._set_idle(-1)
+            if item is None:
+                return
+
+            future, func, args, kwargs, call = item
+            hooks.set_current_call(call)
+            try:
+                _run(future, func, args, kwargs)
+            finally:
+                hooks.set_current_call(None)
+
+    def _set_idle(self, delta):
+        self._lock.acquire()
+        try:
+            self._idle += delta
+        finally:
+            self._lock.release()
+
+def _run(future, func, args, kwargs):
+    try:
+        result = func(*args, **kwargs)
+    except Exception:
+        future.set_exception(sys.exc_info())
+    else:
+        future.set_result(result)
+
+def call(func, *args, **kwargs):
+    """
+    Call C{func(*args, **kwargs)} in the current thread and return a
+    completed L{Future} for its result.
+    """
+    future = Future()
+    _run(future, func, args, kwargs)
+    return future
+
+def call_many(pool, calls, max_concurrency):
+    """
+    Run calls on a pool with at most C{max_concurrency} of them in flight at
+    once, whatever the size of the pool.
+
+    @type calls: C{list}
+    @param calls: C{(func, args, kwargs)} tuples.
+
+    @return: A C{list} of L{Future} in the same order as C{calls}.
+    """
+    futures = [Future() for item in calls]
+    pending = Queue.Queue()
+    for future, item in zip(futures, calls):
+        pending.put((future, item))
+
+    def run_pending():
+        while True:
+            try:
+                future, (func, args, kwargs) = pending.get_nowait()
+            except Queue.Empty:
+                return
+            _run(future, func, args, kwargs)
+
+    for i in range(min(max_concurrency, len(calls))):
+        pool.submit(run_pending)
+    return futures
+
+_default_pool = None
+_request_pool = None
+_default_pool_lock = threading.Lock()
+
+def get_default_pool():
+    """
+    Return the process wide worker pool, creating it on first use.
+    """
+    global _default_pool
+
+    _default_pool_lock.acquire()
+    try:
+        if _default_pool is None:
+            _default_pool = WorkerPool(DEFAULT_POOL_SIZE)
+            atexit.register(_default_pool.shutdown)
+    finally:
+        _default_pool_lock.release()
+
+    return _default_pool
+
+def get_request_pool():
+    """
+    Return the process wide worker pool which sends the requests of
+    L{ConnectionKey.request_many}.
+
+    It is separate from the default pool, so a driver call running on the
+    default pool can wait for its requests without taking the threads they
+    need.
+    """
+    global _request_pool
+
+    _default_pool_lock.acquire()
+    try:
+        if _request_pool is None:
+            _request_pool = WorkerPool(REQUEST_POOL_SIZE)
+            atexit.register(_request_pool.shutdown)
+    finally:
+        _default_pool_lock.release()
+
+    return _request_pool
+
+class AsyncDriver(object):
+    """
+    Wraps a L{NodeDriver} or L{StorageDriver}; its public methods are run on
+    a worker pool and return a L{Future} instead of blocking.
+
+    Other attributes (including classes such as C{connectionCls}) are
+    returned from the wrapped driver as they are.
+
+    >>> from libcloud.compute.drivers.dummy import DummyNodeDriver
+    >>> driver = AsyncDriver(DummyNodeDriver(0))
+    >>> future = driver.list_nodes()
+    >>> [node.name for node in future.result()]
+    ['dummy-1', 'dummy-2']
+    """
+
+    def __init__(self, driver, pool=None):
+        """
+        @type driver: L{NodeDriver} or L{StorageDriver}
+        @param driver: Driver to wrap.
+
+        @type pool: L{WorkerPool}
+        @param pool: Pool to run the calls on (defaults to the process wide
+                     pool).
+        """
+        self.driver = driver
+        self.pool = pool or get_default_pool()
+
+    def __getattr__(self, name):
+        attr = getattr(self.driver, name)
+        if name.startswith('_') or not inspect.ismethod(attr):
+            return attr
+
+        def submit(*args, **kwargs):
+            return self.pool.submit(attr, *args, **kwargs)
+
+        submit.__name__ = name
+        submit.__doc__ = attr.__doc__
+        return submit
@@ -0,0 +1,231 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Structured debug log of the HTTP(s) traffic.
+
+Every sampled request is written as a single JSON object per line, with
+the request and response headers, the start of both bodies and a C{curl}
+command reproducing the request. Entries are formatted and written by a
+background thread, so logging doesn't slow the requests down.
+
+Enabled with L{libcloud.enable_debug} or the C{LIBCLOUD_DEBUG} environment
+variable.
+"""
+
+import atexit
+import random
+import threading
+import time
+import zlib
+import Queue
+
+from pipes import quote as pquote
+
+from libcloud.common import jsoncodec
+
+__all__ = [
+    "MAX_BODY_SIZE",
+    "MAX_QUEUE_SIZE",
+    "DebugLogger",
+    "LoggedResponse"
+    ]
+
+# Number of bytes of every request and response body which are logged
+MAX_BODY_SIZE = 1024
+
+# Number of entries waiting to be written after which new ones are dropped
+MAX_QUEUE_SIZE = 10000
+
+class DebugLogger(object):
+    """
+    Writes log entries as JSON lines to a file like object from a
+    background thread.
+
+    @ivar dropped: Number of entries dropped because the writer couldn't
+                   keep up.
+    """
+
+    def __init__(self, fo, max_body_size=MAX_BODY_SIZE, sample_rate=1.0,
+                 max_queue_size=MAX_QUEUE_SIZE):
+        """
+        @type fo: File like object
+        @param fo: Where the entries are written, only write and flush
+                   are used.
+
+        @type max_body_size: C{int}
+        @param max_body_size: Number of bytes of each body which are logged.
+
+        @type sample_rate: C{float}
+        @param sample_rate: Fraction of the requests which are logged.
+
+        @type max_queue_size: C{int}
+        @param max_queue_size: Maximum number of entries waiting to be
+                               written.
+        """
+        self.fo = fo
+        self.max_body_size = max_body_size
+        self.sample_rate = sample_rate
+        self.dropped = 0
+        self._queue = Queue.Queue(max_queue_size)
+        self._writer = None
+        self._lock = threading.Lock()
+
+    def sample(self):
+        """
+        Return True if the next request should be logged.
+        """
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def log(self, entry):
+        """
+        Queue an entry (a C{dict}) to be written.
+        """
+        if self._writer is None:
+            self._start_writer()
+
+        try:
+            self._queue.put_nowait(entry)
+        except Queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """
+        Wait until all the queued entries have been written.
+        """
+        if self._writer is not None:
+            self._queue.join()
+
+    def _start_writer(self):
+        self._lock.acquire()
+        try:
+            if self._writer is None:
+                writer = threading.Thread(target=self._write)
+                writer.setDaemon(True)
+                writer.start()
+                atexit.register(self.flush)
+                self._writer = writer
+        finally:
+            self._lock.release()
+
+    def _write(self):
+        while True:
+            entry = self._queue.get()
+            try:
+                self.fo.write(self.format(entry) + '\n')
+            except Exception:
+                pass
+            self._queue.task_done()
+
+            # Flush once the burst of entries has been written
+            if self._queue.empty():
+                try:
+                    self.fo.flush()
+                except Exception:
+                    pass
+
+    def format(self, entry):
+        """
+        Return the JSON line of an entry.
+        """
+        entry = dict(entry)
+        entry['request_body'] = self._format_body(
+            entry.get('request_body'), entry.get('request_headers', {}))
+        entry['response_body'] = self._format_body(
+            entry.get('response_body'), entry.get('response_headers', {}))
+        entry['curl'] = self._format_curl(entry)
+        return jsoncodec.dumps(entry, sort_keys=True)
+
+    def _format_body(self, body, headers):
+        if not body:
+            return body
+
+        encoding = ''
+        for key, value in headers.items():
+            if key.lower() == 'content-encoding':
+                encoding = value.strip().lower()
+
+        # Only the start of the body was kept, decompress as much of it as
+        # possible
+        try:
+            if encoding in ('gzip', 'x-gzip'):
+                body = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(body)
+            elif encoding == 'deflate':
+                body = zlib.decompressobj().decompress(body)
+        except zlib.error:
+            pass
+
+        return body[:self.max_body_size].decode('utf-8', 'replace')
+
+    def _format_curl(self, entry):
+        cmd = ["curl", "-i"]
+
+        cmd.extend(["-X", pquote(entry['method'])])
+
+        for key, value in entry.get('request_headers', {}).items():
+            cmd.extend(["-H", pquote("%s: %s" % (key, value))])
+
+        body = entry.get('request_body')
+        if body:
+            cmd.extend(["--data-binary", pquote(body.encode('utf-8'))])
+
+        cmd.append(pquote(entry['url']))
+        return " ".join(cmd)
+
+class LoggedResponse(object):
+    """
+    Wraps an C{httplib.HTTPResponse}, keeps the start of the body as it is
+    read by the caller and logs the entry once the body has been read.
+    """
+
+    def __init__(self, response, entry, logger):
+        self._response = response
+        self._entry = entry
+        self._logger = logger
+        self._body = []
+        self._kept = 0
+        self._size = 0
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+    def read(self, amt=None):
+        data = self._response.read(amt)
+        if self._entry is None:
+            return data
+
+        self._size += len(data)
+        if self._kept < self._logger.max_body_size:
+            kept = data[:self._logger.max_body_size - self._kept]
+            self._body.append(kept)
+            self._kept += len(kept)
+
+        if amt is None or not data:
+            self._log()
+        return data
+
+    def close(self):
+        self._log()
+        self._response.close()
+
+    def _log(self):
+        entry, self._entry = self._entry, None
+        if entry is None:
+            return
+
+        entry['response_body'] = ''.join(self._body)
+        entry['response_body_size'] = self._size
+        entry['duration'] = time.time() - entry['time']
+        self._logger.log(entry)
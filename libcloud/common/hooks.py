@@ -0,0 +1,376 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Per request timing hooks.
+
+Listeners are called with a L{RequestRecord} once every request made by a
+L{ConnectionKey} has completed (or failed). No record is built while no
+listener is registered.
+
+Usage:
+    from libcloud.common import hooks
+
+    def log_slow_requests(record):
+        if record.duration > 1:
+            print record.driver, record.action, record.timings
+
+    hooks.add_listener(log_slow_requests)
+
+Call listeners are called with a L{Call} once every call of a public
+L{NodeDriver} or L{StorageDriver} method has returned. Calls form a tree:
+a call made by another one, in the same thread or in a worker thread of
+L{concurrency.WorkerPool}, is one of its C{children}, and the requests
+are attached to the innermost call which made them. Driver methods are
+only wrapped while a call listener is registered.
+
+Waits done with L{sleep} (e.g. while polling a task) are recorded in the
+C{sleeps} of the current call.
+"""
+
+import os
+import inspect
+import threading
+import time
+import warnings
+
+__all__ = [
+    "PHASES",
+    "RequestRecord",
+    "Call",
+    "add_listener",
+    "remove_listener",
+    "has_listeners",
+    "notify",
+    "add_call_listener",
+    "remove_call_listener",
+    "get_current_call",
+    "set_current_call",
+    "sleep"
+    ]
+
+# Timed phases of a request, in order:
+#  - sign: adding the default parameters and headers, which includes
+#    signing the request for most providers
+#  - resolve: host name resolution
+#  - connect: TCP connection
+#  - tls: TLS handshake and certificate verification
+#  - wait: sending the request and waiting for the response headers
+#  - body: reading (and parsing) the response body
+PHASES = ['sign', 'resolve', 'connect', 'tls', 'wait', 'body']
+
+# Listeners are replaced (never mutated) so they can be read without a lock
+_listeners = ()
+_call_listeners = ()
+_lock = threading.Lock()
+
+# Innermost driver call of each thread
+_local = threading.local()
+
+# Driver classes whose methods are wrapped while a call listener is
+# registered, with their (name, function, wrapper) tuples
+_wrapped = {}
+
+class RequestRecord(object):
+    """
+    Timings and sizes of a single L{ConnectionKey.request} call.
+
+    @ivar timings: Seconds spent in each of the L{PHASES}. Phases which
+                   didn't happen (e.g. no connection was established because
+                   a pooled one was reused) are missing.
+    @ivar duration: Total number of seconds, including retries.
+    @ivar attempts: Number of times the request was sent.
+    @ivar bytes_received: Size of the body as received on the wire, or
+                          C{None} for raw responses. Only the part read
+                          before a streamed response is returned counts.
+    @ivar error: Exception raised by the request, if any.
+    @ivar operation: Name of the API call (see
+                     L{ConnectionKey.get_operation_name}).
+    """
+
+    def __init__(self, driver, action, method, operation=None):
+        self.driver = driver
+        self.action = action
+        self.method = method
+        self.operation = operation or method
+        self.status = None
+        self.bytes_sent = 0
+        self.bytes_received = None
+        self.attempts = 0
+        self.error = None
+        self.timings = {}
+        self.start = time.time()
+        self.duration = None
+
+    def add_timing(self, phase, seconds):
+        self.timings[phase] = self.timings.get(phase, 0) + seconds
+
+    def finish(self, error=None):
+        """
+        Mark the request as completed and notify the listeners.
+        """
+        self.duration = time.time() - self.start
+        self.error = error
+
+        call = get_current_call()
+        if call is not None:
+            call.requests.append(self)
+        notify(self)
+
+    def __repr__(self):
+        return (('<RequestRecord: driver=%s, action=%s, method=%s, '
+                 'status=%s, duration=%s>')
+                % (self.driver, self.action, self.method, self.status,
+                   self.duration))
+
+class Call(object):
+    """
+    A call of a public driver method.
+
+    @ivar children: Driver calls made by this one.
+    @ivar requests: L{RequestRecord}s of the requests made by this call
+                    itself (not by its children).
+    @ivar sleeps: C{(reason, start, duration)} of the waits done with
+                  L{sleep} by this call itself.
+    @ivar cpu_time: Process CPU seconds used during the call.
+    @ivar error: Exception raised by the call, if any.
+    """
+
+    def __init__(self, driver, method, parent=None):
+        self.driver = driver
+        self.method = method
+        self.parent = parent
+        self.children = []
+        self.requests = []
+        self.sleeps = []
+        self.error = None
+        self.start = time.time()
+        self.duration = None
+        self.cpu_time = None
+        self._cpu_start = _cpu_time()
+
+        if parent is not None:
+            parent.children.append(self)
+
+    def finish(self, error=None):
+        """
+        Mark the call as returned and notify the call listeners.
+        """
+        self.duration = time.time() - self.start
+        self.cpu_time = _cpu_time() - self._cpu_start
+        self.error = error
+        for listener in _call_listeners:
+            try:
+                listener(self)
+            except Exception, e:
+                warnings.warn('Call listener %r failed: %s' % (listener, e))
+
+    def iter_requests(self):
+        """
+        Yield the records of the requests made by this call and its
+        children.
+        """
+        for record in self.requests:
+            yield record
+        for child in self.children:
+            for record in child.iter_requests():
+                yield record
+
+    def __repr__(self):
+        return (('<Call: driver=%s, method=%s, requests=%d, duration=%s>')
+                % (self.driver, self.method, len(self.requests),
+                   self.duration))
+
+def _cpu_time():
+    times = os.times()
+    return times[0] + times[1]
+
+def add_listener(listener):
+    """
+    Register a callable which is called with a L{RequestRecord} for every
+    request.
+    """
+    global _listeners
+
+    _lock.acquire()
+    try:
+        _listeners = _listeners + (listener,)
+    finally:
+        _lock.release()
+
+def remove_listener(listener):
+    """
+    Unregister a listener added with L{add_listener}.
+    """
+    global _listeners
+
+    _lock.acquire()
+    try:
+        _listeners = tuple([l for l in _listeners if l != listener])
+    finally:
+        _lock.release()
+
+def has_listeners():
+    """
+    Return True if requests need to be recorded.
+    """
+    return bool(_listeners or _call_listeners)
+
+def notify(record):
+    """
+    Call the listeners with C{record}. A failing listener doesn't fail the
+    request, a warning is issued instead.
+    """
+    for listener in _listeners:
+        try:
+            listener(record)
+        except Exception, e:
+            warnings.warn('Request listener %r failed: %s' % (listener, e))
+
+def add_call_listener(listener):
+    """
+    Register a callable which is called with a L{Call} for every public
+    driver method call.
+    """
+    global _call_listeners
+
+    _lock.acquire()
+    try:
+        if not _call_listeners:
+            for base in _driver_classes():
+                _wrap_subclasses(base)
+                base.__new__ = staticmethod(_wrapping_new)
+        _call_listeners = _call_listeners + (listener,)
+    finally:
+        _lock.release()
+
+def remove_call_listener(listener):
+    """
+    Unregister a listener added with L{add_call_listener}.
+    """
+    global _call_listeners
+
+    _lock.acquire()
+    try:
+        listeners = tuple([l for l in _call_listeners if l != listener])
+        if _call_listeners and not listeners:
+            for base in _driver_classes():
+                del base.__new__
+            _unwrap_all()
+        _call_listeners = listeners
+    finally:
+        _lock.release()
+
+def get_current_call():
+    """
+    Return the innermost L{Call} of the current thread, or C{None}.
+    """
+    return getattr(_local, 'call', None)
+
+def set_current_call(call):
+    """
+    Make C{call} the parent of the next calls of the current thread, used
+    to hand the current call over to worker threads.
+    """
+    _local.call = call
+
+def sleep(seconds, reason=None):
+    """
+    Like C{time.sleep}, recording the wait in the current call if there
+    is one.
+
+    @type reason: C{str}
+    @param reason: What is waited for, e.g. C{'task'} or C{'retry'}.
+    """
+    call = get_current_call()
+    if call is None:
+        time.sleep(seconds)
+        return
+
+    start = time.time()
+    try:
+        time.sleep(seconds)
+    finally:
+        call.sleeps.append((reason, start, time.time() - start))
+
+def _driver_classes():
+    from libcloud.compute.base import NodeDriver
+    from libcloud.storage.base import StorageDriver
+    return [NodeDriver, StorageDriver]
+
+def _wrap_subclasses(cls):
+    _wrap_class(cls)
+    for subclass in cls.__subclasses__():
+        _wrap_subclasses(subclass)
+
+def _wrapping_new(cls, *args, **kwargs):
+    # Driver classes imported after the first call listener was added are
+    # wrapped on their first instantiation
+    if cls not in _wrapped:
+        _lock.acquire()
+        try:
+            if _call_listeners:
+                _wrap_class(cls)
+        finally:
+            _lock.release()
+    return object.__new__(cls)
+
+def _wrap_class(cls):
+    """
+    Replace the public methods defined by C{cls} and its base classes with
+    wrappers which record the calls. Each class is only wrapped once, so
+    attribute lookups on the drivers are not slowed down.
+    """
+    for klass in cls.__mro__:
+        if klass is object or klass in _wrapped:
+            continue
+        functions = []
+        for name, value in klass.__dict__.items():
+            if name.startswith('_') or not inspect.isfunction(value):
+                continue
+            wrapper = _wrap_function(name, value)
+            setattr(klass, name, wrapper)
+            functions.append((name, value, wrapper))
+        _wrapped[klass] = functions
+
+def _unwrap_all():
+    for klass, functions in _wrapped.items():
+        for name, function, wrapper in functions:
+            # Unless something else has replaced the method since
+            if klass.__dict__.get(name) is wrapper:
+                setattr(klass, name, function)
+    _wrapped.clear()
+
+def _wrap_function(name, function):
+    def call_method(self, *args, **kwargs):
+        parent = get_current_call()
+        call = Call(getattr(self, 'name', self.__class__.__name__), name,
+                    parent)
+        _local.call = call
+        error = None
+        try:
+            try:
+                return function(self, *args, **kwargs)
+            except Exception, e:
+                error = e
+                raise
+        finally:
+            _local.call = parent
+            call.finish(error)
+
+    call_method.__name__ = name
+    call_method.__doc__ = function.__doc__
+    call_method.__wrapped__ = function
+    return call_method
@@ -0,0 +1,294 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+JSON codec used by the JSON drivers.
+
+Bodies are decoded with L{loads}, L{load} and L{iter_array}, which use the
+first available JSON implementation from L{BACKENDS}:
+ - C{ujson}: ujson, when installed (decoding only),
+ - C{simplejson}: simplejson, when installed with its C extension,
+ - C{json}: the standard library module.
+
+Request bodies, logs and reports are always encoded with C{simplejson} or
+C{json} (L{dumps}), since ujson escapes them differently and doesn't
+support all their options.
+
+Another backend can be picked with L{set_backend} or the
+C{LIBCLOUD_JSON_CODEC} environment variable:
+
+    from libcloud.common import jsoncodec
+
+    jsoncodec.set_backend('json')
+
+Huge listings can be decoded one item at a time with L{iter_array} (see
+also L{StreamingResponse.iter_json_array}), so only a single item of the
+array is held in memory at once.
+"""
+
+import re
+
+__all__ = [
+    "BACKENDS",
+    "Backend",
+    "ArrayDecoder",
+    "load_backend",
+    "get_available_backends",
+    "set_backend",
+    "get_backend",
+    "loads",
+    "load",
+    "dumps",
+    "iter_array"
+    ]
+
+# In order of preference
+BACKENDS = ['ujson', 'simplejson', 'json']
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+
+NUMBER_TYPES = (int, long, float)
+NUMBER_CHARS = '0123456789.eE+-'
+
+_backend = None
+
+class Backend(object):
+    """
+    A JSON implementation.
+
+    @ivar loads: Function decoding a string.
+    @ivar dumps: Function encoding an object, with the signature of
+                 C{json.dumps}.
+    @ivar decoder: C{JSONDecoder} instance whose C{raw_decode} is used to
+                   decode the items of an array one by one.
+    """
+
+    def __init__(self, name, loads, dumps, decoder):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+        self.decoder = decoder
+
+    def __repr__(self):
+        return '<Backend: name=%s>' % (self.name)
+
+def _load_standard_module():
+    try:
+        return load_backend('simplejson')
+    except ImportError:
+        return load_backend('json')
+
+def load_backend(name):
+    """
+    Return the L{Backend} called C{name}.
+
+    @raise ImportError: If the backend isn't installed.
+    """
+    if name == 'json':
+        import json
+        return Backend(name, json.loads, json.dumps, json.JSONDecoder())
+
+    if name == 'simplejson':
+        import simplejson
+        # Without its C extension simplejson is slower than the standard
+        # library
+        from simplejson import _speedups
+        _speedups                               # silence pyflakes
+        return Backend(name, simplejson.loads, simplejson.dumps,
+                       simplejson.JSONDecoder())
+
+    if name == 'ujson':
+        import ujson
+        standard = _load_standard_module()
+        return Backend(name, ujson.loads, standard.dumps, standard.decoder)
+
+    raise ValueError('Unknown JSON codec backend: %s' % (name))
+
+def get_available_backends():
+    """
+    Return the names of the installed backends, in order of preference.
+    """
+    available = []
+    for name in BACKENDS:
+        try:
+            load_backend(name)
+        except ImportError:
+            continue
+        available.append(name)
+    return available
+
+def set_backend(name=None):
+    """
+    Decode the bodies with the backend called C{name}, or the preferred
+    available one if C{name} is None.
+
+    @raise ImportError: If the backend isn't installed.
+
+    @return: The L{Backend}.
+    """
+    global _backend
+
+    if name is None:
+        name = get_available_backends()[0]
+    _backend = load_backend(name)
+    return _backend
+
+def get_backend():
+    """
+    Return the L{Backend} in use.
+    """
+    if _backend is None:
+        return set_backend()
+    return _backend
+
+def loads(data):
+    """
+    Decode a JSON document.
+
+    @type data: C{str}, C{unicode}, C{buffer} or C{bytearray}
+    @param data: Document, e.g. the body of a response.
+
+    @raise ValueError: If the document is malformed.
+    """
+    if not isinstance(data, basestring):
+        data = str(data)
+    return (_backend or get_backend()).loads(data)
+
+def load(fp, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Decode the JSON document read from the file like object C{fp}.
+    """
+    chunks = []
+    while True:
+        data = fp.read(chunk_size)
+        if not data:
+            break
+        chunks.append(data)
+    return loads(''.join(chunks))
+
+def dumps(obj, **kwargs):
+    """
+    Encode C{obj} as JSON, see C{json.dumps} for the arguments.
+    """
+    return (_backend or get_backend()).dumps(obj, **kwargs)
+
+def iter_array(fp, key=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Incrementally decode the JSON document read from the file like object
+    C{fp} and yield the items of an array.
+
+    @type key: C{str}
+    @param key: Key of the array in the top level object. If None, the
+                document must be an array.
+
+    @raise ValueError: If the document is malformed.
+    """
+    return ArrayDecoder(fp, chunk_size).iter_items(key)
+
+class ArrayDecoder(object):
+    """
+    Decodes the items of a JSON array one by one from a file like object.
+
+    The data is read C{chunk_size} bytes at a time and the buffer only
+    holds what hasn't been decoded yet.
+    """
+
+    def __init__(self, fp, chunk_size=DEFAULT_CHUNK_SIZE, decoder=None):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = decoder or (_backend or get_backend()).decoder
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def iter_items(self, key=None):
+        if key is not None:
+            self._expect('{')
+            while True:
+                if self._next_char() == '}':
+                    return
+                self.pos -= 1
+                name = self._decode()
+                self._expect(':')
+                if name == key:
+                    break
+                self._decode()
+                if self._next_char() == '}':
+                    return
+
+        self._expect('[')
+        if self._next_char() == ']':
+            return
+        self.pos -= 1
+
+        while True:
+            yield self._decode()
+            char = self._next_char()
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError('Expected "," or "]" in JSON array')
+
+    def _fill(self):
+        if self.eof:
+            return False
+        data = self.fp.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def _skip_whitespace(self):
+        while True:
+            self.pos = WHITESPACE_RE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self._fill():
+                return
+
+    def _next_char(self):
+        self._skip_whitespace()
+        if self.pos >= len(self.buffer):
+            raise ValueError('Unexpected end of JSON data')
+        char = self.buffer[self.pos]
+        self.pos += 1
+        return char
+
+    def _expect(self, expected):
+        if self._next_char() != expected:
+            raise ValueError('Expected "%s" in JSON data' % (expected))
+
+    def _decode(self):
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                # The value is incomplete
+                if not self._fill():
+                    raise
+                continue
+
+            # A number cut by the end of the buffer (e.g. "12" of "1234" or
+            # "1.5" of "1.5e3") may continue in the next chunk
+            if (isinstance(value, NUMBER_TYPES) and
+                (end == len(self.buffer) or
+                 self.buffer[end] in NUMBER_CHARS) and self._fill()):
+                continue
+
+            self.pos = end
+            return value
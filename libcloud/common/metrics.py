@@ -0,0 +1,313 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+In-process request metrics.
+
+Once enabled, counters and latency histograms of the requests are kept
+per provider, operation (see L{ConnectionKey.get_operation_name}) and
+status class (C{2xx}, C{4xx}, ... or C{error} when no response was
+received), along with the bytes moved by the storage uploads and
+downloads:
+
+    from libcloud.common import metrics
+
+    registry = metrics.enable()
+    ...
+    print registry.to_prometheus()
+
+Every thread updates its own copy of the metrics, which are merged when
+they are exported, so updates never wait for a lock.
+"""
+
+import bisect
+import threading
+
+from libcloud.common import hooks
+
+__all__ = [
+    "DEFAULT_BUCKETS",
+    "Registry",
+    "enable",
+    "disable",
+    "get_registry",
+    "record_transfer"
+    ]
+
+# Upper bounds (in seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+                   30, 60)
+
+REQUESTS = 'libcloud_requests_total'
+REQUEST_DURATION = 'libcloud_request_duration_seconds'
+TRANSFER_BYTES = 'libcloud_transfer_bytes_total'
+TRANSFER_DURATION = 'libcloud_transfer_duration_seconds'
+
+_registry = None
+
+class Registry(object):
+    """
+    Counters and histograms identified by a name and a tuple of
+    C{(label, value)} pairs.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._shards = []
+        self._retired = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def counter(self, name, description):
+        """
+        Declare a counter.
+        """
+        self._metrics[name] = ('counter', description, None)
+
+    def histogram(self, name, description, buckets=DEFAULT_BUCKETS):
+        """
+        Declare a histogram with the given bucket upper bounds.
+        """
+        self._metrics[name] = ('histogram', description, tuple(buckets))
+
+    def inc(self, name, labels, value=1):
+        """
+        Add C{value} to a counter.
+        """
+        shard = self._get_shard()
+        key = (name, labels)
+        shard[key] = shard.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        """
+        Add an observation to a histogram.
+        """
+        shard = self._get_shard()
+        key = (name, labels)
+        cells = shard.get(key)
+        buckets = self._metrics[name][2]
+        if cells is None:
+            # One count per bucket, the +Inf one, the sum
+            cells = shard[key] = [0] * (len(buckets) + 2)
+        cells[bisect.bisect_left(buckets, value)] += 1
+        cells[-1] += value
+
+    def snapshot(self):
+        """
+        Return the current values as a C{dict}:
+
+            {name: {'type': 'counter', 'samples': [
+                {'labels': {...}, 'value': 3}, ...]},
+             name: {'type': 'histogram', 'samples': [
+                {'labels': {...}, 'buckets': [[0.005, 1], ...],
+                 'count': 4, 'sum': 0.13}, ...]}}
+
+        Histogram buckets are cumulative, as in Prometheus.
+        """
+        values = self._merge()
+        result = {}
+        for name, (kind, description, buckets) in self._metrics.items():
+            result[name] = {'type': kind, 'description': description,
+                            'samples': []}
+
+        keys = values.keys()
+        keys.sort()
+        for key in keys:
+            name, labels = key
+            kind, description, buckets = self._metrics[name]
+            sample = {'labels': dict(labels)}
+            if kind == 'counter':
+                sample['value'] = values[key]
+            else:
+                cells = values[key]
+                total = 0
+                sample['buckets'] = []
+                for bound, count in zip(buckets, cells):
+                    total += count
+                    sample['buckets'].append([bound, total])
+                sample['count'] = total + cells[-2]
+                sample['sum'] = cells[-1]
+            result[name]['samples'].append(sample)
+        return result
+
+    def to_prometheus(self):
+        """
+        Return the current values in the Prometheus text exposition format.
+        """
+        lines = []
+        snapshot = self.snapshot()
+        names = snapshot.keys()
+        names.sort()
+        for name in names:
+            metric = snapshot[name]
+            lines.append('# HELP %s %s' % (name, metric['description']))
+            lines.append('# TYPE %s %s' % (name, metric['type']))
+            for sample in metric['samples']:
+                labels = sample['labels']
+                if metric['type'] == 'counter':
+                    lines.append('%s%s %s' % (name, _format_labels(labels),
+                                              _format_value(sample['value'])))
+                    continue
+
+                for bound, count in sample['buckets']:
+                    le = _format_value(bound)
+                    lines.append('%s_bucket%s %d' %
+                                 (name, _format_labels(labels, le=le), count))
+                lines.append('%s_bucket%s %d' %
+                             (name, _format_labels(labels, le='+Inf'),
+                              sample['count']))
+                lines.append('%s_sum%s %s' % (name, _format_labels(labels),
+                                              _format_value(sample['sum'])))
+                lines.append('%s_count%s %d' % (name, _format_labels(labels),
+                                                sample['count']))
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        self._lock.acquire()
+        try:
+            for thread, shard in self._shards:
+                shard.clear()
+            self._retired = {}
+        finally:
+            self._lock.release()
+
+    def record_request(self, record):
+        """
+        L{hooks} listener counting the requests.
+        """
+        # An error status raises too, it's still counted by its status
+        if record.status is None:
+            status_class = 'error'
+        else:
+            status_class = '%dxx' % (record.status // 100)
+        labels = (('provider', record.driver),
+                  ('operation', record.operation),
+                  ('status_class', status_class))
+        self.inc(REQUESTS, labels)
+        self.observe(REQUEST_DURATION, labels, record.duration)
+
+    def record_transfer(self, provider, direction, size, seconds):
+        labels = (('provider', provider), ('direction', direction))
+        self.inc(TRANSFER_BYTES, labels, size)
+        self.observe(TRANSFER_DURATION, labels, seconds)
+
+    def _get_shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            self._lock.acquire()
+            try:
+                self._retire_shards()
+                self._shards.append((threading.currentThread(), shard))
+            finally:
+                self._lock.release()
+        return shard
+
+    def _retire_shards(self):
+        # Fold the metrics of the threads which are gone (e.g. workers of
+        # request_many) so the list of shards doesn't grow forever
+        shards = []
+        for thread, shard in self._shards:
+            if thread.isAlive():
+                shards.append((thread, shard))
+            else:
+                _add(self._retired, shard)
+        self._shards = shards
+
+    def _merge(self):
+        self._lock.acquire()
+        try:
+            self._retire_shards()
+            values = {}
+            _add(values, self._retired)
+            for thread, shard in self._shards:
+                # Other threads may add keys meanwhile
+                _add(values, dict(shard))
+            return values
+        finally:
+            self._lock.release()
+
+def _add(values, shard):
+    for key, value in shard.items():
+        if isinstance(value, list):
+            if key in values:
+                values[key] = [a + b for a, b in zip(values[key], value)]
+            else:
+                values[key] = list(value)
+        else:
+            values[key] = values.get(key, 0) + value
+
+def _format_labels(labels, **extra):
+    items = sorted(labels.items()) + extra.items()
+    if not items:
+        return ''
+    return '{%s}' % (','.join([
+        '%s="%s"' % (key, str(value).replace('\\', '\\\\')
+                                      .replace('"', '\\"')
+                                      .replace('\n', '\\n'))
+        for key, value in items]))
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+def enable(registry=None):
+    """
+    Start collecting the request metrics.
+
+    @type registry: L{Registry}
+    @param registry: Registry to use, a new one is created by default.
+
+    @return: The L{Registry}.
+    """
+    global _registry
+
+    disable()
+    if registry is None:
+        registry = Registry()
+    registry.counter(REQUESTS, 'Number of API requests.')
+    registry.histogram(REQUEST_DURATION, 'Duration of the API requests.')
+    registry.counter(TRANSFER_BYTES, 'Bytes uploaded and downloaded.')
+    registry.histogram(TRANSFER_DURATION, 'Duration of the object uploads '
+                                          'and downloads.')
+    hooks.add_listener(registry.record_request)
+    _registry = registry
+    return registry
+
+def disable():
+    """
+    Stop collecting the metrics.
+    """
+    global _registry
+
+    if _registry is not None:
+        hooks.remove_listener(_registry.record_request)
+        _registry = None
+
+def get_registry():
+    """
+    Return the current L{Registry}, or C{None} if metrics are disabled.
+    """
+    return _registry
+
+def record_transfer(provider, direction, size, seconds):
+    """
+    Count an object upload or download (C{direction} is C{upload} or
+    C{download}) if metrics are enabled.
+    """
+    registry = _registry
+    if registry is not None:
+        registry.record_transfer(provider, direction, size, seconds)
@@ -0,0 +1,189 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Pools of reusable HTTP/1.1 keep-alive connections.
+
+Connections are pooled per (connection class, host, port, secure) so every
+L{ConnectionKey} talking to the same endpoint shares the already established
+TCP (and TLS) sessions.
+"""
+
+import select
+import threading
+import time
+
+__all__ = [
+    "MAX_POOL_SIZE",
+    "MAX_IDLE_TIME",
+    "ConnectionPool",
+    "get_pool",
+    "close_all"
+    ]
+
+# Maximum number of idle connections kept per endpoint
+MAX_POOL_SIZE = 10
+
+# Number of seconds after which an idle connection is closed and evicted
+MAX_IDLE_TIME = 60
+
+class ConnectionPool(object):
+    """
+    A pool of idle keep-alive connections to a single endpoint.
+
+    Connections are handed out with L{get} and handed back with L{put} once
+    the response has been fully read.  Only idle connections are tracked,
+    so the number of connections in use is not bounded by the pool.
+    """
+
+    def __init__(self, conn_cls, host, port, max_size=None,
+                 max_idle_time=None):
+        """
+        @type conn_cls: C{class}
+        @param conn_cls: httplib compatible connection class.
+
+        @type host: C{str}
+        @param host: Endpoint host name.
+
+        @type port: C{int}
+        @param port: Endpoint port.
+
+        @type max_size: C{int}
+        @param max_size: Maximum number of idle connections (defaults to
+                         MAX_POOL_SIZE).
+
+        @type max_idle_time: C{int}
+        @param max_idle_time: Seconds after which an idle connection is
+                              evicted (defaults to MAX_IDLE_TIME).
+        """
+        self.conn_cls = conn_cls
+        self.host = host
+        self.port = port
+        self.max_size = max_size or MAX_POOL_SIZE
+        self.max_idle_time = max_idle_time or MAX_IDLE_TIME
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Return an idle connection or a new one if none is available.
+
+        Connections which have been idle for too long or whose socket has
+        been closed by the server are closed and discarded.
+        """
+        now = time.time()
+        self._lock.acquire()
+        try:
+            while self._idle:
+                connection, last_used = self._idle.pop()
+                if (now - last_used > self.max_idle_time or
+                    is_connection_dropped(connection)):
+                    connection.close()
+                    continue
+                return connection
+        finally:
+            self._lock.release()
+
+        return self.conn_cls(host=self.host, port=self.port)
+
+    def put(self, connection):
+        """
+        Return a connection to the pool.
+
+        The connection is closed if the pool is already full.
+        """
+        self._lock.acquire()
+        try:
+            if len(self._idle) < self.max_size:
+                self._idle.append((connection, time.time()))
+                return
+        finally:
+            self._lock.release()
+
+        connection.close()
+
+    def close(self):
+        """
+        Close and discard all the idle connections.
+        """
+        self._lock.acquire()
+        try:
+            idle, self._idle = self._idle, []
+        finally:
+            self._lock.release()
+
+        for connection, _ in idle:
+            connection.close()
+
+    def __len__(self):
+        return len(self._idle)
+
+def is_connection_dropped(connection):
+    """
+    Return True if the peer has closed an idle keep-alive connection.
+
+    An idle HTTP connection should never be readable, so a readable socket
+    means we would only read an EOF (or garbage) from it.
+    """
+    sock = getattr(connection, 'sock', None)
+    if sock is None:
+        return False
+
+    # select can't watch file descriptors past FD_SETSIZE (usually 1024)
+    try:
+        if hasattr(select, 'poll'):
+            poller = select.poll()
+            poller.register(sock, select.POLLIN)
+            readable = poller.poll(0)
+        else:
+            readable, _, _ = select.select([sock], [], [], 0.0)
+    except (select.error, ValueError, TypeError):
+        return True
+
+    return bool(readable)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(conn_cls, host, port, secure):
+    """
+    Return the process wide pool for the provided endpoint, creating it on
+    first use.
+    """
+    key = (conn_cls, host, port, secure)
+
+    _pools_lock.acquire()
+    try:
+        pool = _pools.get(key, None)
+        if pool is None:
+            pool = ConnectionPool(conn_cls=conn_cls, host=host, port=port)
+            _pools[key] = pool
+    finally:
+        _pools_lock.release()
+
+    return pool
+
+def close_all():
+    """
+    Close all the idle connections in every pool.
+    """
+    _pools_lock.acquire()
+    try:
+        pools = _pools.values()
+    finally:
+        _pools_lock.release()
+
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,196 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Per method profiling of the compute and storage drivers.
+
+Once enabled, every call of a public L{NodeDriver} or L{StorageDriver}
+method is timed and the requests it made are counted:
+
+    from libcloud.common import profiling
+
+    profiling.enable()
+    driver.list_nodes()
+    profiling.dump(sys.stderr)
+
+Enabled with L{libcloud.enable_profiling} or the C{LIBCLOUD_PROFILE}
+environment variable, in which case the report is written at exit.
+
+Times are inclusive: a method calling another public method is charged
+for it too. Requests are charged to the innermost method which made them
+(see L{hooks.Call}). CPU time is the process' one, it is only meaningful
+for single threaded programs.
+"""
+
+import atexit
+import threading
+
+from libcloud.common import hooks
+
+__all__ = [
+    "MethodStats",
+    "Profiler",
+    "enable",
+    "disable",
+    "get_profiler",
+    "dump"
+    ]
+
+_profiler = None
+
+class MethodStats(object):
+    """
+    Aggregated calls of a driver method.
+
+    @ivar wall_time: Seconds spent in the method.
+    @ivar cpu_time: Process CPU seconds spent in the method.
+    @ivar requests: Number of requests sent by the method.
+    @ivar request_time: Seconds spent in these requests.
+    @ivar parse_time: Seconds spent reading and parsing their responses.
+    """
+
+    def __init__(self, driver, method):
+        self.driver = driver
+        self.method = method
+        self.calls = 0
+        self.errors = 0
+        self.wall_time = 0
+        self.cpu_time = 0
+        self.requests = 0
+        self.request_time = 0
+        self.parse_time = 0
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    def __repr__(self):
+        return (('<MethodStats: driver=%s, method=%s, calls=%d, '
+                 'wall_time=%.3f>')
+                % (self.driver, self.method, self.calls, self.wall_time))
+
+class Profiler(object):
+    """
+    Collects the L{MethodStats} of the profiled calls.
+    """
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def get_stats(self, driver, method):
+        key = (driver, method)
+        stats = self._stats.get(key)
+        if stats is None:
+            self._lock.acquire()
+            try:
+                stats = self._stats.setdefault(key,
+                                               MethodStats(driver, method))
+            finally:
+                self._lock.release()
+        return stats
+
+    def record_call(self, call):
+        """
+        L{hooks} call listener adding a call to the stats of its method.
+        """
+        stats = self.get_stats(call.driver, call.method)
+        self._lock.acquire()
+        try:
+            stats.calls += 1
+            if call.error is not None:
+                stats.errors += 1
+            stats.wall_time += call.duration
+            stats.cpu_time += call.cpu_time
+            for record in call.requests:
+                stats.requests += 1
+                stats.request_time += record.duration or 0
+                stats.parse_time += record.timings.get('body', 0)
+        finally:
+            self._lock.release()
+
+    def report(self):
+        """
+        Return the L{MethodStats} of every profiled method, slowest first.
+        """
+        stats = self._stats.values()
+        stats.sort(key=lambda s: s.wall_time, reverse=True)
+        return stats
+
+    def reset(self):
+        self._lock.acquire()
+        try:
+            self._stats = {}
+        finally:
+            self._lock.release()
+
+    def format(self):
+        """
+        Return the report as a text table.
+        """
+        lines = ['%-30s %-30s %6s %6s %10s %10s %8s %10s' %
+                 ('driver', 'method', 'calls', 'errors', 'wall (s)',
+                  'cpu (s)', 'requests', 'parse (s)')]
+        for stats in self.report():
+            lines.append('%-30s %-30s %6d %6d %10.3f %10.3f %8d %10.3f' %
+                         (stats.driver[:30], stats.method[:30], stats.calls,
+                          stats.errors, stats.wall_time, stats.cpu_time,
+                          stats.requests, stats.parse_time))
+        return '\n'.join(lines) + '\n'
+
+def enable(fo=None):
+    """
+    Start profiling the driver methods.
+
+    @type fo: File like object
+    @param fo: If given, the report is written to it at exit.
+
+    @return: The L{Profiler}.
+    """
+    global _profiler
+
+    if _profiler is None:
+        _profiler = Profiler()
+        hooks.add_call_listener(_profiler.record_call)
+
+    if fo is not None:
+        atexit.register(dump, fo)
+    return _profiler
+
+def disable():
+    """
+    Stop profiling, the collected stats are lost.
+    """
+    global _profiler
+
+    if _profiler is None:
+        return
+
+    hooks.remove_call_listener(_profiler.record_call)
+    _profiler = None
+
+def get_profiler():
+    """
+    Return the current L{Profiler} or C{None} if profiling is disabled.
+    """
+    return _profiler
+
+def dump(fo):
+    """
+    Write the report of the current profiler to C{fo}.
+    """
+    if _profiler is None:
+        return
+    fo.write(_profiler.format())
+    fo.flush()
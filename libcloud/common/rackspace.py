@@ -17,6 +17,7 @@
 Common utilities for Rackspace Cloud Servers and Cloud Files
 """
 import httplib
+import threading
 from urllib2 import urlparse
 from libcloud.common.base import ConnectionUserAndKey
 from libcloud.compute.types import InvalidCredsError
@@ -37,6 +38,7 @@ class RackspaceBaseConnection(ConnectionUserAndKey):
         self.auth_token = None
         self.request_path = None
         self.__host = None
+        self.__auth_lock = threading.Lock()
         super(RackspaceBaseConnection, self).__init__(
             user_id, key, secure=secure)
 
@@ -53,38 +55,50 @@ class RackspaceBaseConnection(ConnectionUserAndKey):
         request yet, do it here. Otherwise, just return the management host.
         """
         if not self.__host:
-            # Initial connection used for authentication
-            conn = self.conn_classes[self.secure](
-                self.auth_host, self.port[self.secure])
-            conn.request(
-                method='GET',
-                url='/%s' % (AUTH_API_VERSION),
-                headers={
-                    'X-Auth-User': self.user_id,
-                    'X-Auth-Key': self.key
-                }
-            )
+            # Only one thread authenticates, the others wait for the token
+            self.__auth_lock.acquire()
+            try:
+                if not self.__host:
+                    self._authenticate()
+            finally:
+                self.__auth_lock.release()
 
-            resp = conn.getresponse()
+        return self.__host
 
-            if resp.status != httplib.NO_CONTENT:
-                raise InvalidCredsError()
+    def _authenticate(self):
+        """
+        Request an auth token and the management urls for this account.
+        """
+        # Initial connection used for authentication
+        conn = self.conn_classes[self.secure](
+            self.auth_host, self.port[self.secure])
+        conn.request(
+            method='GET',
+            url='/%s' % (AUTH_API_VERSION),
+            headers={
+                'X-Auth-User': self.user_id,
+                'X-Auth-Key': self.key
+            }
+        )
 
-            headers = dict(resp.getheaders())
+        resp = conn.getresponse()
 
-            try:
-                self.server_url = headers['x-server-management-url']
-                self.storage_url = headers['x-storage-url']
-                self.cdn_management_url = headers['x-cdn-management-url']
-                self.auth_token = headers['x-auth-token']
-            except KeyError:
-                raise InvalidCredsError()
+        if resp.status != httplib.NO_CONTENT:
+            raise InvalidCredsError()
 
-            scheme, server, self.request_path, param, query, fragment = (
-                urlparse.urlparse(getattr(self, self._url_key)))
+        headers = dict(resp.getheaders())
 
-            # Set host to where we want to make further requests to;
-            self.__host = server
-            conn.close()
+        try:
+            self.server_url = headers['x-server-management-url']
+            self.storage_url = headers['x-storage-url']
+            self.cdn_management_url = headers['x-cdn-management-url']
+            self.auth_token = headers['x-auth-token']
+        except KeyError:
+            raise InvalidCredsError()
 
-        return self.__host
+        scheme, server, self.request_path, param, query, fragment = (
+            urlparse.urlparse(getattr(self, self._url_key)))
+
+        # Set host to where we want to make further requests to;
+        self.__host = server
+        conn.close()
@@ -0,0 +1,160 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Client side rate limiting with token buckets.
+
+A limiter is shared by every connection (and thread) which uses it and
+keeps a bucket per driver type, host and action name, so each region of a
+provider is limited separately.
+
+Usage:
+    from libcloud.common.ratelimit import RateLimiter
+    from libcloud.compute.drivers.ec2 import EC2Connection
+
+    # 5 requests per second with bursts of up to 20, but only one
+    # RunInstances call per second
+    EC2Connection.rate_limiter = RateLimiter(
+        rate=5, burst=20, action_rates={'RunInstances': (1, 1)})
+"""
+
+import threading
+import time
+
+from libcloud.common import hooks
+
+__all__ = [
+    "TokenBucket",
+    "RateLimiter"
+    ]
+
+class TokenBucket(object):
+    """
+    A token bucket which refills at C{rate} tokens per second up to
+    C{burst} tokens.
+
+    Tokens can be reserved ahead of time (the bucket goes negative), so
+    waiting callers are served in order instead of racing for each new
+    token.
+    """
+
+    def __init__(self, rate, burst=None, clock=time.time):
+        """
+        @type rate: C{float}
+        @param rate: Sustained number of requests per second.
+
+        @type burst: C{int}
+        @param burst: Maximum number of requests which can be sent at once
+                      (defaults to C{rate}, at least 1).
+
+        @type clock: C{callable}
+        @param clock: Function returning the current time in seconds.
+        """
+        self.rate = float(rate)
+        self.burst = burst or max(1, rate)
+        self.clock = clock
+        self._tokens = float(self.burst)
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """
+        Take C{tokens} from the bucket and return the number of seconds the
+        caller must wait before using them.
+        """
+        self._lock.acquire()
+        try:
+            now = self.clock()
+            self._tokens = min(self.burst,
+                               self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= tokens
+
+            if self._tokens >= 0:
+                return 0
+            return -self._tokens / self.rate
+        finally:
+            self._lock.release()
+
+    def acquire(self, tokens=1):
+        """
+        Take C{tokens} from the bucket, waiting until they are available.
+
+        @return: Number of seconds waited.
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            hooks.sleep(delay, 'rate_limit')
+        return delay
+
+class RateLimiter(object):
+    """
+    Keeps a L{TokenBucket} per driver type, host and action name.
+
+    The action name is given by the connection (see
+    L{ConnectionKey.get_rate_limit_name}); actions without a rate of
+    their own share the default bucket of their endpoint.
+    """
+
+    def __init__(self, rate, burst=None, action_rates=None,
+                 clock=time.time):
+        """
+        @type rate: C{float}
+        @param rate: Default number of requests per second per endpoint.
+
+        @type burst: C{int}
+        @param burst: Default burst size.
+
+        @type action_rates: C{dict}
+        @param action_rates: Maps an action name to a (rate, burst) tuple.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.action_rates = action_rates or {}
+        self.clock = clock
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def get_bucket(self, driver_type, host, name=None):
+        """
+        Return the bucket for an endpoint and action, creating it on first
+        use.
+        """
+        if name not in self.action_rates:
+            name = None
+
+        key = (driver_type, host, name)
+        self._lock.acquire()
+        try:
+            bucket = self._buckets.get(key, None)
+            if bucket is None:
+                if name is None:
+                    rate, burst = self.rate, self.burst
+                else:
+                    rate, burst = self.action_rates[name]
+                bucket = TokenBucket(rate, burst, clock=self.clock)
+                self._buckets[key] = bucket
+        finally:
+            self._lock.release()
+
+        return bucket
+
+    def acquire(self, driver_type, host, name=None):
+        """
+        Wait until a request can be sent to an endpoint.
+
+        @return: Number of seconds waited.
+        """
+        return self.get_bucket(driver_type, host, name).acquire()
@@ -0,0 +1,277 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Cached host name resolution and "happy eyeballs" connection racing.
+
+Every connection resolves the provider's host name through a process wide
+L{Resolver} which caches the addresses, and L{create_connection} races the
+resolved addresses so a single slow or unreachable address doesn't stall
+the request.
+"""
+
+import errno
+import select
+import socket
+import threading
+import time
+
+__all__ = [
+    "DEFAULT_TTL",
+    "ATTEMPT_DELAY",
+    "Resolver",
+    "get_resolver",
+    "set_resolver",
+    "create_connection"
+    ]
+
+# Number of seconds resolved addresses are cached for
+DEFAULT_TTL = 60
+
+# Number of seconds to wait for a connection attempt before also trying the
+# next address
+ATTEMPT_DELAY = 0.25
+
+_IN_PROGRESS = (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY)
+
+class Resolver(object):
+    """
+    Resolves host names with C{getaddrinfo} and caches the results.
+
+    The system resolver doesn't expose the records' TTLs, so addresses are
+    cached for a fixed C{ttl}.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, getaddrinfo=socket.getaddrinfo,
+                 clock=time.time):
+        """
+        @type ttl: C{float}
+        @param ttl: Number of seconds addresses are cached for.
+
+        @type getaddrinfo: C{callable}
+        @param getaddrinfo: Function with the signature of
+                            C{socket.getaddrinfo} used to resolve names.
+
+        @type clock: C{callable}
+        @param clock: Function returning the current time in seconds.
+        """
+        self.ttl = ttl
+        self.getaddrinfo = getaddrinfo
+        self.clock = clock
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host, port):
+        """
+        Return the C{getaddrinfo} entries for a TCP connection to
+        C{host}:C{port}.
+        """
+        key = (host, port)
+        now = self.clock()
+
+        self._lock.acquire()
+        try:
+            entry = self._cache.get(key, None)
+        finally:
+            self._lock.release()
+
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        addresses = self.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+
+        self._lock.acquire()
+        try:
+            self._cache[key] = (now + self.ttl, addresses)
+        finally:
+            self._lock.release()
+
+        return addresses
+
+    def invalidate(self, host=None):
+        """
+        Forget the cached addresses of C{host} (of all hosts if None).
+        """
+        self._lock.acquire()
+        try:
+            if host is None:
+                self._cache.clear()
+            else:
+                for key in self._cache.keys():
+                    if key[0] == host:
+                        del self._cache[key]
+        finally:
+            self._lock.release()
+
+_resolver = Resolver()
+
+def get_resolver():
+    """
+    Return the process wide resolver.
+    """
+    return _resolver
+
+def set_resolver(resolver):
+    """
+    Replace the process wide resolver (e.g. with one using a stub
+    C{getaddrinfo}).
+    """
+    global _resolver
+    _resolver = resolver
+
+def _interleave(addresses):
+    """
+    Alternate between address families, starting with the first one
+    returned by the resolver (RFC 6555).
+    """
+    families = []
+    by_family = {}
+    for address in addresses:
+        family = address[0]
+        if family not in by_family:
+            families.append(family)
+            by_family[family] = []
+        by_family[family].append(address)
+
+    result = []
+    while len(result) < len(addresses):
+        for family in families:
+            if by_family[family]:
+                result.append(by_family[family].pop(0))
+    return result
+
+def create_connection(address, timeout=None, source_address=None,
+                      resolver=None, attempt_delay=ATTEMPT_DELAY,
+                      record=None):
+    """
+    Connect to C{address} and return the socket, like
+    C{socket.create_connection}.
+
+    A new attempt on the next resolved address is started every
+    C{attempt_delay} seconds (or as soon as an attempt fails) while the
+    previous ones are still in progress; the first one to succeed wins.
+
+    @type address: C{tuple}
+    @param address: (host, port) tuple.
+
+    @type timeout: C{float}
+    @param timeout: Timeout for the whole connection and of the returned
+                    socket. If None, the default socket timeout is used.
+
+    @type resolver: L{Resolver}
+    @param resolver: Resolver to use (defaults to the process wide one).
+
+    @type record: L{RequestRecord}
+    @param record: Optional record the resolve and connect timings are
+                   added to.
+    """
+    host, port = address
+    if timeout is None or timeout is getattr(socket,
+                                             '_GLOBAL_DEFAULT_TIMEOUT', None):
+        timeout = socket.getdefaulttimeout()
+    resolver = resolver or get_resolver()
+
+    started = time.time()
+    addresses = _interleave(resolver.resolve(host, port))
+    if not addresses:
+        raise socket.error('getaddrinfo returns an empty list')
+
+    resolved = time.time()
+    if record is not None:
+        record.add_timing('resolve', resolved - started)
+
+    if timeout is not None:
+        deadline = resolved + timeout
+    else:
+        deadline = None
+
+    pending = {}
+    error = None
+    try:
+        while addresses or pending:
+            if addresses:
+                family, socktype, proto, _, sockaddr = addresses.pop(0)
+                sock = socket.socket(family, socktype, proto)
+                try:
+                    if source_address:
+                        sock.bind(source_address)
+                    sock.setblocking(0)
+                    code = sock.connect_ex(sockaddr)
+                except socket.error, e:
+                    sock.close()
+                    error = e
+                    continue
+
+                if code == 0:
+                    return _connected(sock, timeout, record, resolved)
+                if code not in _IN_PROGRESS:
+                    sock.close()
+                    error = socket.error(code, errno.errorcode.get(code, ''))
+                    continue
+                pending[sock] = sockaddr
+
+            if addresses:
+                wait = attempt_delay
+            else:
+                wait = None
+            if deadline is not None:
+                remaining = max(0, deadline - time.time())
+                if wait is None or remaining < wait:
+                    wait = remaining
+
+            for sock in _wait_writable(pending.keys(), wait):
+                del pending[sock]
+                code = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if code == 0:
+                    return _connected(sock, timeout, record, resolved)
+                sock.close()
+                error = socket.error(code, errno.errorcode.get(code, ''))
+
+            if deadline is not None and time.time() >= deadline:
+                raise socket.timeout('timed out')
+    finally:
+        for sock in pending:
+            sock.close()
+
+    resolver.invalidate(host)
+    raise error
+
+def _wait_writable(socks, timeout):
+    """
+    Return the sockets which are writable (connected) or failed within
+    C{timeout} seconds (forever if None).
+
+    Uses poll where available: select can't watch file descriptors past
+    FD_SETSIZE (usually 1024).
+    """
+    if not hasattr(select, 'poll'):
+        _, writable, failed = select.select([], socks, socks, timeout)
+        return list(set(writable + failed))
+
+    poller = select.poll()
+    socks_by_fd = {}
+    for sock in socks:
+        socks_by_fd[sock.fileno()] = sock
+        poller.register(sock, select.POLLOUT)
+    if timeout is not None:
+        timeout = timeout * 1000
+    return [socks_by_fd[fd] for fd, _ in poller.poll(timeout)]
+
+def _connected(sock, timeout, record, resolved):
+    sock.setblocking(1)
+    sock.settimeout(timeout)
+    if record is not None:
+        record.add_timing('connect', time.time() - resolved)
+    return sock
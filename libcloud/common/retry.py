@@ -0,0 +1,161 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Retry policy with jittered exponential backoff and a retry budget.
+
+Usage:
+    from libcloud.common.retry import RetryPolicy
+    from libcloud.compute.drivers.ec2 import EC2Connection
+
+    EC2Connection.retry_policy = RetryPolicy(max_retries=5)
+"""
+
+import httplib
+import random
+import threading
+
+__all__ = [
+    "IDEMPOTENT_METHODS",
+    "THROTTLING_STATUSES",
+    "TRANSIENT_STATUSES",
+    "RetryPolicy"
+    ]
+
+IDEMPOTENT_METHODS = ['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS']
+
+# Provider is throttling us (e.g. EC2 RequestLimitExceeded is returned as
+# a 503). The request has not been processed so any method can be retried.
+THROTTLING_STATUSES = [429, httplib.SERVICE_UNAVAILABLE]
+
+# Transient server side errors, only idempotent requests are retried.
+TRANSIENT_STATUSES = [httplib.INTERNAL_SERVER_ERROR, httplib.BAD_GATEWAY,
+                      httplib.GATEWAY_TIMEOUT]
+
+class RetryPolicy(object):
+    """
+    Decides if and when a failed request is retried.
+
+    The retry budget is a token bucket shared by all the requests which use
+    this policy: every retry takes a token and every request which doesn't
+    need to be retried gives back C{budget_ratio} of a token. When a
+    provider is browning out the budget runs dry and requests fail fast
+    instead of multiplying the load.
+    """
+
+    def __init__(self, max_retries=3, backoff_base=0.5, backoff_max=30,
+                 retry_budget=10, budget_ratio=0.1):
+        """
+        @type max_retries: C{int}
+        @param max_retries: Maximum number of retries of a single request.
+
+        @type backoff_base: C{float}
+        @param backoff_base: Backoff before the first retry (in seconds),
+                             doubled for every subsequent retry.
+
+        @type backoff_max: C{float}
+        @param backoff_max: Maximum backoff (in seconds).
+
+        @type retry_budget: C{int}
+        @param retry_budget: Maximum number of tokens in the retry budget.
+
+        @type budget_ratio: C{float}
+        @param budget_ratio: Tokens returned to the budget per request which
+                             didn't need to be retried.
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_budget = retry_budget
+        self.budget_ratio = budget_ratio
+        self._tokens = float(retry_budget)
+        self._lock = threading.Lock()
+
+    def should_retry(self, method, attempt, status=None, error=None):
+        """
+        Return True if a request should be retried and take a token from
+        the retry budget.
+
+        @type method: C{str}
+        @param method: HTTP method of the request.
+
+        @type attempt: C{int}
+        @param attempt: Number of retries done so far.
+
+        @type status: C{int}
+        @param status: Response status code or C{None} if the request failed
+                       with an exception.
+
+        @type error: C{Exception}
+        @param error: Exception raised while sending the request or reading
+                      the response.
+        """
+        if attempt >= self.max_retries:
+            return False
+
+        if status in THROTTLING_STATUSES:
+            retryable = True
+        elif status in TRANSIENT_STATUSES or error is not None:
+            retryable = method.upper() in IDEMPOTENT_METHODS
+        else:
+            retryable = False
+
+        if not retryable:
+            return False
+
+        self._lock.acquire()
+        try:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+        finally:
+            self._lock.release()
+
+        return True
+
+    def record_success(self):
+        """
+        Give a fraction of a token back to the retry budget.
+        """
+        self._lock.acquire()
+        try:
+            self._tokens = min(self.retry_budget,
+                               self._tokens + self.budget_ratio)
+        finally:
+            self._lock.release()
+
+    def get_delay(self, attempt, retry_after=None):
+        """
+        Return the number of seconds to wait before the next retry.
+
+        Uses "full jitter": a random delay between zero and the exponential
+        backoff, so clients which were throttled together don't retry
+        together. A C{Retry-After} value sent by the provider takes
+        precedence (up to C{backoff_max}).
+
+        @type attempt: C{int}
+        @param attempt: Number of retries done so far.
+
+        @type retry_after: C{str}
+        @param retry_after: Value of the Retry-After response header.
+        """
+        if retry_after:
+            try:
+                return min(self.backoff_max, float(retry_after))
+            except ValueError:
+                pass
+
+        backoff = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, backoff)
@@ -0,0 +1,298 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Wall clock traces of the driver calls.
+
+Once enabled, every top level call of a public L{NodeDriver} or
+L{StorageDriver} method is turned into a tree of L{Span}s which is handed
+to a sink:
+
+    from libcloud.common import tracing
+
+    tracing.enable(tracing.TextSink(sys.stderr))
+    driver.deploy_node(...)
+
+which writes something like:
+
+    deploy_node                                 0.000s  312.402s
+      create_node                               0.000s    2.113s
+        POST /servers 202                       0.001s    2.110s
+          sign                                  0.001s    0.000s
+          wait                                  0.001s    2.052s
+          body                                  2.053s    0.057s
+      public_ip                                 2.113s    3.000s
+      list_nodes                                5.113s    0.540s
+      ...
+
+with the start offset and the duration of each span. A sink is any
+callable taking the root span, see L{MemorySink}, L{TextSink} and
+L{JSONSink}.
+
+Spans are built from the L{hooks.Call} trees:
+ - C{call}: a public driver method,
+ - C{request}: a request made by it, with a C{phase} child for each of the
+   L{hooks.PHASES} (signing, connecting, waiting for the response and
+   reading and parsing the body),
+ - C{sleep}: a wait done with L{hooks.sleep}, e.g. while polling a task.
+
+The phases of a request are laid out one after the other from its start,
+retries are folded into them.
+"""
+
+import random
+
+from libcloud.common import hooks
+from libcloud.common import jsoncodec
+
+__all__ = [
+    "Span",
+    "Tracer",
+    "MemorySink",
+    "TextSink",
+    "JSONSink",
+    "build_span",
+    "format_span",
+    "enable",
+    "disable",
+    "get_tracer"
+    ]
+
+_tracer = None
+_random = random.Random()
+
+class Span(object):
+    """
+    A timed operation.
+
+    @ivar kind: C{call}, C{request}, C{phase} or C{sleep}.
+    @ivar start: Start time (seconds since the epoch).
+    @ivar duration: Duration in seconds.
+    @ivar attributes: C{dict} describing the operation.
+    @ivar error: Exception raised by the operation, if any.
+    @ivar trace_id: Id shared by all the spans of a tree.
+    """
+
+    def __init__(self, name, kind, start, duration, parent=None,
+                 attributes=None, error=None):
+        self.name = name
+        self.kind = kind
+        self.start = start
+        self.duration = duration or 0
+        self.parent = parent
+        self.attributes = attributes or {}
+        self.error = error
+        self.children = []
+        self.span_id = _new_id()
+
+        if parent is not None:
+            self.trace_id = parent.trace_id
+            parent.children.append(self)
+        else:
+            self.trace_id = _new_id() + _new_id()
+
+    def iter_spans(self):
+        """
+        Yield this span and all its descendants, depth first.
+        """
+        yield self
+        for child in self.children:
+            for span in child.iter_spans():
+                yield span
+
+    def to_dict(self):
+        """
+        Return the span and its children as a JSON serializable C{dict}.
+        """
+        data = {'name': self.name, 'kind': self.kind,
+                'trace_id': self.trace_id, 'span_id': self.span_id,
+                'parent_id': self.parent and self.parent.span_id or None,
+                'start': self.start, 'duration': self.duration,
+                'attributes': self.attributes,
+                'children': [child.to_dict() for child in self.children]}
+        if self.error is not None:
+            data['error'] = '%s: %s' % (self.error.__class__.__name__,
+                                        self.error)
+        return data
+
+    def __repr__(self):
+        return (('<Span: name=%s, kind=%s, duration=%.3f, children=%d>')
+                % (self.name, self.kind, self.duration, len(self.children)))
+
+def _new_id():
+    return '%016x' % (_random.getrandbits(64))
+
+def build_span(item, parent=None):
+    """
+    Return the span tree of a L{hooks.Call} or L{hooks.RequestRecord}.
+    """
+    if isinstance(item, hooks.RequestRecord):
+        return _request_span(item, parent)
+
+    span = Span(item.method, 'call', item.start, item.duration, parent,
+                {'driver': item.driver}, item.error)
+
+    # Children in the order they started
+    items = [(call.start, 0, call) for call in item.children]
+    items.extend([(record.start, 1, record) for record in item.requests])
+    items.extend([(sleep[1], 2, sleep) for sleep in item.sleeps])
+    items.sort(key=lambda i: (i[0], i[1]))
+
+    for start, order, child in items:
+        if order == 2:
+            reason, start, duration = child
+            Span(reason or 'sleep', 'sleep', start, duration, span)
+        else:
+            build_span(child, span)
+    return span
+
+def _request_span(record, parent):
+    line = '%s %s' % (record.method, record.action)
+    if not record.operation.startswith(record.method):
+        # Name of the call for APIs with a single endpoint
+        line = '%s (%s)' % (line, record.operation)
+    if record.status is not None:
+        line = '%s %s' % (line, record.status)
+
+    span = Span(line, 'request', record.start, record.duration, parent,
+                {'driver': record.driver, 'method': record.method,
+                 'action': record.action, 'operation': record.operation,
+                 'status': record.status, 'attempts': record.attempts,
+                 'bytes_sent': record.bytes_sent,
+                 'bytes_received': record.bytes_received},
+                record.error)
+
+    offset = record.start
+    for phase in hooks.PHASES:
+        seconds = record.timings.get(phase)
+        if seconds is None:
+            continue
+        Span(phase, 'phase', offset, seconds, span)
+        offset += seconds
+    return span
+
+def format_span(span):
+    """
+    Return a span tree as text, with the start offset (from the root span)
+    and the duration of each span.
+    """
+    lines = []
+    for child, depth in _iter_depth(span, 0):
+        name = '%s%s' % ('  ' * depth, child.name)
+        line = '%-42s %8.3fs %8.3fs' % (name, child.start - span.start,
+                                        child.duration)
+        if child.error is not None:
+            line += ' %s' % (child.error.__class__.__name__)
+        lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+def _iter_depth(span, depth):
+    yield span, depth
+    for child in span.children:
+        for item in _iter_depth(child, depth + 1):
+            yield item
+
+class MemorySink(object):
+    """
+    Keeps the root spans in C{spans}.
+    """
+
+    def __init__(self):
+        self.spans = []
+
+    def __call__(self, span):
+        self.spans.append(span)
+
+class TextSink(object):
+    """
+    Writes the span trees to a file like object (see L{format_span}).
+    """
+
+    def __init__(self, fo):
+        self.fo = fo
+
+    def __call__(self, span):
+        self.fo.write(format_span(span))
+        self.fo.flush()
+
+class JSONSink(object):
+    """
+    Writes every span tree to a file like object as a line of JSON (see
+    L{Span.to_dict}).
+    """
+
+    def __init__(self, fo):
+        self.fo = fo
+
+    def __call__(self, span):
+        self.fo.write(jsoncodec.dumps(span.to_dict(), default=str) + '\n')
+        self.fo.flush()
+
+class Tracer(object):
+    """
+    Hands the span tree of every top level driver call to C{sink}.
+
+    Requests made outside of a driver call are traced on their own.
+    """
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    def start(self):
+        hooks.add_call_listener(self._on_call)
+        hooks.add_listener(self._on_request)
+        return self
+
+    def stop(self):
+        hooks.remove_listener(self._on_request)
+        hooks.remove_call_listener(self._on_call)
+
+    def _on_call(self, call):
+        if call.parent is None:
+            self.sink(build_span(call))
+
+    def _on_request(self, record):
+        if hooks.get_current_call() is None:
+            self.sink(build_span(record))
+
+def enable(sink):
+    """
+    Start tracing the driver calls.
+
+    @param sink: Callable called with the root L{Span} of every trace.
+
+    @return: The L{Tracer}.
+    """
+    global _tracer
+
+    disable()
+    _tracer = Tracer(sink).start()
+    return _tracer
+
+def disable():
+    """
+    Stop tracing.
+    """
+    global _tracer
+
+    if _tracer is not None:
+        _tracer.stop()
+        _tracer = None
+
+def get_tracer():
+    """
+    Return the current L{Tracer}, or C{None} if tracing is disabled.
+    """
+    return _tracer
@@ -0,0 +1,162 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+XML parser used for the responses of the XML drivers.
+
+The responses are parsed with L{fromstring} and L{iterparse}, which use
+the first available implementation of the ElementTree API from
+L{BACKENDS}:
+ - C{cElementTree}: the C accelerated ElementTree of the standard library,
+ - C{lxml}: lxml, when installed,
+ - C{ElementTree}: the pure Python ElementTree.
+
+All of them return elements with the ElementTree API and the
+C{{namespace}tag} notation, so the drivers work the same with any of them.
+Another backend can be picked with L{set_backend} or the
+C{LIBCLOUD_XML_PARSER} environment variable:
+
+    from libcloud.common import xmlparser
+
+    xmlparser.set_backend('lxml')
+
+Request bodies are still built with C{xml.etree.ElementTree}.
+"""
+
+import threading
+
+from xml.parsers.expat import ExpatError
+
+__all__ = [
+    "BACKENDS",
+    "PARSE_ERRORS",
+    "Backend",
+    "load_backend",
+    "get_available_backends",
+    "set_backend",
+    "get_backend",
+    "fromstring",
+    "iterparse"
+    ]
+
+# In order of preference
+BACKENDS = ['cElementTree', 'lxml', 'ElementTree']
+
+# Raised by the backends on malformed documents (ParseError, lxml's
+# XMLSyntaxError and older ElementTree versions' ExpatError)
+PARSE_ERRORS = (SyntaxError, ExpatError)
+
+_backend = None
+
+class Backend(object):
+    """
+    An ElementTree implementation.
+
+    @ivar fromstring: Function parsing a string into an element.
+    @ivar iterparse: Function incrementally parsing a file like object, with
+                     the signature of C{ElementTree.iterparse}.
+    """
+
+    def __init__(self, name, fromstring, iterparse):
+        self.name = name
+        self.fromstring = fromstring
+        self.iterparse = iterparse
+
+    def __repr__(self):
+        return '<Backend: name=%s>' % (self.name)
+
+def load_backend(name):
+    """
+    Return the L{Backend} called C{name}.
+
+    @raise ImportError: If the backend isn't installed.
+    """
+    if name == 'cElementTree':
+        from xml.etree import cElementTree
+        return Backend(name, cElementTree.XML, cElementTree.iterparse)
+
+    if name == 'ElementTree':
+        from xml.etree import ElementTree
+        return Backend(name, ElementTree.XML, ElementTree.iterparse)
+
+    if name == 'lxml':
+        from lxml import etree
+        # Parsers can't be shared between threads
+        local = threading.local()
+
+        def fromstring(text):
+            parser = getattr(local, 'parser', None)
+            if parser is None:
+                parser = local.parser = etree.XMLParser(
+                    resolve_entities=False)
+            return etree.fromstring(text, parser)
+
+        def iterparse(source, events=('end',)):
+            return etree.iterparse(source, events=events,
+                                   resolve_entities=False)
+
+        return Backend(name, fromstring, iterparse)
+
+    raise ValueError('Unknown XML parser backend: %s' % (name))
+
+def get_available_backends():
+    """
+    Return the names of the installed backends, in order of preference.
+    """
+    available = []
+    for name in BACKENDS:
+        try:
+            load_backend(name)
+        except ImportError:
+            continue
+        available.append(name)
+    return available
+
+def set_backend(name=None):
+    """
+    Parse the responses with the backend called C{name}, or the preferred
+    available one if C{name} is None.
+
+    @raise ImportError: If the backend isn't installed.
+
+    @return: The L{Backend}.
+    """
+    global _backend
+
+    if name is None:
+        name = get_available_backends()[0]
+    _backend = load_backend(name)
+    return _backend
+
+def get_backend():
+    """
+    Return the L{Backend} in use.
+    """
+    if _backend is None:
+        return set_backend()
+    return _backend
+
+def fromstring(text):
+    """
+    Parse an XML document and return its root element.
+    """
+    return (_backend or get_backend()).fromstring(text)
+
+def iterparse(source, events=('end',)):
+    """
+    Incrementally parse the XML document read from the file like object
+    C{source}, see C{ElementTree.iterparse}.
+    """
+    return (_backend or get_backend()).iterparse(source, events=events)
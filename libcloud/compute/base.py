@@ -28,6 +28,7 @@ from libcloud.compute.ssh import SSHClient
 
 # @@TR: are the imports below part of the public api for this
 # module? They aren't used in here ...
+from libcloud.common import hooks
 from libcloud.common.base import ConnectionKey, ConnectionUserAndKey
 from libcloud.httplib_ssl import LibcloudHTTPSConnection
 from libcloud.common.base import LibcloudHTTPConnection
@@ -514,7 +515,7 @@ class NodeDriver(object):
                 while time.time() < end:
                     # need to wait until we get a public IP address.
                     # TODO: there must be a better way of doing this
-                    time.sleep(WAIT_PERIOD)
+                    hooks.sleep(WAIT_PERIOD, 'public_ip')
                     nodes = self.list_nodes()
                     nodes = filter(lambda n: n.uuid == node.uuid, nodes)
                     if len(nodes) == 0:
@@ -549,7 +550,7 @@ class NodeDriver(object):
                             break
                         except (IOError, socket.gaierror, socket.error), e:
                             laste = e
-                            time.sleep(WAIT_PERIOD)
+                            hooks.sleep(WAIT_PERIOD, 'ssh')
                             if laste is not None:
                                 raise e
 
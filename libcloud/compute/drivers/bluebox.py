@@ -26,11 +26,7 @@ import copy
 import urllib
 import base64
 
-try:
-    import json
-except:
-    import simplejson as json
-
+from libcloud.common import jsoncodec
 from libcloud.common.base import Response, ConnectionUserAndKey
 from libcloud.compute.providers import Provider
 from libcloud.compute.types import NodeState, InvalidCredsError
@@ -86,7 +82,7 @@ NODE_STATE_MAP = { 'queued': NodeState.PENDING,
 class BlueboxResponse(Response):
     def parse_body(self):
         try:
-            js = json.loads(self.body)
+            js = jsoncodec.loads(self.body)
             return js
         except ValueError:
             return self.body
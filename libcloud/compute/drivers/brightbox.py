@@ -17,17 +17,14 @@ Brightbox Driver
 """
 import httplib
 import base64
+import threading
 
+from libcloud.common import jsoncodec
 from libcloud.common.base import ConnectionUserAndKey, Response
 from libcloud.compute.types import Provider, NodeState, InvalidCredsError
 from libcloud.compute.base import NodeDriver
 from libcloud.compute.base import Node, NodeImage, NodeSize, NodeLocation
 
-try:
-    import json
-except ImportError:
-    import simplejson as json
-
 API_VERSION = '1.0'
 
 
@@ -37,12 +34,12 @@ class BrightboxResponse(Response):
 
     def parse_body(self):
         if self.headers['content-type'].split('; ')[0] == 'application/json' and len(self.body) > 0:
-            return json.loads(self.body)
+            return jsoncodec.loads(self.body)
         else:
             return self.body
 
     def parse_error(self):
-        return json.loads(self.body)['error']
+        return jsoncodec.loads(self.body)['error']
 
 
 class BrightboxConnection(ConnectionUserAndKey):
@@ -52,43 +49,58 @@ class BrightboxConnection(ConnectionUserAndKey):
 
     host = 'api.gb1.brightbox.com'
     responseCls = BrightboxResponse
+    token = None
+
+    def __init__(self, *args, **kwargs):
+        self._auth_lock = threading.Lock()
+        super(BrightboxConnection, self).__init__(*args, **kwargs)
 
     def _fetch_oauth_token(self):
-        body = json.dumps({'client_id': self.user_id, 'grant_type': 'none'})
+        body = jsoncodec.dumps({'client_id': self.user_id, 'grant_type': 'none'})
 
         authorization = 'Basic ' + base64.encodestring('%s:%s' % (self.user_id, self.key)).rstrip()
 
-        self.connect()
-
-        response = self.connection.request(method='POST', url='/token', body=body, headers={
-            'Host': self.host,
-            'User-Agent': self._user_agent(),
-            'Authorization': authorization,
-            'Content-Type': 'application/json',
-            'Content-Length': str(len(body))
-        })
-
-        response = self.connection.getresponse()
+        # Not a pooled connection, the token is fetched while the request
+        # which needs it is being prepared
+        conn = self.conn_classes[self.secure](self.host,
+                                              self.port[self.secure])
+        try:
+            conn.request(method='POST', url='/token', body=body, headers={
+                'Host': self.host,
+                'User-Agent': self._user_agent(),
+                'Authorization': authorization,
+                'Content-Type': 'application/json',
+                'Content-Length': str(len(body))
+            })
+
+            response = conn.getresponse()
+            body = response.read()
+        finally:
+            conn.close()
 
         if response.status == 200:
-            return json.loads(response.read())['access_token']
+            return jsoncodec.loads(body)['access_token']
         else:
-            message = '%s (%s)' % (json.loads(response.read())['error'], response.status)
+            message = '%s (%s)' % (jsoncodec.loads(body)['error'], response.status)
 
             raise InvalidCredsError, message
 
     def add_default_headers(self, headers):
-        try:
-            headers['Authorization'] = 'OAuth ' + self.token
-        except AttributeError:
-            self.token = self._fetch_oauth_token()
+        if self.token is None:
+            # Only one thread fetches the token, the others wait for it
+            self._auth_lock.acquire()
+            try:
+                if self.token is None:
+                    self.token = self._fetch_oauth_token()
+            finally:
+                self._auth_lock.release()
 
-            headers['Authorization'] = 'OAuth ' + self.token
+        headers['Authorization'] = 'OAuth ' + self.token
 
         return headers
 
     def encode_data(self, data):
-        return json.dumps(data)
+        return jsoncodec.dumps(data)
 
 
 class BrightboxNodeDriver(NodeDriver):
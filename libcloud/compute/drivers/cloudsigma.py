@@ -20,8 +20,10 @@ import re
 import time
 import base64
 
-from libcloud.utils import str2dicts, str2list, dict2str
+from libcloud.utils import str2dicts, str2list, dict2str, iter_str2dicts
+from libcloud.common import hooks
 from libcloud.common.base import ConnectionUserAndKey, Response
+from libcloud.common.base import StreamingResponse
 from libcloud.common.types import InvalidCredsError
 from libcloud.compute.types import NodeState, Provider
 from libcloud.compute.base import NodeDriver, NodeSize, Node
@@ -236,10 +238,8 @@ class CloudSigmaBaseNodeDriver(NodeDriver):
         """
         Return a list of available standard images (this call might take up to 15 seconds to return).
         """
-        response = self.connection.request(action = '/drives/standard/info').object
-
         images = []
-        for value in response:
+        for value in self._iter_records('/drives/standard/info'):
             if value.get('type'):
                 if value['type'] == 'disk':
                     image = NodeImage(id = value['drive'], name = value['name'], driver = self.connection.driver,
@@ -267,14 +267,24 @@ class CloudSigmaBaseNodeDriver(NodeDriver):
         """
         Return a list of nodes.
         """
-        response = self.connection.request(action = '/servers/info').object
+        return list(self.iter_nodes())
+
+    def iter_nodes(self):
+        """
+        Yield the nodes as their description is read from the response,
+        instead of loading the whole list first.
+
+        Breaking out of the loop closes the connection.
 
-        nodes = []
-        for data in response:
+        @note: This is a non-standard extension API, and
+               only works for CloudSigma.
+
+        @return: A generator of L{Node} objects.
+        """
+        for data in self._iter_records('/servers/info'):
             node = self._to_node(data)
             if node:
-                nodes.append(node)
-        return nodes
+                yield node
 
     def create_node(self, **kwargs):
         """
@@ -321,7 +331,7 @@ class CloudSigmaBaseNodeDriver(NodeDriver):
             elapsed_time = time.time() - imaging_start
             if response[0].has_key('imaging') and elapsed_time >= IMAGING_TIMEOUT:
                 raise CloudSigmaException('Drive imaging timed out')
-            time.sleep(1)
+            hooks.sleep(1, 'imaging')
 
         node_data = {}
         node_data.update({'name': kwargs['name'], 'cpu': size.cpu, 'mem': size.ram, 'ide:0:0': drive_uuid,
@@ -389,10 +399,7 @@ class CloudSigmaBaseNodeDriver(NodeDriver):
         """
         Return a list of all the available drives.
         """
-        response = self.connection.request(action = '/drives/info', method = 'GET')
-
-        result = str2dicts(response.body)
-        return result
+        return list(self._iter_records('/drives/info'))
 
     def ex_static_ip_create(self):
         """
@@ -533,6 +540,25 @@ class CloudSigmaBaseNodeDriver(NodeDriver):
 
         return node[0]
 
+    def _iter_records(self, action):
+        """
+        Yield the records of a listing one by one as they are read from the
+        response.
+        """
+        response = self.connection.request(action = action, stream = True)
+
+        if not isinstance(response, StreamingResponse):
+            # Empty bodies are parsed as usual
+            for data in response.object or []:
+                yield data
+            return
+
+        try:
+            for data in iter_str2dicts(response.iter_lines()):
+                yield data
+        finally:
+            response.close()
+
     def _get_node_info(self, node):
         response = self.connection.request(action = '/servers/%s/info' % (node.id))
 
@@ -16,13 +16,9 @@
 DreamHost Driver
 """
 
-try:
-    import json
-except:
-    import simplejson as json
-
 import copy
 
+from libcloud.common import jsoncodec
 from libcloud.pricing import get_pricing
 from libcloud.common.base import ConnectionKey, Response
 from libcloud.common.types import InvalidCredsError
@@ -88,7 +84,7 @@ class DreamhostResponse(Response):
     """
 
     def parse_body(self):
-        resp = json.loads(self.body)
+        resp = jsoncodec.loads(self.body)
         if resp['result'] != 'success':
             raise Exception(self._api_parse_error(resp))
         return resp['data']
@@ -24,9 +24,9 @@ import urllib
 import copy
 
 from hashlib import sha256
-from xml.etree import ElementTree as ET
 
-from libcloud.utils import fixxpath, findtext, findattr, findall
+from libcloud.utils import fixxpath, findtext, findattr, findall, findtexts
+from libcloud.common import xmlparser
 from libcloud.common.base import ConnectionUserAndKey
 from libcloud.common.aws import AWSBaseResponse
 from libcloud.common.types import InvalidCredsError, MalformedResponseError, LibcloudError
@@ -161,7 +161,7 @@ class EC2Response(AWSBaseResponse):
             raise InvalidCredsError(msg)
 
         try:
-            body = ET.XML(self.body)
+            body = xmlparser.fromstring(self.body)
         except:
             raise MalformedResponseError("Failed to parse XML", body=self.body, driver=EC2NodeDriver)
 
@@ -198,6 +198,12 @@ class EC2Connection(ConnectionUserAndKey):
         params['Signature'] = self._get_aws_auth_param(params, self.key, self.action)
         return params
 
+    def get_operation_name(self, action, params, method):
+        return params.get('Action', method)
+
+    def get_rate_limit_name(self, action, params, method):
+        return params.get('Action', None)
+
     def _get_aws_auth_param(self, params, secret_key, path='/'):
         """
         Creates the signature required for AWS, per
@@ -254,6 +260,7 @@ class EC2NodeDriver(NodeDriver):
     path = '/'
 
     _instance_types = EC2_US_EAST_INSTANCE_TYPES
+    _elastic_ips = True
 
     NODE_STATE_MAP = {
         'pending': NodeState.PENDING,
@@ -288,57 +295,39 @@ class EC2NodeDriver(NodeDriver):
                  for el in object.findall(fixxpath(xpath=xpath, namespace=NAMESPACE)) ]
 
     def _to_node(self, element, groups=None):
+        # A single pass over the instance rather than a search per field
+        texts = findtexts(element=element, namespace=NAMESPACE)
         try:
-            state = self.NODE_STATE_MAP[
-                findattr(element=element, xpath="instanceState/name",
-                         namespace=NAMESPACE)
-            ]
+            state = self.NODE_STATE_MAP[texts.get('instanceState/name')]
         except KeyError:
             state = NodeState.UNKNOWN
 
         n = Node(
-            id=findtext(element=element, xpath='instanceId',
-                        namespace=NAMESPACE),
-            name=findtext(element=element, xpath='instanceId',
-                          namespace=NAMESPACE),
+            id=texts.get('instanceId'),
+            name=texts.get('instanceId'),
             state=state,
-            public_ip=[findtext(element=element, xpath='ipAddress',
-                                namespace=NAMESPACE)],
-            private_ip=[findtext(element=element, xpath='privateIpAddress',
-                                 namespace=NAMESPACE)],
+            public_ip=[texts.get('ipAddress')],
+            private_ip=[texts.get('privateIpAddress')],
             driver=self.connection.driver,
             extra={
-                'dns_name': findattr(element=element, xpath="dnsName",
-                                     namespace=NAMESPACE),
-                'instanceId': findattr(element=element, xpath="instanceId",
-                                       namespace=NAMESPACE),
-                'imageId': findattr(element=element, xpath="imageId",
-                                   namespace=NAMESPACE),
-                'private_dns': findattr(element=element, xpath="privateDnsName",
-                                        namespace=NAMESPACE),
-                'status': findattr(element=element, xpath="instanceState/name",
-                                   namespace=NAMESPACE),
-                'keyname': findattr(element=element, xpath="keyName",
-                                    namespace=NAMESPACE),
-                'launchindex': findattr(element=element, xpath="amiLaunchIndex",
-                                        namespace=NAMESPACE),
+                'dns_name': texts.get('dnsName'),
+                'instanceId': texts.get('instanceId'),
+                'imageId': texts.get('imageId'),
+                'private_dns': texts.get('privateDnsName'),
+                'status': texts.get('instanceState/name'),
+                'keyname': texts.get('keyName'),
+                'launchindex': texts.get('amiLaunchIndex'),
                 'productcode':
                     [p.text for p in findall(element=element,
                        xpath="productCodesSet/item/productCode",
                        namespace=NAMESPACE
                      )],
-                'instancetype': findattr(element=element, xpath="instanceType",
-                                         namespace=NAMESPACE),
-                'launchdatetime': findattr(element=element, xpath="launchTime",
-                                           namespace=NAMESPACE),
-                'availability': findattr(element, xpath="placement/availabilityZone",
-                                         namespace=NAMESPACE),
-                'kernelid': findattr(element=element, xpath="kernelId",
-                                     namespace=NAMESPACE),
-                'ramdiskid': findattr(element=element, xpath="ramdiskId",
-                                      namespace=NAMESPACE),
-                'clienttoken' : findattr(element=element, xpath="clientToken",
-                                         namespace=NAMESPACE),
+                'instancetype': texts.get('instanceType'),
+                'launchdatetime': texts.get('launchTime'),
+                'availability': texts.get('placement/availabilityZone'),
+                'kernelid': texts.get('kernelId'),
+                'ramdiskid': texts.get('ramdiskId'),
+                'clienttoken' : texts.get('clientToken'),
                 'groups': groups
             }
         )
@@ -351,28 +340,69 @@ class EC2NodeDriver(NodeDriver):
                  ) ]
 
     def _to_image(self, element):
-        n = NodeImage(id=findtext(element=element, xpath='imageId',
-                                  namespace=NAMESPACE),
-                      name=findtext(element=element, xpath='imageLocation',
-                                    namespace=NAMESPACE),
+        texts = findtexts(element=element, namespace=NAMESPACE)
+        n = NodeImage(id=texts.get('imageId'),
+                      name=texts.get('imageLocation'),
                       driver=self.connection.driver)
         return n
 
     def list_nodes(self):
-        params = {'Action': 'DescribeInstances' }
-        elem=self.connection.request(self.path, params=params).object
-        nodes=[]
-        for rs in findall(element=elem, xpath='reservationSet/item',
-                          namespace=NAMESPACE):
-            groups=[g.findtext('')
-                        for g in findall(element=rs, xpath='groupSet/item/groupId',
-                                         namespace=NAMESPACE)]
-            nodes += self._to_nodes(rs, 'instancesSet/item', groups)
-
-        nodes_elastic_ips_mappings = self.ex_describe_addresses(nodes)
-        for node in nodes:
-            node.public_ip.extend(nodes_elastic_ips_mappings[node.id])
-        return nodes
+        return list(self.iter_nodes())
+
+    def iter_nodes(self):
+        """
+        Yield the nodes as their description is read from the response,
+        instead of loading the whole list first. Each reservation is
+        dropped once its nodes have been yielded, so memory use doesn't
+        grow with the number of instances.
+
+        Breaking out of the loop closes the connection.
+
+        @note: This is a non-standard extension API, and
+               only works for EC2.
+
+        @return: A generator of L{Node} objects.
+        """
+        requests = [{'action': self.path,
+                     'params': {'Action': 'DescribeInstances'},
+                     'stream': True}]
+        if self._elastic_ips:
+            # The addresses don't depend on the instances, so fetch them at
+            # the same time
+            requests.append({'action': self.path,
+                             'params': {'Action': 'DescribeAddresses'}})
+        responses = self.connection.request_many(requests,
+                                                 return_exceptions=True)
+
+        response = responses[0]
+        for result in responses:
+            if isinstance(result, Exception):
+                if not isinstance(response, Exception):
+                    response.close()
+                raise result
+
+        try:
+            if len(responses) > 1:
+                addresses = self._to_elastic_ips(responses[1].object)
+            else:
+                addresses = {}
+
+            try:
+                for rs in response.iterparse('reservationSet/item',
+                                             NAMESPACE):
+                    groups=[g.text
+                                for g in findall(element=rs,
+                                                 xpath='groupSet/item/groupId',
+                                                 namespace=NAMESPACE)]
+                    for node in self._to_nodes(rs, 'instancesSet/item',
+                                               groups):
+                        node.public_ip.extend(addresses.get(node.id, []))
+                        yield node
+            except SyntaxError, e:
+                raise MalformedResponseError('Failed to parse XML: %s' % (e),
+                                             driver=self)
+        finally:
+            response.close()
 
     def list_sizes(self, location=None):
         # Cluster instances are currently only available in the US - N. Virginia Region
@@ -573,12 +603,10 @@ class EC2NodeDriver(NodeDriver):
         availability_zones = []
         for element in findall(element=result, xpath='availabilityZoneInfo/item',
                                namespace=NAMESPACE):
-            name = findtext(element=element, xpath='zoneName',
-                            namespace=NAMESPACE)
-            zone_state = findtext(element=element, xpath='zoneState',
-                                  namespace=NAMESPACE)
-            region_name = findtext(element=element, xpath='regionName',
-                                   namespace=NAMESPACE)
+            texts = findtexts(element=element, namespace=NAMESPACE)
+            name = texts.get('zoneName')
+            zone_state = texts.get('zoneState')
+            region_name = texts.get('regionName')
 
             availability_zone = ExEC2AvailabilityZone(
                 name=name,
@@ -682,24 +710,24 @@ class EC2NodeDriver(NodeDriver):
 
         result = self.connection.request(self.path,
                                          params=params.copy()).object
+        return self._to_elastic_ip_mappings(nodes, result)
 
-        node_instance_ids = [ node.id for node in nodes ]
+    def _to_elastic_ip_mappings(self, nodes, result):
+        addresses = self._to_elastic_ips(result)
         nodes_elastic_ip_mappings = {}
+        for node in nodes:
+            nodes_elastic_ip_mappings[node.id] = addresses.get(node.id, [])
+        return nodes_elastic_ip_mappings
 
-        for node_id in node_instance_ids:
-            nodes_elastic_ip_mappings.setdefault(node_id, [])
+    def _to_elastic_ips(self, result):
+        # Addresses of every instance which has some
+        addresses = {}
         for element in findall(element=result, xpath='addressesSet/item',
                                namespace=NAMESPACE):
-            instance_id = findtext(element=element, xpath='instanceId',
-                                   namespace=NAMESPACE)
-            ip_address = findtext(element=element, xpath='publicIp',
-                                  namespace=NAMESPACE)
-
-            if instance_id not in node_instance_ids:
-                continue
-
-            nodes_elastic_ip_mappings[instance_id].append(ip_address)
-        return nodes_elastic_ip_mappings
+            texts = findtexts(element=element, namespace=NAMESPACE)
+            addresses.setdefault(texts.get('instanceId'), []).append(
+                texts.get('publicIp'))
+        return addresses
 
     def ex_describe_addresses_for_node(self, node):
         """
@@ -1004,6 +1032,7 @@ class NimbusNodeDriver(EC2NodeDriver):
     friendly_name = 'Nimbus Private Cloud'
     connectionCls = NimbusConnection
     _instance_types = NIMBUS_INSTANCE_TYPES
+    _elastic_ips = False
 
     def ex_describe_addresses(self, nodes):
         """Nimbus doesn't support elastic IPs, so this is a passthrough
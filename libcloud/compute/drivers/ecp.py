@@ -16,19 +16,13 @@
 """
 Enomaly ECP driver
 """
-import time
 import base64
 import httplib
 import socket
 import os
 
-# JSON is included in the standard library starting with Python 2.6.  For 2.5
-# and 2.4, there's a simplejson egg at: http://pypi.python.org/pypi/simplejson
-try:
-    import json
-except:
-    import simplejson as json
-
+from libcloud.common import hooks
+from libcloud.common import jsoncodec
 from libcloud.common.base import Response, ConnectionUserAndKey
 from libcloud.compute.base import NodeDriver, NodeSize, NodeLocation
 from libcloud.compute.base import NodeImage, Node
@@ -44,7 +38,7 @@ class ECPResponse(Response):
     def success(self):
         if self.status == httplib.OK or self.status == httplib.CREATED:
             try:
-                j_body = json.loads(self.body)
+                j_body = jsoncodec.loads(self.body)
             except ValueError:
                 self.error = "JSON response cannot be decoded."
                 return False
@@ -64,7 +58,7 @@ class ECPResponse(Response):
 
     #Interpret the json responses - no error checking required
     def parse_body(self):
-        return json.loads(self.body)
+        return jsoncodec.loads(self.body)
 
     def getheaders(self):
         return self.headers
@@ -203,7 +197,7 @@ class ECPNodeDriver(NodeDriver):
             if response['vm']['state'] == 'off':
                 node.state = NodeState.TERMINATED
             else:
-                time.sleep(5)
+                hooks.sleep(5, 'power_off')
 
 
         #Turn the VM back on.
@@ -245,7 +239,7 @@ class ECPNodeDriver(NodeDriver):
             if response['vm']['state'] == 'off':
                 node.state = NodeState.TERMINATED
             else:
-                time.sleep(5)
+                hooks.sleep(5, 'power_off')
 
         #Delete the VM
         #Black magic to make the POST requests work
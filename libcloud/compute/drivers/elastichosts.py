@@ -20,12 +20,10 @@ import time
 import base64
 import httplib
 
-try:
-    import json
-except:
-    import simplejson as json
-
+from libcloud.common import hooks
+from libcloud.common import jsoncodec
 from libcloud.common.base import ConnectionUserAndKey, Response
+from libcloud.common.base import StreamingResponse
 from libcloud.common.types import InvalidCredsError, MalformedResponseError
 from libcloud.compute.types import Provider, NodeState
 from libcloud.compute.base import NodeDriver, NodeSize, Node
@@ -196,7 +194,7 @@ class ElasticHostsResponse(Response):
             return self.body
 
         try:
-            data = json.loads(self.body)
+            data = jsoncodec.loads(self.body)
         except:
             raise MalformedResponseError("Failed to parse JSON",
                                          body=self.body,
@@ -301,14 +299,49 @@ class ElasticHostsBaseNodeDriver(NodeDriver):
 
     def list_nodes(self):
         # Returns a list of active (running) nodes
-        response = self.connection.request(action='/servers/info').object
+        return list(self.iter_nodes())
+
+    def iter_nodes(self):
+        """
+        Yield the nodes as their description is decoded from the response,
+        instead of loading the whole list first.
 
-        nodes = []
-        for data in response:
-            node = self._to_node(data)
-            nodes.append(node)
+        Breaking out of the loop closes the connection.
 
-        return nodes
+        @note: This is a non-standard extension API, and
+               only works for ElasticHosts.
+
+        @return: A generator of L{Node} objects.
+        """
+        response = self.connection.request(action='/servers/info',
+                                           stream=True)
+
+        if not isinstance(response, StreamingResponse):
+            # Responses which are not streamed have been parsed in full
+            for data in response.object or []:
+                yield self._to_node(data)
+            return
+
+        try:
+            for data in self._iter_json_array(response):
+                yield self._to_node(data)
+        finally:
+            response.close()
+
+    def _iter_json_array(self, response):
+        """
+        Yield the items of a streamed JSON array, decoding errors are raised
+        as L{MalformedResponseError}.
+        """
+        try:
+            for data in response.iter_json_array():
+                yield data
+        except ValueError, e:
+            if response.bytes_read == 0:
+                # An empty body is an empty list
+                return
+            raise MalformedResponseError('Failed to parse JSON: %s' % (e),
+                                         driver=self)
 
     def create_node(self, **kwargs):
         """Creates a ElasticHosts instance
@@ -349,7 +382,7 @@ class ElasticHostsBaseNodeDriver(NodeDriver):
                            'size': '%sG' % (kwargs['size'].disk)})
 
         response = self.connection.request(action='/drives/create',
-                                           data=json.dumps(drive_data),
+                                           data=jsoncodec.dumps(drive_data),
                                            method='POST').object
 
         if not response:
@@ -381,7 +414,7 @@ class ElasticHostsBaseNodeDriver(NodeDriver):
             if (response.has_key('imaging')
                 and elapsed_time >= IMAGING_TIMEOUT):
                 raise ElasticHostsException('Drive imaging timed out')
-            time.sleep(1)
+            hooks.sleep(1, 'imaging')
 
         node_data = {}
         node_data.update({'name': kwargs['name'],
@@ -396,7 +429,7 @@ class ElasticHostsBaseNodeDriver(NodeDriver):
             node_data.update({'vnc:ip': 'auto', 'vnc:password': vnc_password})
 
         response = self.connection.request(
-            action='/servers/create', data=json.dumps(node_data),
+            action='/servers/create', data=jsoncodec.dumps(node_data),
             method='POST'
         ).object
 
@@ -434,7 +467,7 @@ class ElasticHostsBaseNodeDriver(NodeDriver):
             )
 
         response = self.connection.request(
-            action='/servers/%s/set' % (node.id), data=json.dumps(kwargs),
+            action='/servers/%s/set' % (node.id), data=jsoncodec.dumps(kwargs),
             method='POST'
         )
 
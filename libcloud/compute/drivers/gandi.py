@@ -16,10 +16,10 @@
 Gandi driver
 """
 
-import time
 import xmlrpclib
 
 import libcloud
+from libcloud.common import hooks
 from libcloud.compute.types import Provider, NodeState
 from libcloud.compute.base import NodeDriver, Node, NodeLocation, NodeSize, NodeImage
 
@@ -148,7 +148,7 @@ class GandiNodeDriver(NodeDriver):
             except Exception, e:
                 raise GandiException(1002, e)
 
-            time.sleep(check_interval)
+            hooks.sleep(check_interval, 'operation')
         return False
 
     def _node_info(self,id):
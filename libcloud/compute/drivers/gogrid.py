@@ -19,11 +19,8 @@ import time
 import hashlib
 import copy
 
-try:
-    import json
-except ImportError:
-    import simplejson as json
-
+from libcloud.common import hooks
+from libcloud.common import jsoncodec
 from libcloud.common.base import ConnectionUserAndKey, Response
 from libcloud.common.types import InvalidCredsError, LibcloudError
 from libcloud.common.types import MalformedResponseError
@@ -84,18 +81,18 @@ class GoGridResponse(Response):
         if not self.body:
             return None
         try:
-            return json.loads(self.body)['status'] == 'success'
+            return jsoncodec.loads(self.body)['status'] == 'success'
         except ValueError:
             raise MalformedResponseError('Malformed reply', body=self.body, driver=GoGridNodeDriver)
 
     def parse_body(self):
         if not self.body:
             return None
-        return json.loads(self.body)
+        return jsoncodec.loads(self.body)
 
     def parse_error(self):
         try:
-            return json.loads(self.body)["list"][0]['message']
+            return jsoncodec.loads(self.body)["list"][0]['message']
         except (ValueError, KeyError):
             return None
 
@@ -356,7 +353,7 @@ class GoGridNodeDriver(NodeDriver):
                     return i
 
             waittime += interval
-            time.sleep(interval)
+            hooks.sleep(interval, 'node_id')
 
         if id is None:
             raise Exception("Wasn't able to wait for id allocation for the node %s" % str(node))
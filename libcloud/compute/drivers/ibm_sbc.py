@@ -17,13 +17,12 @@ Driver for the IBM Developer Cloud.
 """
 import base64, urllib
 
+from libcloud.common import xmlparser
 from libcloud.common.base import Response, ConnectionUserAndKey
 from libcloud.common.types import InvalidCredsError
 from libcloud.compute.types import NodeState, Provider
 from libcloud.compute.base import NodeDriver, Node, NodeImage, NodeSize, NodeLocation, NodeAuthSSHKey
 
-from xml.etree import ElementTree as ET
-
 HOST = 'www-147.ibm.com'
 REST_BASE = '/computecloud/enterprise/api/rest/20100331'
 
@@ -34,7 +33,7 @@ class IBMResponse(Response):
     def parse_body(self):
         if not self.body:
             return None
-        return ET.XML(self.body)
+        return xmlparser.fromstring(self.body)
 
     def parse_error(self):
         if int(self.status) == 401:
@@ -31,11 +31,7 @@ import os
 
 from copy import copy
 
-try:
-    import json
-except:
-    import simplejson as json
-
+from libcloud.common import jsoncodec
 from libcloud.common.base import ConnectionKey, Response
 from libcloud.common.types import InvalidCredsError, MalformedResponseError
 from libcloud.compute.types import Provider, NodeState
@@ -115,7 +111,7 @@ class LinodeResponse(Response):
 
         @return: C{list} of objects and C{list} of errors"""
         try:
-            js = json.loads(self.body)
+            js = jsoncodec.loads(self.body)
         except:
             raise MalformedResponseError("Failed to parse JSON", body=self.body,
                 driver=LinodeNodeDriver)
@@ -176,6 +172,10 @@ class LinodeConnection(ConnectionKey):
         params["api_responseFormat"] = "json"
         return params
 
+    def get_operation_name(self, action, params, method):
+        """Every call goes to the same endpoint, use the API action"""
+        return params.get("api_action", method)
+
 
 class LinodeNodeDriver(NodeDriver):
     """libcloud driver for the Linode API
@@ -584,7 +584,7 @@ class LinodeNodeDriver(NodeDriver):
         for twenty_five in izip_longest(*args):
             twenty_five = [q for q in twenty_five if q]
             params = { "api_action": "batch",
-                "api_requestArray": json.dumps(twenty_five) }
+                "api_requestArray": jsoncodec.dumps(twenty_five) }
             req = self.connection.request(LINODE_ROOT, params=params)
             if not req.success() or len(req.objects) == 0:
                 return None
@@ -23,6 +23,7 @@ from base64 import b64encode
 import hashlib
 from xml.etree import ElementTree as ET
 
+from libcloud.common import xmlparser
 from libcloud.common.base import ConnectionUserAndKey, Response
 from libcloud.common.types import InvalidCredsError
 from libcloud.compute.providers import Provider
@@ -44,7 +45,7 @@ class OpenNebulaResponse(Response):
     def parse_body(self):
         if not self.body:
             return None
-        return ET.XML(self.body)
+        return xmlparser.fromstring(self.body)
 
     def parse_error(self):
         if int(self.status) == 401:
@@ -181,13 +182,13 @@ class OpenNebulaNodeDriver(NodeDriver):
                          driver=self.connection.driver)
 
     def _to_nodes(self, object):
-        computes = []
+        actions = []
         for element in object.findall("COMPUTE"):
             compute_id = element.attrib["href"].partition("/compute/")[2]
-            compute = self.connection.request(("/compute/%s" % (compute_id))).object
-            computes.append(self._to_node(compute))
+            actions.append("/compute/%s" % (compute_id))
 
-        return computes
+        responses = self.connection.request_many(actions)
+        return [self._to_node(response.object) for response in responses]
 
     def _to_node(self, compute):
         try:
@@ -20,7 +20,8 @@ import socket
 from xml.etree import ElementTree as ET
 from xml.parsers.expat import ExpatError
 
-from libcloud.utils import fixxpath, findtext, findall
+from libcloud.utils import fixxpath, findtext, findall, findtexts
+from libcloud.common import xmlparser
 from libcloud.common.base import ConnectionUserAndKey, Response
 from libcloud.common.types import LibcloudError, InvalidCredsError, MalformedResponseError
 from libcloud.compute.types import NodeState, Provider
@@ -88,7 +89,7 @@ class OpsourceResponse(Response):
     
     def parse_body(self):
         try:
-            body = ET.XML(self.body)
+            body = xmlparser.fromstring(self.body)
         except:
             raise MalformedResponseError("Failed to parse XML", body=self.body, driver=OpsourceNodeDriver)
         return body
@@ -101,7 +102,7 @@ class OpsourceResponse(Response):
             raise InvalidCredsError(self.body)
         
         try:
-            body = ET.XML(self.body)
+            body = xmlparser.fromstring(self.body)
         except:
             raise MalformedResponseError("Failed to parse XML", body=self.body, driver=OpsourceNodeDriver)
 
@@ -140,22 +141,24 @@ class OpsourceConnection(ConnectionUserAndKey):
                               % (base64.b64encode('%s:%s' % (self.user_id, self.key))))
         return headers
     
-    def request(self, action, params=None, data='', headers=None, method='GET'):
+    def request(self, action, params=None, data='', headers=None, method='GET',
+                timeout=None):
         action = "%s/%s/%s" % (self.api_path, self.api_version, action)
         
         return super(OpsourceConnection, self).request(
             action=action,
             params=params, data=data,
-            method=method, headers=headers
+            method=method, headers=headers, timeout=timeout
         )
         
-    def request_with_orgId(self, action, params=None, data='', headers=None, method='GET'):
+    def request_with_orgId(self, action, params=None, data='', headers=None,
+                           method='GET', timeout=None):
         action = "%s/%s" % (self.get_resource_path(), action)
         
         return super(OpsourceConnection, self).request(
             action=action,
             params=params, data=data,
-            method=method, headers=headers
+            method=method, headers=headers, timeout=timeout
         )
 
     def get_resource_path(self):
@@ -396,20 +399,21 @@ class OpsourceNodeDriver(NodeDriver):
         return [ self._to_network(el) for el in node_elements ]
         
     def _to_network(self, element):
+        texts = findtexts(element, NETWORK_NS)
         multicast = False
-        if findtext(element, 'multicast', NETWORK_NS) == 'true':
+        if texts.get('multicast') == 'true':
             multicast = True
 
         status = self._to_status(element.find(fixxpath('status', NETWORK_NS)))
         
-        location_id = findtext(element, 'location', NETWORK_NS)
+        location_id = texts.get('location')
         location = self.ex_get_location_by_id(location_id)
         
-        return OpsourceNetwork(id=findtext(element, 'id', NETWORK_NS),
-                               name=findtext(element, 'name', NETWORK_NS),
-                               description=findtext(element, 'description', NETWORK_NS),
+        return OpsourceNetwork(id=texts.get('id'),
+                               name=texts.get('name'),
+                               description=texts.get('description'),
                                location=location,
-                               privateNet=findtext(element, 'privateNet', NETWORK_NS),
+                               privateNet=texts.get('privateNet'),
                                multicast=multicast,
                                status=status)
     
@@ -418,9 +422,10 @@ class OpsourceNodeDriver(NodeDriver):
         return [ self._to_location(el) for el in node_elements ]
     
     def _to_location(self, element):
-        l = NodeLocation(id=findtext(element, 'location', DATACENTER_NS),
-                         name=findtext(element, 'displayName', DATACENTER_NS),
-                         country=findtext(element, 'country', DATACENTER_NS),
+        texts = findtexts(element, DATACENTER_NS)
+        l = NodeLocation(id=texts.get('location'),
+                         name=texts.get('displayName'),
+                         country=texts.get('country'),
                          driver=self)
         return l
     
@@ -430,7 +435,8 @@ class OpsourceNodeDriver(NodeDriver):
         return [ self._to_node(el) for el in node_elements ]
     
     def _to_node(self, element):
-        if findtext(element, 'isStarted', SERVER_NS) == 'true':
+        texts = findtexts(element, SERVER_NS)
+        if texts.get('isStarted') == 'true':
              state = NodeState.RUNNING
         else:
             state = NodeState.TERMINATED
@@ -438,25 +444,25 @@ class OpsourceNodeDriver(NodeDriver):
         status = self._to_status(element.find(fixxpath('status', SERVER_NS)))
             
         extra = {
-            'description': findtext(element, 'description', SERVER_NS),
-            'sourceImageId': findtext(element, 'sourceImageId', SERVER_NS),
-            'networkId': findtext(element, 'networkId', SERVER_NS),
-            'machineName': findtext(element, 'machineName', SERVER_NS),
-            'deployedTime': findtext(element, 'deployedTime', SERVER_NS),
-            'cpuCount': findtext(element, 'machineSpecification/cpuCount', SERVER_NS),
-            'memoryMb': findtext(element, 'machineSpecification/memoryMb', SERVER_NS),
-            'osStorageGb': findtext(element, 'machineSpecification/osStorageGb', SERVER_NS),
-            'additionalLocalStorageGb': findtext(element, 'machineSpecification/additionalLocalStorageGb', SERVER_NS),
-            'OS_type': findtext(element, 'machineSpecification/operatingSystem/type', SERVER_NS),
-            'OS_displayName': findtext(element, 'machineSpecification/operatingSystem/displayName', SERVER_NS),
+            'description': texts.get('description'),
+            'sourceImageId': texts.get('sourceImageId'),
+            'networkId': texts.get('networkId'),
+            'machineName': texts.get('machineName'),
+            'deployedTime': texts.get('deployedTime'),
+            'cpuCount': texts.get('machineSpecification/cpuCount'),
+            'memoryMb': texts.get('machineSpecification/memoryMb'),
+            'osStorageGb': texts.get('machineSpecification/osStorageGb'),
+            'additionalLocalStorageGb': texts.get('machineSpecification/additionalLocalStorageGb'),
+            'OS_type': texts.get('machineSpecification/operatingSystem/type'),
+            'OS_displayName': texts.get('machineSpecification/operatingSystem/displayName'),
             'status': status,
         }
         
-        n = Node(id=findtext(element, 'id', SERVER_NS),
-                 name=findtext(element, 'name', SERVER_NS),
+        n = Node(id=texts.get('id'),
+                 name=texts.get('name'),
                  state=state,
                  public_ip="unknown",
-                 private_ip=findtext(element, 'privateIpAddress', SERVER_NS),
+                 private_ip=texts.get('privateIpAddress'),
                  driver=self.connection.driver,
                  extra=extra)
         return n
@@ -470,24 +476,25 @@ class OpsourceNodeDriver(NodeDriver):
         # that parse <ServerImage> differently than <DeployedImage>.
         # DeployedImages are customer snapshot images, and ServerImages are
         # 'base' images provided by opsource
-        location_id = findtext(element, 'location', SERVER_NS)
+        texts = findtexts(element, SERVER_NS)
+        location_id = texts.get('location')
         location = self.ex_get_location_by_id(location_id)
         
         extra = {
-            'description': findtext(element, 'description', SERVER_NS),
-            'OS_type': findtext(element, 'operatingSystem/type', SERVER_NS),
-            'OS_displayName': findtext(element, 'operatingSystem/displayName', SERVER_NS),
-            'cpuCount': findtext(element, 'cpuCount', SERVER_NS),
-            'resourcePath': findtext(element, 'resourcePath', SERVER_NS),
-            'memory': findtext(element, 'memory', SERVER_NS),
-            'osStorage': findtext(element, 'osStorage', SERVER_NS),
-            'additionalStorage': findtext(element, 'additionalStorage', SERVER_NS),
-            'created': findtext(element, 'created', SERVER_NS),
+            'description': texts.get('description'),
+            'OS_type': texts.get('operatingSystem/type'),
+            'OS_displayName': texts.get('operatingSystem/displayName'),
+            'cpuCount': texts.get('cpuCount'),
+            'resourcePath': texts.get('resourcePath'),
+            'memory': texts.get('memory'),
+            'osStorage': texts.get('osStorage'),
+            'additionalStorage': texts.get('additionalStorage'),
+            'created': texts.get('created'),
             'location': location,
         }
         
-        i = NodeImage(id=str(findtext(element, 'id', SERVER_NS)),
-                     name=str(findtext(element, 'name', SERVER_NS)),
+        i = NodeImage(id=str(texts.get('id')),
+                     name=str(texts.get('name')),
                      extra=extra,
                      driver=self.connection.driver)
         return i
@@ -495,12 +502,13 @@ class OpsourceNodeDriver(NodeDriver):
     def _to_status(self, element):
         if element == None:
             return OpsourceStatus()
-        s = OpsourceStatus(action=findtext(element, 'action', SERVER_NS),
-                          requestTime=findtext(element, 'requestTime', SERVER_NS),
-                          userName=findtext(element, 'userName', SERVER_NS),
-                          numberOfSteps=findtext(element, 'numberOfSteps', SERVER_NS),
-                          step_name=findtext(element, 'step/name', SERVER_NS),
-                          step_number=findtext(element, 'step_number', SERVER_NS),
-                          step_percentComplete=findtext(element, 'step/percentComplete', SERVER_NS),
-                          failureReason=findtext(element, 'failureReason', SERVER_NS))
+        texts = findtexts(element, SERVER_NS)
+        s = OpsourceStatus(action=texts.get('action'),
+                          requestTime=texts.get('requestTime'),
+                          userName=texts.get('userName'),
+                          numberOfSteps=texts.get('numberOfSteps'),
+                          step_name=texts.get('step/name'),
+                          step_number=texts.get('step_number'),
+                          step_percentComplete=texts.get('step/percentComplete'),
+                          failureReason=texts.get('failureReason'))
         return s
@@ -23,6 +23,8 @@ from xml.etree import ElementTree as ET
 from xml.parsers.expat import ExpatError
 
 from libcloud.pricing import get_pricing
+from libcloud.utils import fixxpath
+from libcloud.common import xmlparser
 from libcloud.common.base import Response
 from libcloud.common.types import MalformedResponseError
 from libcloud.compute.types import NodeState, Provider
@@ -45,7 +47,7 @@ class RackspaceResponse(Response):
         if not self.body:
             return None
         try:
-            body = ET.XML(self.body)
+            body = xmlparser.fromstring(self.body)
         except:
             raise MalformedResponseError(
                 "Failed to parse XML",
@@ -55,7 +57,7 @@ class RackspaceResponse(Response):
     def parse_error(self):
         # TODO: fixup, Rackspace only uses response codes really!
         try:
-            body = ET.XML(self.body)
+            body = xmlparser.fromstring(self.body)
         except:
             raise MalformedResponseError(
                 "Failed to parse XML",
@@ -84,7 +86,8 @@ class RackspaceConnection(RackspaceBaseConnection):
         self.api_version = 'v1.0'
         self.accept_format = 'application/xml'
 
-    def request(self, action, params=None, data='', headers=None, method='GET'):
+    def request(self, action, params=None, data='', headers=None, method='GET',
+                timeout=None):
         if not headers:
             headers = {}
         if not params:
@@ -99,7 +102,7 @@ class RackspaceConnection(RackspaceBaseConnection):
         return super(RackspaceConnection, self).request(
             action=action,
             params=params, data=data,
-            method=method, headers=headers
+            method=method, headers=headers, timeout=timeout
         )
 
 
@@ -397,7 +400,7 @@ class RackspaceNodeDriver(NodeDriver):
 
     def _fixxpath(self, xpath):
         # ElementTree wants namespaces in its xpaths, so here we add them.
-        return "/".join(["{%s}%s" % (NAMESPACE, e) for e in xpath.split("/")])
+        return fixxpath(xpath, NAMESPACE)
 
     def _findall(self, element, xpath):
         return element.findall(self._fixxpath(xpath))
@@ -15,11 +15,7 @@
 """
 RimuHosting Driver
 """
-try:
-    import json
-except:
-    import simplejson as json
-
+from libcloud.common import jsoncodec
 from libcloud.common.base import ConnectionKey, Response
 from libcloud.common.types import InvalidCredsError
 from libcloud.compute.types import Provider, NodeState
@@ -58,7 +54,7 @@ class RimuHostingResponse(Response):
         return True
     def parse_body(self):
         try:
-            js = json.loads(self.body)
+            js = jsoncodec.loads(self.body)
             if js[js.keys()[0]]['response_type'] == "ERROR":
                 raise RimuHostingException(
                     js[js.keys()[0]]['human_readable_message']
@@ -95,14 +91,16 @@ class RimuHostingConnection(ConnectionKey):
         headers['Authorization'] = 'rimuhosting apikey=%s' % (self.key)
         return headers;
 
-    def request(self, action, params=None, data='', headers=None, method='GET'):
+    def request(self, action, params=None, data='', headers=None, method='GET',
+                timeout=None):
         if not headers:
             headers = {}
         if not params:
             params = {}
         # Override this method to prepend the api_context
         return ConnectionKey.request(self, self.api_context + action,
-                                     params, data, headers, method)
+                                     params, data, headers, method,
+                                     timeout=timeout)
 
 class RimuHostingNodeDriver(NodeDriver):
     """
@@ -191,7 +189,7 @@ class RimuHostingNodeDriver(NodeDriver):
         # All data is encoded as JSON
         data = {'reboot_request':{'running_state':'RESTARTING'}}
         uri = self._order_uri(node,'vps/running-state')
-        self.connection.request(uri,data=json.dumps(data),method='PUT')
+        self.connection.request(uri,data=jsoncodec.dumps(data),method='PUT')
         # XXX check that the response was actually successful
         return True
 
@@ -296,7 +294,7 @@ class RimuHostingNodeDriver(NodeDriver):
         res = self.connection.request(
             '/orders/new-vps',
             method='POST',
-            data=json.dumps({"new-vps":data})
+            data=jsoncodec.dumps({"new-vps":data})
         ).object
         node = self._to_node(res['about_order'])
         node.extra['password'] = res['new_order_request']['instantiation_options']['password']
@@ -21,6 +21,7 @@ import socket
 from xml.etree import ElementTree as ET
 from xml.parsers.expat import ExpatError
 
+from libcloud.common import xmlparser
 from libcloud.common.base import ConnectionKey, Response
 from libcloud.compute.types import (
     NodeState, Provider, InvalidCredsError, MalformedResponseError)
@@ -36,7 +37,7 @@ class SlicehostResponse(Response):
         if not self.body or len(self.body) <= 1:
             return None
         try:
-            body = ET.XML(self.body)
+            body = xmlparser.fromstring(self.body)
         except:
             raise MalformedResponseError(
                 "Failed to parse XML",
@@ -49,7 +50,7 @@ class SlicehostResponse(Response):
             raise InvalidCredsError(self.body)
 
         try:
-            body = ET.XML(self.body)
+            body = xmlparser.fromstring(self.body)
         except:
             raise MalformedResponseError(
                 "Failed to parse XML",
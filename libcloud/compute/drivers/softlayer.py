@@ -16,11 +16,11 @@
 Softlayer driver
 """
 
-import time
 import xmlrpclib
 
 import libcloud
 
+from libcloud.common import hooks
 from libcloud.common.types import InvalidCredsError, LibcloudError
 from libcloud.compute.types import Provider, NodeState
 from libcloud.compute.base import NodeDriver, Node, NodeLocation, NodeSize, NodeImage
@@ -324,7 +324,7 @@ class SoftLayerNodeDriver(NodeDriver):
             except (KeyError, IndexError):
                 pass
 
-            time.sleep(check_interval)
+            hooks.sleep(check_interval, 'password')
 
         return None
 
@@ -17,12 +17,15 @@ VMware vCloud driver.
 """
 import base64
 import httplib
+import threading
 import time
 
 from urlparse import urlparse
 from xml.etree import ElementTree as ET
-from xml.parsers.expat import ExpatError
 
+from libcloud import utils
+from libcloud.common import hooks
+from libcloud.common import xmlparser
 from libcloud.common.base import Response, ConnectionUserAndKey
 from libcloud.common.types import InvalidCredsError
 from libcloud.compute.providers import Provider
@@ -44,9 +47,7 @@ def get_url_path(url):
 def fixxpath(root, xpath):
     """ElementTree wants namespaces in its xpaths, so here we add them."""
     namespace, root_tag = root.tag[1:].split("}", 1)
-    fixed_xpath = "/".join(["{%s}%s" % (namespace, e)
-                            for e in xpath.split("/")])
-    return fixed_xpath
+    return utils.fixxpath(xpath, namespace)
 
 class InstantiateVAppXML(object):
 
@@ -204,8 +205,8 @@ class VCloudResponse(Response):
         if not self.body:
             return None
         try:
-            return ET.XML(self.body)
-        except ExpatError, e:
+            return xmlparser.fromstring(self.body)
+        except xmlparser.PARSE_ERRORS, e:
             raise Exception("%s: %s" % (e, self.parse_error()))
 
     def parse_error(self):
@@ -224,6 +225,10 @@ class VCloudConnection(ConnectionUserAndKey):
     token = None
     host = None
 
+    def __init__(self, *args, **kwargs):
+        self._auth_lock = threading.Lock()
+        super(VCloudConnection, self).__init__(*args, **kwargs)
+
     def request(self, *args, **kwargs):
         self._get_auth_token()
         return super(VCloudConnection, self).request(*args, **kwargs)
@@ -243,23 +248,32 @@ class VCloudConnection(ConnectionUserAndKey):
 
     def _get_auth_token(self):
         if not self.token:
-            conn = self.conn_classes[self.secure](self.host,
-                                                  self.port[self.secure])
-            conn.request(method='POST', url='/api/v0.8/login',
-                         headers=self._get_auth_headers())
+            # Only one thread logs in, the others wait for the token
+            self._auth_lock.acquire()
+            try:
+                if not self.token:
+                    self._login()
+            finally:
+                self._auth_lock.release()
 
-            resp = conn.getresponse()
-            headers = dict(resp.getheaders())
-            body = ET.XML(resp.read())
+    def _login(self):
+        conn = self.conn_classes[self.secure](self.host,
+                                              self.port[self.secure])
+        conn.request(method='POST', url='/api/v0.8/login',
+                     headers=self._get_auth_headers())
 
-            try:
-                self.token = headers['set-cookie']
-            except KeyError:
-                raise InvalidCredsError()
+        resp = conn.getresponse()
+        headers = dict(resp.getheaders())
+        body = xmlparser.fromstring(resp.read())
 
-            self.driver.org = get_url_path(
-                body.find(fixxpath(body, 'Org')).get('href')
-            )
+        try:
+            self.token = headers['set-cookie']
+        except KeyError:
+            raise InvalidCredsError()
+
+        self.driver.org = get_url_path(
+            body.find(fixxpath(body, 'Org')).get('href')
+        )
 
     def add_default_headers(self, headers):
         headers['Cookie'] = self.token
@@ -366,7 +380,7 @@ class VCloudNodeDriver(NodeDriver):
             if (time.time() - start_time >= timeout):
                 raise Exception("Timeout while waiting for task %s."
                                 % task_href)
-            time.sleep(5)
+            hooks.sleep(5, 'task')
             res = self.connection.request(task_href)
             status = res.object.get('status')
 
@@ -385,7 +399,7 @@ class VCloudNodeDriver(NodeDriver):
             res = self.connection.request('%s/action/undeploy' % node_path,
                                           method='POST')
             self._wait_for_task_completion(res.object.get('href'))
-        except ExpatError:
+        except xmlparser.PARSE_ERRORS:
             # The undeploy response is malformed XML atm.
             # We can remove this whent he providers fix the problem.
             pass
@@ -418,14 +432,14 @@ class VCloudNodeDriver(NodeDriver):
                     and i.get('name')
             ]
 
-            for vapp_name, vapp_href in vapps:
-                res = self.connection.request(
-                    vapp_href,
-                    headers={
-                        'Content-Type':
-                            'application/vnd.vmware.vcloud.vApp+xml'
-                    }
-                )
+            responses = self.connection.request_many([
+                {'action': vapp_href,
+                 'headers': {
+                     'Content-Type': 'application/vnd.vmware.vcloud.vApp+xml'
+                 }}
+                for vapp_name, vapp_href in vapps
+            ])
+            for (vapp_name, vapp_href), res in zip(vapps, responses):
                 nodes.append(self._to_node(vapp_name, res.object))
 
         return nodes
@@ -19,8 +19,7 @@ Voxel VoxCloud driver
 import datetime
 import hashlib
 
-from xml.etree import ElementTree as ET
-
+from libcloud.common import xmlparser
 from libcloud.common.base import Response, ConnectionUserAndKey
 from libcloud.common.types import InvalidCredsError
 from libcloud.compute.providers import Provider
@@ -40,7 +39,7 @@ class VoxelResponse(Response):
         if not self.body:
             return None
         if not self.parsed:
-            self.parsed = ET.XML(self.body)
+            self.parsed = xmlparser.fromstring(self.body)
         return self.parsed
 
     def parse_error(self):
@@ -48,7 +47,7 @@ class VoxelResponse(Response):
         if not self.body:
             return None
         if not self.parsed:
-            self.parsed = ET.XML(self.body)
+            self.parsed = xmlparser.fromstring(self.body)
         for err in self.parsed.findall('err'):
             code = err.get('code')
             err_list.append("(%s) %s" % (code, err.get('msg')))
@@ -63,7 +62,7 @@ class VoxelResponse(Response):
 
     def success(self):
         if not self.parsed:
-            self.parsed = ET.XML(self.body)
+            self.parsed = xmlparser.fromstring(self.body)
         stat = self.parsed.get('stat')
         if stat != "ok":
             return False
@@ -17,11 +17,7 @@ VPS.net driver
 """
 import base64
 
-try:
-    import json
-except:
-    import simplejson as json
-
+from libcloud.common import jsoncodec
 from libcloud.pricing import get_pricing
 
 from libcloud.common.base import ConnectionUserAndKey, Response
@@ -43,7 +39,7 @@ class VPSNetResponse(Response):
 
     def parse_body(self):
         try:
-            js = json.loads(self.body)
+            js = jsoncodec.loads(self.body)
             return js
         except ValueError:
             return self.body
@@ -56,7 +52,7 @@ class VPSNetResponse(Response):
 
     def parse_error(self):
         try:
-            errors = json.loads(self.body)['errors'][0]
+            errors = jsoncodec.loads(self.body)['errors'][0]
         except ValueError:
             return self.body
         else:
@@ -140,7 +136,7 @@ class VPSNetNodeDriver(NodeDriver):
                          'slices_required': size.id}}
 
         res = self.connection.request('/virtual_machines.%s' % (API_VERSION,),
-                                    data=json.dumps(request),
+                                    data=jsoncodec.dumps(request),
                                     headers=headers,
                                     method='POST')
         node = self._to_node(res.object['virtual_machine'])
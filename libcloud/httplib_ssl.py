@@ -19,11 +19,61 @@ verification, depending on libcloud.security settings.
 import httplib
 import os
 import re
-import socket
 import ssl
+import time
 import warnings
 
 import libcloud.security
+from libcloud.common import resolver
+
+# Process wide caches shared by all the connections. The CA certificate
+# lookup is keyed on CA_CERTS_PATH so changes to the setting are honoured.
+_ca_cert_cache = {}
+_ssl_context_cache = {}
+_hostname_pattern_cache = {}
+
+def get_ssl_context(ca_cert, key_file=None, cert_file=None):
+    """
+    Return a cached C{ssl.SSLContext} which verifies peers against the
+    provided CA certificates.
+
+    Creating the context parses the whole CA bundle, so it is only done
+    once per process. Returns C{None} if the ssl module doesn't support
+    contexts (Python < 2.7.9).
+    """
+    if not getattr(ssl, 'SSLContext', None):
+        return None
+
+    key = (ca_cert, key_file, cert_file)
+    context = _ssl_context_cache.get(key, None)
+    if context is None:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLSv1)
+        context.verify_mode = ssl.CERT_REQUIRED
+        context.load_verify_locations(ca_cert)
+        if cert_file:
+            context.load_cert_chain(cert_file, key_file)
+        _ssl_context_cache[key] = context
+
+    return context
+
+def get_hostname_pattern(pattern):
+    """
+    Return a compiled regular expression for a certificate name.
+
+    Replaces * with alphanumeric characters and . with a literal dot.
+    """
+    compiled = _hostname_pattern_cache.get(pattern, None)
+    if compiled is None:
+        compiled = re.compile(
+            pattern.replace(
+                r".", r"\."
+            ).replace(
+                r"*", r"[0-9A-Za-z]+"
+            )
+        )
+        _hostname_pattern_cache[pattern] = compiled
+
+    return compiled
 
 class LibcloudHTTPSConnection(httplib.HTTPSConnection):
     """LibcloudHTTPSConnection
@@ -33,6 +83,7 @@ class LibcloudHTTPSConnection(httplib.HTTPSConnection):
     """
     verify = False        # does not verify
     ca_cert = None        # no default CA Certificate
+    record = None         # RequestRecord the connection timings are added to
 
     def __init__(self, *args, **kwargs):
         """Constructor
@@ -64,12 +115,18 @@ class LibcloudHTTPSConnection(httplib.HTTPSConnection):
         if not self.verify:
             return
 
-        ca_certs_available = [cert
-                              for cert in libcloud.security.CA_CERTS_PATH
-                              if os.path.exists(cert)]
-        if ca_certs_available:
+        ca_certs_path = tuple(libcloud.security.CA_CERTS_PATH)
+        if ca_certs_path not in _ca_cert_cache:
+            ca_certs_available = [cert
+                                  for cert in ca_certs_path
+                                  if os.path.exists(cert)]
             # use first available certificate
-            self.ca_cert = ca_certs_available[0]
+            _ca_cert_cache[ca_certs_path] = (ca_certs_available and
+                                             ca_certs_available[0] or None)
+
+        ca_cert = _ca_cert_cache[ca_certs_path]
+        if ca_cert:
+            self.ca_cert = ca_cert
         else:
             # no certificates found; toggle verify to False
             warnings.warn(libcloud.security.CA_CERTS_UNAVAILABLE_MSG)
@@ -79,29 +136,43 @@ class LibcloudHTTPSConnection(httplib.HTTPSConnection):
     def connect(self):
         """Connect
 
-        Checks if verification is toggled; if not, just call
-        httplib.HTTPSConnection's connect
+        Connects through the shared resolver cache, then checks if
+        verification is toggled; if not, just wraps the socket
         """
+        sock = resolver.create_connection(
+            (self.host, self.port), self.timeout,
+            getattr(self, 'source_address', None), record=self.record)
+        hostname = self.host
+        if getattr(self, '_tunnel_host', None):
+            self.sock = sock
+            self._tunnel()
+            hostname = self._tunnel_host
+
+        started = time.time()
         if not self.verify:
-            return httplib.HTTPSConnection.connect(self)
-
-        # otherwise, create a connection and verify the hostname
-        # use socket.create_connection (in 2.6+) if possible
-        if getattr(socket, 'create_connection', None):
-            sock = socket.create_connection((self.host, self.port),
-                                            self.timeout)
+            self.sock = ssl.wrap_socket(sock, self.key_file, self.cert_file)
         else:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.connect((self.host, self.port))
-        self.sock = ssl.wrap_socket(sock,
-                                    self.key_file,
-                                    self.cert_file,
-                                    cert_reqs=ssl.CERT_REQUIRED,
-                                    ca_certs=self.ca_cert,
-                                    ssl_version=ssl.PROTOCOL_TLSv1)
-        cert = self.sock.getpeercert()
-        if not self._verify_hostname(self.host, cert):
-            raise ssl.SSLError('Failed to verify hostname')
+            # otherwise, verify the certificate and the hostname
+            context = get_ssl_context(self.ca_cert, self.key_file,
+                                      self.cert_file)
+            if context is not None:
+                kwargs = {}
+                if getattr(ssl, 'HAS_SNI', False):
+                    kwargs['server_hostname'] = hostname
+                self.sock = context.wrap_socket(sock, **kwargs)
+            else:
+                self.sock = ssl.wrap_socket(sock,
+                                            self.key_file,
+                                            self.cert_file,
+                                            cert_reqs=ssl.CERT_REQUIRED,
+                                            ca_certs=self.ca_cert,
+                                            ssl_version=ssl.PROTOCOL_TLSv1)
+            cert = self.sock.getpeercert()
+            if not self._verify_hostname(hostname, cert):
+                raise ssl.SSLError('Failed to verify hostname')
+
+        if self.record is not None:
+            self.record.add_timing('tls', time.time() - started)
 
     def _verify_hostname(self, hostname, cert):
         """Verify hostname against peer cert
@@ -112,16 +183,8 @@ class LibcloudHTTPSConnection(httplib.HTTPSConnection):
         common_name = self._get_common_name(cert)
         alt_names = self._get_subject_alt_names(cert)
 
-        # replace * with alphanumeric and dash
-        # replace . with literal .
         valid_patterns = [
-            re.compile(
-                pattern.replace(
-                    r".", r"\."
-                ).replace(
-                    r"*", r"[0-9A-Za-z]+"
-                )
-            )
+            get_hostname_pattern(pattern)
             for pattern
             in (set(common_name) | set(alt_names))
         ]
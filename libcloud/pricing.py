@@ -17,14 +17,11 @@ from __future__ import with_statement
 A class which handles loading the pricing files.
 """
 
-try:
-    import json
-except:
-    import simplejson as json
-
 import os.path
 from os.path import join as pjoin
 
+from libcloud.common import jsoncodec
+
 PRICING_FILE_PATH = 'data/pricing.json'
 
 PRICING_DATA = {
@@ -63,7 +60,7 @@ def get_pricing(driver_type, driver_name, pricing_file_path=None):
     with open(pricing_file_path) as fp:
         content = fp.read()
 
-    pricing = json.loads(content)[driver_name]
+    pricing = jsoncodec.loads(content)[driver_name]
 
     PRICING_DATA[driver_type][driver_name] = pricing
     return pricing
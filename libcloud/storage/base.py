@@ -19,9 +19,11 @@ from __future__ import with_statement
 import httplib
 import os.path                          # pylint: disable-msg=W0404
 import hashlib
+import time
 from os.path import join as pjoin
 
 from libcloud import utils
+from libcloud.common import metrics
 from libcloud.common.types import LibcloudError
 from libcloud.common.base import ConnectionKey
 from libcloud.storage.types import ObjectDoesNotExistError
@@ -141,6 +143,16 @@ class Container(object):
         return ('<Container: name=%s, provider=%s>'
                 % (self.name, self.driver.name))
 
+def get_storage_operation_name(method, path):
+    """
+    Return the operation name of a request to a container (C{path} is
+    C{/<container>}) or an object (C{/<container>/<object>}) without the
+    names, for L{ConnectionKey.get_operation_name}.
+    """
+    depth = min(len([p for p in path.split('/', 2) if p]), 2)
+    return '%s %s' % (method, ['/', '/{container}',
+                               '/{container}/{object}'][depth])
+
 class StorageDriver(object):
     """
     A base StorageDriver to derive from.
@@ -450,6 +462,7 @@ class StorageDriver(object):
                 driver=self)
 
         stream = utils.read_in_chunks(response, chunk_size)
+        start = time.time()
 
         try:
             data_read = stream.next()
@@ -459,15 +472,19 @@ class StorageDriver(object):
 
         bytes_transferred = 0
 
-        with open(file_path, 'wb') as file_handle:
-            while len(data_read) > 0:
-                file_handle.write(data_read)
-                bytes_transferred += len(data_read)
-
-                try:
-                    data_read = stream.next()
-                except StopIteration:
-                    data_read = ''
+        try:
+            with open(file_path, 'wb') as file_handle:
+                while len(data_read) > 0:
+                    file_handle.write(data_read)
+                    bytes_transferred += len(data_read)
+
+                    try:
+                        data_read = stream.next()
+                    except StopIteration:
+                        data_read = ''
+        finally:
+            metrics.record_transfer(self.name, 'download', bytes_transferred,
+                                    time.time() - start)
 
         if int(obj.size) != int(bytes_transferred):
             # Transfer failed, support retry?
@@ -522,6 +539,7 @@ class StorageDriver(object):
         success, data_hash, bytes_transferred = upload_func(**upload_func_kwargs)
 
         if not success:
+            response.close()
             raise LibcloudError(value='Object upload failed, Perhaps a timeout?',
                                 driver=self)
 
@@ -556,6 +574,7 @@ class StorageDriver(object):
             data_hash = hashlib.md5()
 
         generator = utils.read_in_chunks(iterator, chunk_size)
+        start = time.time()
 
         bytes_transferred = 0
         try:
@@ -564,31 +583,35 @@ class StorageDriver(object):
             # No data?
             return False, None, None
 
-        while len(chunk) > 0:
-            try:
-                if chunked:
-                    response.connection.connection.send('%X\r\n' %
-                                                       (len(chunk)))
-                    response.connection.connection.send(chunk)
-                    response.connection.connection.send('\r\n')
-                else:
-                    response.connection.connection.send(chunk)
-            except Exception:
-                # TODO: let this exception propagate
-                # Timeout, etc.
-                return False, None, bytes_transferred
-
-            bytes_transferred += len(chunk)
-            if calculate_hash:
-                data_hash.update(chunk)
-
-            try:
-                chunk = generator.next()
-            except StopIteration:
-                chunk = ''
-
-        if chunked:
-            response.connection.connection.send('0\r\n\r\n')
+        try:
+            while len(chunk) > 0:
+                try:
+                    if chunked:
+                        response.connection.connection.send('%X\r\n' %
+                                                           (len(chunk)))
+                        response.connection.connection.send(chunk)
+                        response.connection.connection.send('\r\n')
+                    else:
+                        response.connection.connection.send(chunk)
+                except Exception:
+                    # TODO: let this exception propagate
+                    # Timeout, etc.
+                    return False, None, bytes_transferred
+
+                bytes_transferred += len(chunk)
+                if calculate_hash:
+                    data_hash.update(chunk)
+
+                try:
+                    chunk = generator.next()
+                except StopIteration:
+                    chunk = ''
+
+            if chunked:
+                response.connection.connection.send('0\r\n\r\n')
+        finally:
+            metrics.record_transfer(self.name, 'upload', bytes_transferred,
+                                    time.time() - start)
 
         if calculate_hash:
             data_hash = data_hash.hexdigest()
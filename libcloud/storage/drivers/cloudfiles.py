@@ -17,17 +17,14 @@ import httplib
 import os.path
 import urllib
 
-try:
-    import json
-except:
-    import simplejson as json
-
 from libcloud import utils
+from libcloud.common import jsoncodec
 from libcloud.common.types import MalformedResponseError, LibcloudError
 from libcloud.common.base import Response
 
 from libcloud.storage.providers import Provider
 from libcloud.storage.base import Object, Container, StorageDriver
+from libcloud.storage.base import get_storage_operation_name
 from libcloud.storage.types import ContainerAlreadyExistsError
 from libcloud.storage.types import ContainerDoesNotExistError
 from libcloud.storage.types import ContainerIsNotEmptyError
@@ -65,7 +62,7 @@ class CloudFilesResponse(Response):
 
         if content_type == 'application/json':
             try:
-                data = json.loads(self.body)
+                data = jsoncodec.loads(self.body)
             except:
                 raise MalformedResponseError('Failed to parse JSON',
                                              body=self.body,
@@ -93,7 +90,7 @@ class CloudFilesConnection(RackspaceBaseConnection):
         self.accept_format = 'application/json'
 
     def request(self, action, params=None, data='', headers=None, method='GET',
-                raw=False):
+                raw=False, timeout=None, stream=False):
         if not headers:
             headers = {}
         if not params:
@@ -109,9 +106,14 @@ class CloudFilesConnection(RackspaceBaseConnection):
             action=action,
             params=params, data=data,
             method=method, headers=headers,
-            raw=raw
+            raw=raw, timeout=timeout, stream=stream
         )
 
+    def get_operation_name(self, action, params, method):
+        if self.request_path and action.startswith(self.request_path):
+            action = action[len(self.request_path):]
+        return get_storage_operation_name(method, action)
+
 
 class CloudFilesUSConnection(CloudFilesConnection):
     """
@@ -163,20 +165,51 @@ class CloudFilesStorageDriver(StorageDriver):
         if response.status == httplib.NO_CONTENT:
             return []
         elif response.status == httplib.OK:
-            return self._to_container_list(json.loads(response.body))
+            containers = response.object
+            if isinstance(containers, basestring):
+                # format=json was asked for, whatever the content type says
+                containers = jsoncodec.loads(containers)
+            return self._to_container_list(containers)
 
         raise LibcloudError('Unexpected status code: %s' % (response.status))
 
     def list_container_objects(self, container):
-        response = self.connection.request('/%s' % (container.name))
+        return list(self.iter_container_objects(container))
 
-        if response.status == httplib.NO_CONTENT:
-            # Empty or inexistent container
-            return []
-        elif response.status == httplib.OK:
-            return self._to_object_list(json.loads(response.body), container)
+    def iter_container_objects(self, container):
+        """
+        Yield the objects of a container as they are decoded from the
+        response, instead of loading the whole listing first.
 
-        raise LibcloudError('Unexpected status code: %s' % (response.status))
+        Breaking out of the loop closes the connection.
+
+        @note: This is a non-standard extension API, and
+               only works for CloudFiles.
+
+        @type container: C{Container}
+        @param container: Container instance
+
+        @return: A generator of L{Object} instances.
+        """
+        response = self.connection.request('/%s' % (container.name),
+                                           stream=True)
+
+        try:
+            if response.status == httplib.NO_CONTENT:
+                # Empty or inexistent container
+                return
+            elif response.status != httplib.OK:
+                raise LibcloudError('Unexpected status code: %s' %
+                                    (response.status))
+
+            try:
+                for obj in response.iter_json_array():
+                    yield self._to_object(obj, container)
+            except ValueError, e:
+                raise MalformedResponseError('Failed to parse JSON: %s' % (e),
+                                             driver=self)
+        finally:
+            response.close()
 
     def get_container(self, container_name):
         response = self.connection.request('/%s' % (container_name),
@@ -397,20 +430,12 @@ class CloudFilesStorageDriver(StorageDriver):
 
         return containers
 
-    def _to_object_list(self, response, container):
-        objects = []
-
-        for obj in response:
-            name = obj['name']
-            size = int(obj['bytes'])
-            hash = obj['hash']
-            extra = { 'content_type': obj['content_type'],
-                      'last_modified': obj['last_modified'] }
-            objects.append(Object(
-                name=name, size=size, hash=hash, extra=extra,
-                meta_data=None, container=container, driver=self))
-
-        return objects
+    def _to_object(self, obj, container):
+        extra = { 'content_type': obj['content_type'],
+                  'last_modified': obj['last_modified'] }
+        return Object(name=obj['name'], size=int(obj['bytes']),
+                      hash=obj['hash'], extra=extra, meta_data=None,
+                      container=container, driver=self)
 
     def _headers_to_container(self, name, headers):
         size = int(headers.get('x-container-bytes-used', 0))
@@ -23,13 +23,15 @@ import hmac
 from hashlib import sha1
 from xml.etree.ElementTree import Element, SubElement, tostring
 
-from libcloud.utils import fixxpath, findtext, in_development_warning
+from libcloud.utils import fixxpath, findtexts
+from libcloud.utils import in_development_warning
 from libcloud.utils import read_in_chunks
 from libcloud.common.types import InvalidCredsError, LibcloudError
 from libcloud.common.base import ConnectionUserAndKey
 from libcloud.common.aws import AWSBaseResponse
 
 from libcloud.storage.base import Object, Container, StorageDriver
+from libcloud.storage.base import get_storage_operation_name
 from libcloud.storage.types import ContainerIsNotEmptyError
 from libcloud.storage.types import ContainerDoesNotExistError
 from libcloud.storage.types import ObjectDoesNotExistError
@@ -88,6 +90,9 @@ class S3Connection(ConnectionUserAndKey):
         params['Expires'] = expires
         return params
 
+    def get_operation_name(self, action, params, method):
+        return get_storage_operation_name(method, action)
+
     def _get_aws_auth_param(self, method, headers, params, expires,
                             secret_key, path='/'):
         """
@@ -363,14 +368,13 @@ class S3StorageDriver(StorageDriver):
                  obj.findall(fixxpath(xpath=xpath, namespace=NAMESPACE))]
 
     def _to_container(self, element):
+        texts = findtexts(element=element, namespace=NAMESPACE)
         extra = {
-            'creation_date': findtext(element=element, xpath='CreationDate',
-                                      namespace=NAMESPACE)
+            'creation_date': texts.get('CreationDate')
         }
 
         container = Container(
-                        name=findtext(element=element, xpath='Name',
-                                      namespace=NAMESPACE),
+                        name=texts.get('Name'),
                         extra=extra,
                         driver=self
                     )
@@ -387,20 +391,15 @@ class S3StorageDriver(StorageDriver):
         return obj
 
     def _to_obj(self, element, container):
-        owner_id = findtext(element=element, xpath='Owner/ID',
-                            namespace=NAMESPACE)
-        owner_display_name = findtext(element=element,
-                                      xpath='Owner/DisplayName',
-                                      namespace=NAMESPACE)
+        texts = findtexts(element=element, namespace=NAMESPACE)
+        owner_id = texts.get('Owner/ID')
+        owner_display_name = texts.get('Owner/DisplayName')
         meta_data = { 'owner': { 'id': owner_id,
                                  'display_name':owner_display_name }}
 
-        obj = Object(name=findtext(element=element, xpath='Key',
-                     namespace=NAMESPACE),
-                     size=findtext(element=element, xpath='Size',
-                     namespace=NAMESPACE),
-                     hash=findtext(element=element, xpath='ETag',
-                     namespace=NAMESPACE),
+        obj = Object(name=texts.get('Key'),
+                     size=texts.get('Size'),
+                     hash=texts.get('ETag'),
                      extra=None,
                      meta_data=meta_data,
                      container=container,
@@ -82,31 +82,32 @@ def str2dicts(data):
     becomes:
     [{'cpu': '1100', 'ram': '640'}, {'cpu': '2200', 'ram': '1024'}]
     """
-    list_data = []
-    list_data.append({})
-    d = list_data[-1]
+    return list(iter_str2dicts(data.split('\n')))
+
+def iter_str2dicts(lines):
+    """
+    Incremental version of L{str2dicts}: yield the dictionaries one by one
+    as the records are read from C{lines}.
 
-    lines = data.split('\n')
+    @type lines: C{Iterator}
+    @param lines: Lines of the text, e.g. L{StreamingResponse.iter_lines}.
+    """
+    d = {}
     for line in lines:
         line = line.strip()
 
         if not line:
-            d = {}
-            list_data.append(d)
-            d = list_data[-1]
+            # A blank line ends the record
+            if d:
+                yield d
+                d = {}
             continue
 
-        whitespace = line.find(' ')
+        key, _, value = line.partition(' ')
+        d[key] = value
 
-        if not whitespace:
-            continue
-
-        key = line[0:whitespace]
-        value = line[whitespace + 1:]
-        d.update({key: value})
-
-    list_data = [value for value in list_data if value != {}]
-    return list_data
+    if d:
+        yield d
 
 def str2list(data):
     """
@@ -150,22 +151,32 @@ def dict2str(data):
     cpu 1100
     ram 640
     smp auto
-
-    cpu 2200
-    ram 1024
     """
-    result = ''
-    for k in data:
-        if data[k] != None:
-            result += '%s %s\n' % (str(k), str(data[k]))
+    lines = []
+    for k, v in data.iteritems():
+        if v != None:
+            lines.append('%s %s\n' % (str(k), str(v)))
         else:
-            result += '%s\n' % str(k)
+            lines.append('%s\n' % str(k))
 
-    return result
+    return ''.join(lines)
+
+# Namespaced xpaths by (xpath, namespace), the drivers only use a small
+# set of literal xpaths
+_xpath_cache = {}
+XPATH_CACHE_SIZE = 1024
 
 def fixxpath(xpath, namespace):
     # ElementTree wants namespaces in its xpaths, so here we add them.
-    return '/'.join(['{%s}%s' % (namespace, e) for e in xpath.split('/')])
+    key = (xpath, namespace)
+    fixed = _xpath_cache.get(key)
+    if fixed is None:
+        fixed = '/'.join(['{%s}%s' % (namespace, e)
+                          for e in xpath.split('/')])
+        if len(_xpath_cache) >= XPATH_CACHE_SIZE:
+            _xpath_cache.clear()
+        _xpath_cache[key] = fixed
+    return fixed
 
 def findtext(element, xpath, namespace):
     return element.findtext(fixxpath(xpath=xpath, namespace=namespace))
@@ -176,6 +187,43 @@ def findattr(element, xpath, namespace):
 def findall(element, xpath, namespace):
     return element.findall(fixxpath(xpath=xpath, namespace=namespace))
 
+def findtexts(element, namespace=None):
+    """
+    Return the text of all the descendants of C{element}, keyed by their
+    xpath relative to it (without the C{namespace}), in a single pass:
+
+    >>> from xml.etree import ElementTree as ET
+    >>> element = ET.XML('<a><b>1</b><c><d>2</d></c><e/><b>3</b></a>')
+    >>> texts = findtexts(element)
+    >>> texts['b'], texts['c/d'], texts['e']
+    ('1', '2', '')
+
+    A missing key gives the C{None} L{findtext} would return. As with
+    L{findtext}, the first element of a path wins, use L{findall} for
+    repeated elements.
+    """
+    if namespace:
+        prefix = '{%s}' % (namespace)
+    else:
+        prefix = ''
+    texts = {}
+    _findtexts(element, prefix, len(prefix), '', texts)
+    return texts
+
+def _findtexts(element, prefix, length, path, texts):
+    for child in element:
+        tag = child.tag
+        if not isinstance(tag, basestring):
+            # Comment or processing instruction
+            continue
+        if length and tag[:length] == prefix:
+            tag = tag[length:]
+        key = path + tag
+        if key not in texts:
+            texts[key] = child.text or ''
+        if len(child):
+            _findtexts(child, prefix, length, key + '/', texts)
+
 def get_driver(drivers, provider):
     """
     Get a driver.
@@ -134,6 +134,52 @@ class CoverageCommand(Command):
         cov.save()
         cov.html_report()
 
+class BenchmarkCommand(Command):
+    user_options = [
+        ('count=', 'c', 'number of entries in each response'),
+        ('repeat=', 'r', 'number of runs of each benchmark'),
+        ('output=', 'o', 'file the JSON report is written to'),
+        ('benchmarks=', 'b', 'comma separated names of the benchmarks to run'),
+        ('footprint', 'f', 'measure the memory held by the parsed objects '
+                           'instead of the parse time')
+    ]
+    boolean_options = ['footprint']
+
+    def initialize_options(self):
+        THIS_DIR = os.path.abspath(os.path.split(__file__)[0])
+        sys.path.insert(0, THIS_DIR)
+        self.count = None
+        self.repeat = None
+        self.output = None
+        self.benchmarks = None
+        self.footprint = False
+
+    def finalize_options(self):
+        if self.count is not None:
+            self.count = int(self.count)
+        if self.repeat is not None:
+            self.repeat = int(self.repeat)
+        if self.benchmarks:
+            self.benchmarks = self.benchmarks.split(',')
+
+    def run(self):
+        from test import benchmarks
+
+        if self.footprint:
+            from test import footprint
+
+            report = footprint.run_footprints(
+                count=self.count or benchmarks.DEFAULT_COUNT,
+                names=self.benchmarks)
+            benchmarks.write_report(report, self.output)
+            return
+
+        report = benchmarks.run_benchmarks(
+            count=self.count or benchmarks.DEFAULT_COUNT,
+            repeat=self.repeat or benchmarks.DEFAULT_REPEAT,
+            names=self.benchmarks)
+        benchmarks.write_report(report, self.output)
+
 # pre-2.6 will need the ssl PyPI package
 pre_python26 = (sys.version_info[0] == 2 and sys.version_info[1] < 6)
 
@@ -163,7 +209,8 @@ setup(
     cmdclass={
         'test': TestCommand,
         'apidocs': ApiDocsCommand,
-        'coverage': CoverageCommand
+        'coverage': CoverageCommand,
+        'benchmark': BenchmarkCommand
     },
     classifiers=[
         'Development Status :: 4 - Beta',
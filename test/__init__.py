@@ -18,6 +18,8 @@ from cStringIO import StringIO
 from urllib2 import urlparse
 from cgi import parse_qs
 
+from libcloud.common.accounting import Tracker
+
 class multipleresponse(object):
     """
     A decorator that allows MockHttp objects to return multi responses
@@ -60,6 +62,9 @@ class MockResponse(object):
     def getheaders(self):
         return self.headers.items()
 
+    def isclosed(self):
+        return True
+
     def msg(self):
         raise NotImplemented
 
@@ -106,7 +111,7 @@ class MockHttp(BaseMockHttpObject):
     responseCls = MockResponse
     host = None
     port = None
-    response = None
+    _response = None
 
     type = None
     use_param = None # will use this param to namespace the request function
@@ -127,10 +132,10 @@ class MockHttp(BaseMockHttpObject):
                                           qs=qs, path=path)
         meth = getattr(self, meth_name)
         status, body, headers, reason = meth(method, url, body, headers)
-        self.response = self.responseCls(status, body, headers, reason)
+        self._response = self.responseCls(status, body, headers, reason)
 
     def getresponse(self):
-        return self.response
+        return self._response
 
     def connect(self):
         """
@@ -190,10 +195,41 @@ class MockRawResponse(BaseMockHttpObject):
     def headers(self):
         return self._headers
 
+    def close(self):
+        pass
+
     @property
     def reason(self):
         return self._reason
 
+class RequestCountMixin(object):
+    """
+    Assertions on the number of requests made by driver methods, so extra
+    round trips added to a method fail the tests.
+    """
+
+    def assertMaxRequests(self, max_requests, func, *args, **kwargs):
+        """
+        Call a driver method and fail if it made more than C{max_requests}
+        requests, counting the ones of the driver methods it called.
+
+        @return: The result of the call.
+        """
+        tracker = Tracker().start()
+        if getattr(func, 'im_self', None) is not None:
+            # Look the method up again so the call is tracked as one
+            func = getattr(func.im_self, func.__name__)
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            tracker.stop()
+
+        count = tracker.count_requests()
+        if count > max_requests:
+            self.fail('%s made %d requests, expected at most %d:\n%s' %
+                      (func.__name__, count, max_requests, tracker.format()))
+        return result
+
 if __name__ == "__main__":
     import doctest
     doctest.testmod()
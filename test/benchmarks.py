@@ -0,0 +1,659 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Response parsing benchmarks.
+
+The test fixtures are scaled up to C{count} entries and the list calls of
+the drivers are run against them through L{MockHttp}, so the numbers cover
+the whole path from the response body to the model objects.
+
+Run with:
+
+    python setup.py benchmark --count=100000 --output=results.json
+
+or C{python -m test.benchmarks --help} from the top of the source tree.
+
+Every benchmark runs in its own child process (where C{os.fork} is
+available) so the reported peak memory only accounts for that benchmark.
+The results are written as JSON:
+
+    {"python": "2.7.18", "libcloud": "0.5.0-dev", "time": 1300000000.0,
+     "results": [{"name": "ec2_list_nodes", "count": 100000,
+                  "items": 100000, "seconds": 4.2,
+                  "items_per_second": 23809.5, "latency_us": 42.0,
+                  "max_rss_kb": 901232, "rss_delta_kb": 812344}, ...]}
+
+C{seconds} is the fastest of the C{repeat} runs, C{rss_delta_kb} is the
+growth of the peak resident set size from before the setup of the
+benchmark to the end of its runs. The setup only holds the scaled response
+bodies, so the peak is normally reached while parsing them.
+
+The C{xml_parse_*} benchmarks parse C{count} of the XML compute fixtures
+with each installed L{xmlparser} backend and also report
+C{bytes_per_second}.
+"""
+import copy
+import glob
+import httplib
+import os
+import sys
+import time
+
+from cgi import parse_qs
+from urllib2 import urlparse
+from xml.etree import ElementTree as ET
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import libcloud
+
+from libcloud.common import jsoncodec
+from libcloud.common import xmlparser
+from libcloud.compute.drivers.cloudsigma import CloudSigmaZrhNodeDriver
+from libcloud.compute.drivers.ec2 import EC2NodeDriver
+from libcloud.compute.drivers.linode import LinodeNodeDriver
+from libcloud.compute.drivers.rackspace import RackspaceNodeDriver
+from libcloud.storage.base import Container
+from libcloud.storage.drivers.cloudfiles import CloudFilesStorageDriver
+
+from test.file_fixtures import ComputeFileFixtures, StorageFileFixtures
+from test.compute.test_cloudsigma import CloudSigmaHttp
+from test.compute.test_ec2 import EC2MockHttp
+from test.compute.test_linode import LinodeMockHttp
+from test.compute.test_rackspace import RackspaceMockHttp
+from test.storage.test_cloudfiles import CloudFilesMockHttp
+
+DEFAULT_COUNT = 10000
+DEFAULT_REPEAT = 3
+
+EC2_NAMESPACE = 'http://ec2.amazonaws.com/doc/2010-08-31/'
+
+def scale_xml(body, path, count, update):
+    """
+    Return C{body} with the children of the element at C{path} repeated
+    until there are C{count} of them. C{update} is called with every copy
+    and its index so ids can be made unique.
+    """
+    root = ET.fromstring(body)
+    if path:
+        parent = root.find(path)
+    else:
+        parent = root
+    templates = list(parent)
+    for child in templates:
+        parent.remove(child)
+
+    for i in xrange(count):
+        child = copy.deepcopy(templates[i % len(templates)])
+        update(child, i)
+        parent.append(child)
+    return ET.tostring(root)
+
+def scale_list(items, count, update):
+    """
+    Return a list of C{count} copies of the C{items} dicts, C{update} is
+    called with every copy and its index.
+    """
+    scaled = []
+    for i in xrange(count):
+        item = dict(items[i % len(items)])
+        update(item, i)
+        scaled.append(item)
+    return scaled
+
+def scale_blocks(body, count, update):
+    """
+    Return C{count} copies of the blank line separated blocks of C{body},
+    C{update} is called with the lines of every copy and its index.
+    """
+    blocks = [block.strip().split('\n') for block in body.split('\n\n')
+              if block.strip()]
+    scaled = []
+    for i in xrange(count):
+        lines = list(blocks[i % len(blocks)])
+        update(lines, i)
+        scaled.append('\n'.join(lines))
+    return '\n\n'.join(scaled)
+
+class Benchmark(object):
+    """
+    A driver call run against a scaled response.
+
+    Subclasses set the mock responses up in L{setup} and return the parsed
+    items from L{call}. Connection classes are swapped with
+    L{set_conn_classes} so L{teardown} can restore them.
+
+    @cvar size: Number of bytes parsed by a call, if known.
+    """
+    name = None
+    size = None
+    _saved_conn_classes = None
+
+    def available(cls):
+        """
+        Return False if the benchmark can't run here.
+        """
+        return True
+    available = classmethod(available)
+
+    def setup(self, count):
+        raise NotImplementedError
+
+    def teardown(self):
+        for connection_cls, conn_classes in self._saved_conn_classes or []:
+            if conn_classes is None:
+                del connection_cls.conn_classes
+            else:
+                connection_cls.conn_classes = conn_classes
+        self._saved_conn_classes = None
+
+    def set_conn_classes(self, connection_cls, conn_classes):
+        """
+        Make C{connection_cls} use C{conn_classes} until L{teardown}.
+        """
+        if self._saved_conn_classes is None:
+            self._saved_conn_classes = []
+        self._saved_conn_classes.append(
+            (connection_cls, connection_cls.__dict__.get('conn_classes')))
+        connection_cls.conn_classes = conn_classes
+
+    def call(self):
+        raise NotImplementedError
+
+    def run(self):
+        return len(self.call())
+
+class EC2BenchmarkHttp(EC2MockHttp):
+    # Scaled response body of each action
+    bodies = {}
+
+    def _respond(self, action):
+        return (httplib.OK, self.bodies[action], {},
+                httplib.responses[httplib.OK])
+
+    def _DescribeInstances(self, method, url, body, headers):
+        return self._respond('DescribeInstances')
+
+    def _DescribeImages(self, method, url, body, headers):
+        return self._respond('DescribeImages')
+
+    def _DescribeAvailabilityZones(self, method, url, body, headers):
+        return self._respond('DescribeAvailabilityZones')
+
+class EC2Benchmark(Benchmark):
+
+    def setup(self, count):
+        self.set_conn_classes(EC2NodeDriver.connectionCls,
+                              (None, EC2BenchmarkHttp))
+        EC2BenchmarkHttp.use_param = 'Action'
+        EC2BenchmarkHttp.type = None
+        self.driver = EC2NodeDriver('foo', 'bar')
+
+    def scale(self, action, fixture, path, count, update):
+        fixtures = ComputeFileFixtures('ec2')
+        EC2BenchmarkHttp.bodies[action] = scale_xml(
+            fixtures.load(fixture), path, count, update)
+
+class EC2ListNodes(EC2Benchmark):
+    name = 'ec2_list_nodes'
+
+    def setup(self, count):
+        def update(item, i):
+            instance = item.find('{%s}instancesSet/{%s}item' %
+                                 (EC2_NAMESPACE, EC2_NAMESPACE))
+            instance.find('{%s}instanceId' % (EC2_NAMESPACE)).text = \
+                'i-%08x' % (i)
+            item.find('{%s}reservationId' % (EC2_NAMESPACE)).text = \
+                'r-%08x' % (i)
+
+        super(EC2ListNodes, self).setup(count)
+        self.scale('DescribeInstances', 'describe_instances.xml',
+                   '{%s}reservationSet' % (EC2_NAMESPACE), count, update)
+
+    def call(self):
+        return self.driver.list_nodes()
+
+class EC2ListImages(EC2Benchmark):
+    name = 'ec2_list_images'
+
+    def setup(self, count):
+        def update(item, i):
+            item.find('{%s}imageId' % (EC2_NAMESPACE)).text = 'ami-%08x' % (i)
+            item.find('{%s}imageLocation' % (EC2_NAMESPACE)).text = \
+                'ec2-public-images/image-%d.manifest.xml' % (i)
+
+        super(EC2ListImages, self).setup(count)
+        self.scale('DescribeImages', 'describe_images.xml',
+                   '{%s}imagesSet' % (EC2_NAMESPACE), count, update)
+
+    def call(self):
+        return self.driver.list_images()
+
+class EC2ListLocations(EC2Benchmark):
+    name = 'ec2_list_locations'
+
+    def setup(self, count):
+        def update(item, i):
+            item.find('{%s}zoneName' % (EC2_NAMESPACE)).text = \
+                'us-east-%d' % (i)
+
+        super(EC2ListLocations, self).setup(count)
+        self.scale('DescribeAvailabilityZones',
+                   'describe_availability_zones.xml',
+                   '{%s}availabilityZoneInfo' % (EC2_NAMESPACE), count,
+                   update)
+
+    def call(self):
+        return self.driver.list_locations()
+
+class EC2ListSizes(EC2Benchmark):
+    """
+    The sizes are built from a static table, C{count} is ignored.
+    """
+    name = 'ec2_list_sizes'
+
+    def call(self):
+        return self.driver.list_sizes()
+
+class RackspaceBenchmarkHttp(RackspaceMockHttp):
+    body = None
+
+    def _v1_0_slug_servers_detail(self, method, url, body, headers):
+        return (httplib.OK, self.body, {}, httplib.responses[httplib.OK])
+
+class RackspaceListNodes(Benchmark):
+    name = 'rackspace_list_nodes'
+
+    def setup(self, count):
+        def update(server, i):
+            server.set('id', str(i))
+            server.set('name', 'server-%d' % (i))
+
+        fixtures = ComputeFileFixtures('rackspace')
+        RackspaceBenchmarkHttp.body = scale_xml(
+            fixtures.load('v1_slug_servers_detail.xml'), None, count, update)
+        self.set_conn_classes(RackspaceNodeDriver.connectionCls,
+                              (None, RackspaceBenchmarkHttp))
+        RackspaceBenchmarkHttp.type = None
+        self.driver = RackspaceNodeDriver('foo', 'bar')
+
+    def call(self):
+        return self.driver.list_nodes()
+
+class LinodeBenchmarkHttp(LinodeMockHttp):
+    body = None
+
+    def _linode_list(self, method, url, body, headers):
+        return (httplib.OK, self.body, {}, httplib.responses[httplib.OK])
+
+    def _batch(self, method, url, body, headers):
+        qs = parse_qs(urlparse.urlparse(url)[4])
+        answers = []
+        for query in jsoncodec.loads(qs['api_requestArray'][0]):
+            lid = query['LinodeID']
+            answers.append({'ACTION': 'linode.ip.list', 'ERRORARRAY': [],
+                            'DATA': [{'RDNS_NAME': 'li%d.members.linode.com'
+                                                   % (lid),
+                                      'ISPUBLIC': 1,
+                                      'IPADDRESS': '10.%d.%d.%d' %
+                                                   ((lid >> 16) & 255,
+                                                    (lid >> 8) & 255,
+                                                    lid & 255),
+                                      'IPADDRESSID': lid,
+                                      'LINODEID': lid}]})
+        return (httplib.OK, jsoncodec.dumps(answers), {},
+                httplib.responses[httplib.OK])
+
+class LinodeListNodes(Benchmark):
+    name = 'linode_list_nodes'
+
+    def setup(self, count):
+        def update(item, i):
+            item['LINODEID'] = i
+            item['LABEL'] = 'node-%d' % (i)
+
+        # The Linode tests have no fixture files, reuse their mock response
+        mock = LinodeMockHttp('localhost', 80)
+        template = jsoncodec.loads(mock._linode_list('GET', '/', None, {})[1])
+        template['DATA'] = scale_list(template['DATA'], count, update)
+        LinodeBenchmarkHttp.body = jsoncodec.dumps(template)
+        self.set_conn_classes(LinodeNodeDriver.connectionCls,
+                              (None, LinodeBenchmarkHttp))
+        LinodeBenchmarkHttp.use_param = 'api_action'
+        LinodeBenchmarkHttp.type = None
+        self.driver = LinodeNodeDriver('foo')
+
+    def call(self):
+        return self.driver.list_nodes()
+
+class CloudFilesBenchmarkHttp(CloudFilesMockHttp):
+    body = None
+    containers_body = None
+
+    def _v1_MossoCloudFS(self, method, url, body, headers):
+        return (httplib.OK, self.containers_body, self.base_headers,
+                httplib.responses[httplib.OK])
+
+    def _v1_MossoCloudFS_test_container(self, method, url, body, headers):
+        return (httplib.OK, self.body, self.base_headers,
+                httplib.responses[httplib.OK])
+
+class CloudFilesListContainers(Benchmark):
+    name = 'cloudfiles_list_containers'
+
+    def setup(self, count):
+        def update(item, i):
+            item['name'] = 'container%d' % (i)
+
+        fixtures = StorageFileFixtures('cloudfiles')
+        CloudFilesBenchmarkHttp.containers_body = jsoncodec.dumps(scale_list(
+            jsoncodec.loads(fixtures.load('list_containers.json')), count,
+            update))
+        self.set_conn_classes(CloudFilesStorageDriver.connectionCls,
+                              (None, CloudFilesBenchmarkHttp))
+        CloudFilesBenchmarkHttp.type = None
+        self.driver = CloudFilesStorageDriver('dummy', 'dummy')
+
+    def call(self):
+        return self.driver.list_containers()
+
+class CloudFilesListContainerObjects(Benchmark):
+    name = 'cloudfiles_list_container_objects'
+
+    def setup(self, count):
+        def update(item, i):
+            item['name'] = 'object %d' % (i)
+            item['hash'] = '%032x' % (i)
+
+        fixtures = StorageFileFixtures('cloudfiles')
+        CloudFilesBenchmarkHttp.body = jsoncodec.dumps(scale_list(
+            jsoncodec.loads(fixtures.load('list_container_objects.json')), count,
+            update))
+        self.set_conn_classes(CloudFilesStorageDriver.connectionCls,
+                              (None, CloudFilesBenchmarkHttp))
+        CloudFilesBenchmarkHttp.type = None
+        self.driver = CloudFilesStorageDriver('dummy', 'dummy')
+        self.container = Container(name='test_container', extra={},
+                                   driver=self.driver)
+
+    def call(self):
+        return self.driver.list_container_objects(self.container)
+
+class CloudSigmaBenchmarkHttp(CloudSigmaHttp):
+    body = None
+
+    def _servers_info(self, method, url, body, headers):
+        return (httplib.OK, self.body, {}, httplib.responses[httplib.OK])
+
+class CloudSigmaListNodes(Benchmark):
+    name = 'cloudsigma_list_nodes'
+
+    def setup(self, count):
+        def update(lines, i):
+            for index, line in enumerate(lines):
+                if line.startswith('server '):
+                    lines[index] = 'server %08x-0000-0000-0000-000000000000' \
+                                   % (i)
+                elif line.startswith('name '):
+                    lines[index] = 'name node %d' % (i)
+
+        fixtures = ComputeFileFixtures('cloudsigma')
+        CloudSigmaBenchmarkHttp.body = scale_blocks(
+            fixtures.load('servers_info.txt'), count, update)
+        self.set_conn_classes(CloudSigmaZrhNodeDriver.connectionCls,
+                              (None, CloudSigmaBenchmarkHttp))
+        self.driver = CloudSigmaZrhNodeDriver('foo', 'bar')
+
+    def call(self):
+        return self.driver.list_nodes()
+
+class XMLParse(Benchmark):
+    """
+    Parses the XML compute fixtures with an L{xmlparser} backend, C{count}
+    documents per call.
+    """
+    backend = None
+
+    def available(cls):
+        try:
+            xmlparser.load_backend(cls.backend)
+        except ImportError:
+            return False
+        return True
+    available = classmethod(available)
+
+    def setup(self, count):
+        fixtures = ComputeFileFixtures()
+        paths = glob.glob(os.path.join(fixtures.root, '*', '*.xml'))
+        paths.sort()
+        bodies = [open(path).read() for path in paths]
+        self.documents = [bodies[i % len(bodies)] for i in xrange(count)]
+        self.size = sum([len(document) for document in self.documents])
+        self.parse = xmlparser.load_backend(self.backend).fromstring
+
+    def call(self):
+        parse = self.parse
+        return [parse(document) for document in self.documents]
+
+class CElementTreeParse(XMLParse):
+    name = 'xml_parse_celementtree'
+    backend = 'cElementTree'
+
+class LxmlParse(XMLParse):
+    name = 'xml_parse_lxml'
+    backend = 'lxml'
+
+class ElementTreeParse(XMLParse):
+    name = 'xml_parse_elementtree'
+    backend = 'ElementTree'
+
+class JSONParse(Benchmark):
+    """
+    Decodes the JSON compute and storage fixtures with a L{jsoncodec}
+    backend, C{count} documents per call.
+    """
+    backend = None
+
+    def available(cls):
+        try:
+            jsoncodec.load_backend(cls.backend)
+        except ImportError:
+            return False
+        return True
+    available = classmethod(available)
+
+    def setup(self, count):
+        paths = []
+        for fixtures in (ComputeFileFixtures(), StorageFileFixtures()):
+            paths.extend(glob.glob(os.path.join(fixtures.root, '*',
+                                                '*.json')))
+        paths.sort()
+        bodies = [open(path).read() for path in paths]
+        self.documents = [bodies[i % len(bodies)] for i in xrange(count)]
+        self.size = sum([len(document) for document in self.documents])
+        self.parse = jsoncodec.load_backend(self.backend).loads
+
+    def call(self):
+        parse = self.parse
+        return [parse(document) for document in self.documents]
+
+class UJSONParse(JSONParse):
+    name = 'json_parse_ujson'
+    backend = 'ujson'
+
+class SimpleJSONParse(JSONParse):
+    name = 'json_parse_simplejson'
+    backend = 'simplejson'
+
+class StandardJSONParse(JSONParse):
+    name = 'json_parse_json'
+    backend = 'json'
+
+BENCHMARKS = [
+    EC2ListNodes,
+    EC2ListImages,
+    EC2ListLocations,
+    RackspaceListNodes,
+    LinodeListNodes,
+    CloudFilesListContainers,
+    CloudFilesListContainerObjects,
+    CloudSigmaListNodes,
+    CElementTreeParse,
+    LxmlParse,
+    ElementTreeParse,
+    UJSONParse,
+    SimpleJSONParse,
+    StandardJSONParse
+]
+
+def _max_rss():
+    if resource is None:
+        return None
+    # Kilobytes on Linux, bytes on OS X
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        max_rss = max_rss / 1024
+    return max_rss
+
+def measure(benchmark_cls, count=DEFAULT_COUNT, repeat=DEFAULT_REPEAT):
+    """
+    Run a benchmark in the current process and return its result C{dict}.
+    """
+    benchmark = benchmark_cls()
+    # Before the setup: it frees the copies it scales the fixtures with and
+    # the runs reuse that memory without raising the peak
+    start_rss = _max_rss()
+
+    best = None
+    try:
+        benchmark.setup(count)
+        for i in range(repeat):
+            start = time.time()
+            items = benchmark.run()
+            seconds = time.time() - start
+            if best is None or seconds < best:
+                best = seconds
+    finally:
+        benchmark.teardown()
+
+    max_rss = _max_rss()
+    result = {'name': benchmark.name, 'count': count, 'items': items,
+              'seconds': best, 'max_rss_kb': max_rss, 'rss_delta_kb': None}
+    if max_rss is not None:
+        result['rss_delta_kb'] = max_rss - start_rss
+
+    if best and items:
+        result['items_per_second'] = items / best
+        result['latency_us'] = best * 1000000 / items
+    else:
+        result['items_per_second'] = None
+        result['latency_us'] = None
+    if best and benchmark.size is not None:
+        result['bytes_per_second'] = benchmark.size / best
+    return result
+
+def measure_isolated(benchmark_cls, count=DEFAULT_COUNT,
+                     repeat=DEFAULT_REPEAT):
+    """
+    Like L{measure} but in a child process, so the peak memory use of
+    previous benchmarks doesn't hide this one's.
+    """
+    if not hasattr(os, 'fork'):
+        return measure(benchmark_cls, count, repeat)
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        status = 0
+        try:
+            try:
+                result = measure(benchmark_cls, count, repeat)
+            except Exception, e:
+                result = {'name': benchmark_cls.name, 'error': str(e)}
+                status = 1
+            os.write(write_fd, jsoncodec.dumps(result))
+        finally:
+            os._exit(status)
+
+    os.close(write_fd)
+    data = []
+    while True:
+        chunk = os.read(read_fd, 65536)
+        if not chunk:
+            break
+        data.append(chunk)
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+
+    if not data:
+        return {'name': benchmark_cls.name, 'error': 'benchmark crashed'}
+    return jsoncodec.loads(''.join(data))
+
+def run_benchmarks(count=DEFAULT_COUNT, repeat=DEFAULT_REPEAT, names=None,
+                   isolated=True):
+    """
+    Run the benchmarks (all of them or the ones in C{names}) and return the
+    report C{dict}.
+    """
+    results = []
+    for benchmark_cls in BENCHMARKS:
+        if names and benchmark_cls.name not in names:
+            continue
+        if not benchmark_cls.available():
+            continue
+        if isolated:
+            result = measure_isolated(benchmark_cls, count, repeat)
+        else:
+            result = measure(benchmark_cls, count, repeat)
+        results.append(result)
+
+    return {'python': '.'.join([str(v) for v in sys.version_info[:3]]),
+            'libcloud': libcloud.__version__,
+            'time': time.time(),
+            'results': results}
+
+def main(argv=None):
+    from optparse import OptionParser
+
+    parser = OptionParser(usage='%prog [options] [benchmark ...]')
+    parser.add_option('-c', '--count', type='int', default=DEFAULT_COUNT,
+                      help='number of entries in each response')
+    parser.add_option('-r', '--repeat', type='int', default=DEFAULT_REPEAT,
+                      help='number of runs of each benchmark')
+    parser.add_option('-o', '--output', default=None,
+                      help='file the JSON report is written to')
+    options, names = parser.parse_args(argv)
+
+    report = run_benchmarks(options.count, options.repeat, names)
+    write_report(report, options.output)
+    return int(bool([r for r in report['results'] if 'error' in r]))
+
+def write_report(report, output=None):
+    data = jsoncodec.dumps(report, indent=2, sort_keys=True)
+    if output:
+        fp = open(output, 'w')
+        try:
+            fp.write(data + '\n')
+        finally:
+            fp.close()
+    else:
+        print data
+
+if __name__ == '__main__':
+    sys.exit(main())
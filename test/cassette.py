@@ -0,0 +1,243 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Record and replay HTTP traffic.
+
+Record real traffic of any driver into a cassette:
+
+    from libcloud.compute.drivers.ec2 import EC2Connection
+    from test.cassette import Cassette, RecordingHTTPSConnection
+
+    RecordingHTTPSConnection.cassette = Cassette('ec2.json')
+    EC2Connection.conn_classes = (None, RecordingHTTPSConnection)
+    driver.list_nodes()
+    RecordingHTTPSConnection.cassette.save()
+
+and replay it without network access:
+
+    from test.cassette import Cassette, ReplayHttp
+
+    ReplayHttp.cassette = Cassette('ec2.json').load()
+    EC2Connection.conn_classes = (None, ReplayHttp)
+
+Requests are matched on method, path, query string and body. Parameters
+which change on every request (time stamps, signatures, ...) are ignored
+when matching and not recorded.
+
+The values of secret parameters (API keys, passwords) and response headers
+(auth tokens) are replaced with C{FILTERED} before they are recorded, and
+so are their occurrences in the bodies. Other credentials in the bodies are
+stored as they are, so check the cassettes of authentication requests
+before committing them.
+"""
+import base64
+import httplib
+
+from urllib2 import urlparse
+from cgi import parse_qs
+
+from libcloud.common import jsoncodec
+from libcloud.common.base import LibcloudHTTPConnection
+from libcloud.common.base import LibcloudHTTPSConnection
+
+from test import MockHttp, MockResponse
+
+# Query string parameters ignored when matching requests
+IGNORE_PARAMS = ['AWSAccessKeyId', 'Expires', 'Signature', 'Timestamp']
+
+# Query string parameters whose values are never recorded
+SECRET_PARAMS = ['api_key', 'apikey', 'password']
+
+# Response headers whose values are never recorded (lower case)
+SECRET_HEADERS = ['authorization', 'set-cookie', 'x-auth-token',
+                  'x-storage-token']
+
+# Replaces the secret values in the cassettes
+FILTERED = 'FILTERED'
+
+class Cassette(object):
+    """
+    A list of recorded request / response pairs.
+    """
+
+    def __init__(self, path=None, ignore_params=IGNORE_PARAMS,
+                 secret_params=SECRET_PARAMS, secret_headers=SECRET_HEADERS):
+        self.path = path
+        self.ignore_params = ignore_params
+        self.secret_params = secret_params
+        self.secret_headers = [name.lower() for name in secret_headers]
+        self.interactions = []
+        self._index = None
+
+    def load(self):
+        fp = open(self.path, 'r')
+        try:
+            self.interactions = jsoncodec.load(fp)['interactions']
+        finally:
+            fp.close()
+        self._index = None
+        return self
+
+    def save(self):
+        fp = open(self.path, 'w')
+        try:
+            fp.write(jsoncodec.dumps({'interactions': self.interactions},
+                                     indent=2, sort_keys=True))
+        finally:
+            fp.close()
+
+    def record(self, method, url, body, status, headers, response_body,
+               reason):
+        path, query = self._normalize(url)
+
+        secrets = []
+        for name, values in self._parse_query(url).items():
+            if name in self.secret_params:
+                secrets.extend(values)
+        filtered_headers = {}
+        for name, value in headers.items():
+            if name.lower() in self.secret_headers:
+                secrets.append(value)
+                value = FILTERED
+            filtered_headers[name] = value
+
+        self.interactions.append({
+            'request': {'method': method, 'path': path, 'query': query,
+                        'body': _encode_body(_filter(body, secrets))},
+            'response': {'status': status, 'reason': reason,
+                         'headers': filtered_headers,
+                         'body': _encode_body(_filter(response_body,
+                                                      secrets))}
+        })
+        self._index = None
+
+    def play(self, method, url, body):
+        """
+        Return the (status, body, headers, reason) tuple of the response
+        recorded for a request.
+
+        Matching responses are returned in the recorded order; once they
+        have all been played the last one is returned again.
+        """
+        if self._index is None:
+            self._index = {}
+            for interaction in self.interactions:
+                request = interaction['request']
+                key = self._key(request['method'], request['path'],
+                                request['query'],
+                                _decode_body(request['body']))
+                self._index.setdefault(key, []).append(
+                    interaction['response'])
+
+        path, query = self._normalize(url)
+        responses = self._index.get(self._key(method, path, query, body))
+        if not responses:
+            raise KeyError('No recorded response for %s %s' % (method, url))
+
+        if len(responses) > 1:
+            response = responses.pop(0)
+        else:
+            response = responses[0]
+
+        return (response['status'], _decode_body(response['body']),
+                response['headers'], response['reason'])
+
+    def _normalize(self, url):
+        query = self._parse_query(url)
+        for param in self.ignore_params:
+            query.pop(param, None)
+        for param in self.secret_params:
+            if param in query:
+                query[param] = [FILTERED]
+        return urlparse.urlparse(url)[2], sorted(query.items())
+
+    def _parse_query(self, url):
+        return parse_qs(urlparse.urlparse(url)[4], keep_blank_values=True)
+
+    def _key(self, method, path, query, body):
+        return (method, path,
+                tuple([(k, tuple(v)) for k, v in query]), body or '')
+
+def _filter(body, secrets):
+    if not body:
+        return body
+    for secret in secrets:
+        if secret:
+            body = body.replace(secret, FILTERED)
+    return body
+
+def _encode_body(body):
+    if not body:
+        return body
+    try:
+        return body.decode('utf-8')
+    except UnicodeDecodeError:
+        return {'base64': base64.b64encode(body)}
+
+def _decode_body(body):
+    if isinstance(body, dict):
+        return base64.b64decode(body['base64'])
+    if body is None:
+        return None
+    return body.encode('utf-8')
+
+class RecordingConnection():
+    """
+    Mixin which records the requests sent over a connection and their
+    responses in C{cassette}.
+
+    Responses are not compressed so cassettes stay readable. Raw requests
+    are not recorded.
+    """
+    cassette = None
+    connection_cls = None
+
+    _request = None
+
+    def request(self, method, url, body=None, headers=None):
+        headers = dict(headers or {})
+        headers.pop('Accept-Encoding', None)
+        self._request = (method, url, body)
+        return self.connection_cls.request(self, method, url, body, headers)
+
+    def getresponse(self):
+        response = self.connection_cls.getresponse(self)
+        request, self._request = self._request, None
+        if request is None:
+            return response
+
+        method, url, body = request
+        response_body = response.read()
+        headers = dict(response.getheaders())
+        self.cassette.record(method, url, body, response.status, headers,
+                             response_body, response.reason)
+        return MockResponse(response.status, response_body, headers,
+                            response.reason)
+
+class RecordingHTTPConnection(RecordingConnection, LibcloudHTTPConnection):
+    connection_cls = LibcloudHTTPConnection
+
+class RecordingHTTPSConnection(RecordingConnection, LibcloudHTTPSConnection):
+    connection_cls = LibcloudHTTPSConnection
+
+class ReplayHttp(MockHttp):
+    """
+    Serves the responses recorded in C{cassette}.
+    """
+    cassette = None
+
+    def request(self, method, url, body=None, headers=None, raw=False):
+        status, body, headers, reason = self.cassette.play(method, url, body)
+        self._response = self.responseCls(status, body, headers, reason)
@@ -14,6 +14,7 @@
 # limitations under the License.
 import sys
 import unittest
+import threading
 
 from libcloud.common.base import Response
 from libcloud.common.base import ConnectionKey, ConnectionUserAndKey
@@ -49,5 +50,23 @@ class BaseTests(unittest.TestCase):
     def test_base_connection_userkey(self):
         ConnectionUserAndKey('foo', 'bar')
 
+    def test_base_connection_key_thread_local_state(self):
+        connection = ConnectionKey('foo')
+        connection.action = '/main'
+        connection.method = 'GET'
+        result = []
+
+        def worker():
+            result.append((connection.action, connection.method))
+            connection.action = '/worker'
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        self.assertEqual(result, [(None, None)])
+        self.assertEqual(connection.action, '/main')
+        self.assertEqual(connection.method, 'GET')
+
 if __name__ == '__main__':
     sys.exit(unittest.main())
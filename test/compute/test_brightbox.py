@@ -13,8 +13,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import sys
+import time
 import unittest
 import httplib
+import threading
 
 try:
     import json
@@ -35,6 +37,8 @@ class BrightboxTest(unittest.TestCase, TestCaseMixin):
     def setUp(self):
         BrightboxNodeDriver.connectionCls.conn_classes = (None, BrightboxMockHttp)
         BrightboxMockHttp.type = None
+        BrightboxMockHttp.token_requests = 0
+        BrightboxMockHttp.token_delay = 0
         self.driver = BrightboxNodeDriver(BRIGHTBOX_CLIENT_ID, BRIGHTBOX_CLIENT_SECRET)
 
     def test_authentication(self):
@@ -44,6 +48,28 @@ class BrightboxTest(unittest.TestCase, TestCaseMixin):
         BrightboxMockHttp.type = 'UNAUTHORIZED_CLIENT'
         self.assertRaises(InvalidCredsError, self.driver.list_nodes)
 
+    def test_token_is_fetched_once(self):
+        BrightboxMockHttp.token_delay = 0.05
+        results = []
+        def list_nodes():
+            results.append(len(self.driver.list_nodes()))
+        threads = [threading.Thread(target=list_nodes) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [1, 1, 1, 1])
+        self.assertEqual(BrightboxMockHttp.token_requests, 1)
+        self.assertEqual(len(self.driver.list_nodes()), 1)
+        self.assertEqual(BrightboxMockHttp.token_requests, 1)
+
+    def test_auth_lock_is_per_connection(self):
+        other = BrightboxNodeDriver(BRIGHTBOX_CLIENT_ID,
+                                    BRIGHTBOX_CLIENT_SECRET)
+        self.assertFalse(other.connection._auth_lock is
+                         self.driver.connection._auth_lock)
+
     def test_list_nodes(self):
         nodes = self.driver.list_nodes()
         self.assertEqual(len(nodes), 1)
@@ -83,9 +109,13 @@ class BrightboxTest(unittest.TestCase, TestCaseMixin):
 
 class BrightboxMockHttp(MockHttp):
     fixtures = ComputeFileFixtures('brightbox')
+    token_requests = 0
+    token_delay = 0
 
     def _token(self, method, url, body, headers):
         if method == 'POST':
+            BrightboxMockHttp.token_requests += 1
+            time.sleep(BrightboxMockHttp.token_delay)
             return self.response(httplib.OK, self.fixtures.load('token.json'))
 
     def _token_INVALID_CLIENT(self, method, url, body, headers):
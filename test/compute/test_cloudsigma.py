@@ -19,7 +19,7 @@ import httplib
 
 from libcloud.compute.base import Node
 from libcloud.compute.drivers.cloudsigma import CloudSigmaZrhNodeDriver
-from libcloud.utils import str2dicts, str2list, dict2str
+from libcloud.utils import str2dicts, str2list, dict2str, iter_str2dicts
 
 from test import MockHttp               # pylint: disable-msg=E0611
 from test.compute import TestCaseMixin  # pylint: disable-msg=E0611
@@ -43,6 +43,11 @@ class CloudSigmaTestCase(unittest.TestCase, TestCaseMixin):
         self.assertEqual(node.extra['cpu'], 1100)
         self.assertEqual(node.extra['mem'], 640)
 
+    def test_iter_nodes(self):
+        nodes = self.driver.iter_nodes()
+        self.assertEqual(nodes.next().public_ip, ['1.2.3.4'])
+        self.assertEqual(list(nodes), [])
+
     def test_list_sizes(self):
         images = self.driver.list_sizes()
         self.assertEqual(len(images), 9)
@@ -115,6 +120,14 @@ class CloudSigmaTestCase(unittest.TestCase, TestCaseMixin):
         result = str2dicts(string)
         self.assertEqual(len(result), 2)
 
+    def test_iter_str2dicts(self):
+        lines = iter(['', 'mem 1024', ' cpu 2200 ', '', '', 'name a b',
+                      'status', '\r'])
+        result = iter_str2dicts(lines)
+        self.assertEqual(result.next(), {'mem': '1024', 'cpu': '2200'})
+        self.assertEqual(result.next(), {'name': 'a b', 'status': ''})
+        self.assertEqual(list(result), [])
+
     def test_str2list(self):
         string = 'ip 1.2.3.4\nip 1.2.3.5\nip 1.2.3.6'
         result = str2list(string)
@@ -130,6 +143,9 @@ class CloudSigmaTestCase(unittest.TestCase, TestCaseMixin):
         self.assertTrue(result.find('smp 5') >= 0)
         self.assertTrue(result.find('cpu 2200') >= 0)
         self.assertTrue(result.find('mem 1024') >= 0)
+        self.assertEqual(dict2str({'vnc': None}), 'vnc\n')
+        self.assertEqual(str2dicts(dict2str(d)),
+                         [dict([(k, str(v)) for k, v in d.items()])])
 
 class CloudSigmaHttp(MockHttp):
     fixtures = ComputeFileFixtures('cloudsigma')
@@ -19,15 +19,16 @@ import httplib
 from libcloud.compute.drivers.ec2 import EC2NodeDriver, EC2APSENodeDriver
 from libcloud.compute.drivers.ec2 import NimbusNodeDriver
 from libcloud.compute.drivers.ec2 import EC2APNENodeDriver, IdempotentParamError
+from libcloud.common.base import StreamingResponse
 from libcloud.compute.base import Node, NodeImage, NodeSize, NodeLocation
 
-from test import MockHttp
+from test import MockHttp, RequestCountMixin
 from test.compute import TestCaseMixin
 from test.file_fixtures import ComputeFileFixtures
 
 from test.secrets import EC2_ACCESS_ID, EC2_SECRET
 
-class EC2Tests(unittest.TestCase, TestCaseMixin):
+class EC2Tests(unittest.TestCase, TestCaseMixin, RequestCountMixin):
 
     def setUp(self):
         EC2NodeDriver.connectionCls.conn_classes = (None, EC2MockHttp)
@@ -88,7 +89,8 @@ class EC2Tests(unittest.TestCase, TestCaseMixin):
         self.assertEqual(node.id, 'i-2ba64342')
 
     def test_list_nodes(self):
-        node = self.driver.list_nodes()[0]
+        # DescribeInstances and DescribeAddresses
+        node = self.assertMaxRequests(2, self.driver.list_nodes)[0]
         public_ips = sorted(node.public_ip)
         self.assertEqual(node.id, 'i-4382922a')
         self.assertEqual(len(node.public_ip), 2)
@@ -96,6 +98,40 @@ class EC2Tests(unittest.TestCase, TestCaseMixin):
         self.assertEqual(public_ips[0], '1.2.3.4')
         self.assertEqual(public_ips[1], '1.2.3.5')
 
+    def test_iter_nodes(self):
+        nodes = self.driver.iter_nodes()
+        node = nodes.next()
+        self.assertEqual(node.id, 'i-4382922a')
+        self.assertEqual(node.extra['groups'], ['default'])
+        self.assertEqual(sorted(node.public_ip),
+                         sorted(self.driver.list_nodes()[0].public_ip))
+        self.assertEqual(list(nodes), [])
+
+    def test_iter_nodes_closes_response(self):
+        closed = self._track_closed_streams()
+        nodes = self.driver.iter_nodes()
+        nodes.next()
+        self.assertEqual(closed, [])
+        nodes.close()
+        self.assertEqual(len(closed), 1)
+
+    def test_iter_nodes_closes_response_on_addresses_error(self):
+        closed = self._track_closed_streams()
+        EC2MockHttp.type = 'addresses_error'
+        self.assertRaises(httplib.BadStatusLine, self.driver.list_nodes)
+        self.assertEqual(len(closed), 1)
+
+    def _track_closed_streams(self):
+        closed = []
+
+        class TrackingStreamingResponse(StreamingResponse):
+            def close(self):
+                closed.append(self)
+                StreamingResponse.close(self)
+
+        self.driver.connection.streamResponseCls = TrackingStreamingResponse
+        return closed
+
     def test_list_location(self):
         locations = self.driver.list_locations()
         self.assertTrue(len(locations) > 0)
@@ -284,6 +320,12 @@ class EC2MockHttp(MockHttp):
         body = self.fixtures.load('modify_instance_attribute.xml')
         return (httplib.OK, body, {}, httplib.responses[httplib.OK])
 
+    def _addresses_error_DescribeInstances(self, method, url, body, headers):
+        return self._DescribeInstances(method, url, body, headers)
+
+    def _addresses_error_DescribeAddresses(self, method, url, body, headers):
+        raise httplib.BadStatusLine('')
+
     def _idempotent_CreateTags(self, method, url, body, headers):
         body = self.fixtures.load('create_tags.xml')
         return (httplib.OK, body, {}, httplib.responses[httplib.OK])
@@ -310,6 +352,11 @@ class NimbusTests(EC2Tests):
         self.driver = NimbusNodeDriver(EC2_ACCESS_ID, EC2_SECRET,
                 host="some.nimbuscloud.com")
 
+    def test_iter_nodes_closes_response_on_addresses_error(self):
+        # overridden from EC2Tests -- Nimbus doesn't support elastic IPs.
+        EC2MockHttp.type = 'addresses_error'
+        self.assertEqual(len(self.driver.list_nodes()), 1)
+
     def test_ex_describe_addresses_for_node(self):
         # overridden from EC2Tests -- Nimbus doesn't support elastic IPs.
         node = Node('i-4382922a', None, None, None, None, self.driver)
@@ -334,7 +381,7 @@ class NimbusTests(EC2Tests):
 
     def test_list_nodes(self):
         # overridden from EC2Tests -- Nimbus doesn't support elastic IPs.
-        node = self.driver.list_nodes()[0]
+        node = self.assertMaxRequests(1, self.driver.list_nodes)[0]
         public_ips = node.public_ip
         self.assertEqual(node.id, 'i-4382922a')
         self.assertEqual(len(node.public_ip), 1)
@@ -56,6 +56,17 @@ class ElasticHostsTestCase(unittest.TestCase):
         else:
             self.fail('test should have thrown')
 
+    def test_empty_response(self):
+        ElasticHostsHttp.type = 'EMPTY'
+        self.assertEqual(self.driver.list_nodes(), [])
+
+    def test_to_node_error_is_not_malformed_response(self):
+        def _to_node(data):
+            raise ValueError('invalid literal for int()')
+        self.driver._to_node = _to_node
+        # Only decoding errors are reported as malformed responses
+        self.assertRaises(ValueError, self.driver.list_nodes)
+
     def test_parse_error(self):
         ElasticHostsHttp.type = 'PARSE_ERROR'
         try:
@@ -88,6 +99,11 @@ class ElasticHostsTestCase(unittest.TestCase):
         self.assertEqual(node.public_ip[1], "1.2.3.5")
         self.assertEqual(node.extra['smp'], 1)
 
+    def test_iter_nodes(self):
+        nodes = self.driver.iter_nodes()
+        self.assertEqual(nodes.next().public_ip, ['1.2.3.4', '1.2.3.5'])
+        self.assertEqual(list(nodes), [])
+
     def test_list_sizes(self):
         images = self.driver.list_sizes()
         self.assertEqual(len(images), 6)
@@ -137,6 +153,9 @@ class ElasticHostsHttp(MockHttp):
          body = "{malformed: '"
          return (httplib.OK, body, {}, httplib.responses[httplib.NO_CONTENT])
 
+    def _servers_info_EMPTY(self, method, url, body, headers):
+         return (httplib.OK, '', {}, httplib.responses[httplib.OK])
+
     def _servers_info_PARSE_ERROR(self, method, url, body, headers):
          return (505, body, {}, httplib.responses[httplib.NO_CONTENT])
 
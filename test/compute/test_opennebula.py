@@ -22,13 +22,13 @@ import httplib
 from libcloud.compute.drivers.opennebula import OpenNebulaNodeDriver
 from libcloud.compute.base import Node, NodeImage, NodeSize
 
-from test import MockHttp
+from test import MockHttp, RequestCountMixin
 from test.compute import TestCaseMixin
 from test.file_fixtures import ComputeFileFixtures
 
 from test.secrets import OPENNEBULA_USER, OPENNEBULA_KEY
 
-class OpenNebulaTests(unittest.TestCase, TestCaseMixin):
+class OpenNebulaTests(unittest.TestCase, TestCaseMixin, RequestCountMixin):
 
     def setUp(self):
         OpenNebulaNodeDriver.connectionCls.conn_classes = (None, OpenNebulaMockHttp)
@@ -42,7 +42,8 @@ class OpenNebulaTests(unittest.TestCase, TestCaseMixin):
         self.assertEqual(node.name, 'MyCompute')
 
     def test_list_nodes(self):
-        nodes = self.driver.list_nodes()
+        # The list of computes and one request per compute
+        nodes = self.assertMaxRequests(3, self.driver.list_nodes)
         self.assertEqual(len(nodes), 2)
         node = nodes[0]
         self.assertEqual(node.id, '5')
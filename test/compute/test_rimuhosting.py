@@ -72,6 +72,13 @@ class RimuHostingTest(unittest.TestCase, TestCaseMixin):
         image = self.driver.list_images()[0]
         self.driver.create_node(name="api.ivan.net.nz", image=image, size=size)
 
+    def test_request_timeout(self):
+        # The per call timeout goes through the request override
+        response = self.driver.connection.request('/distributions',
+                                                  timeout=5)
+        self.assertEqual(len(response.object['distro_infos']), 6)
+        self.assertEqual(self.driver.connection.connection.timeout, 5)
+
 class RimuHostingMockHttp(MockHttp):
 
     fixtures = ComputeFileFixtures('rimuhosting')
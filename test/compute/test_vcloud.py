@@ -35,6 +35,11 @@ class TerremarkTests(unittest.TestCase, TestCaseMixin):
         TerremarkMockHttp.type = None
         self.driver = TerremarkDriver(TERREMARK_USER, TERREMARK_SECRET)
 
+    def test_auth_lock_is_per_connection(self):
+        other = TerremarkDriver(TERREMARK_USER, TERREMARK_SECRET)
+        self.assertFalse(other.connection._auth_lock is
+                         self.driver.connection._auth_lock)
+
     def test_list_images(self):
         ret = self.driver.list_images()
         self.assertEqual(ret[0].id,'https://services.vcloudexpress.terremark.com/api/v0.8/vAppTemplate/5')
@@ -0,0 +1,151 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Memory footprint of the model objects.
+
+The list calls of L{test.benchmarks} are run against scaled responses and
+the memory held by the returned objects (L{Node}, L{NodeImage},
+L{NodeSize}, L{NodeLocation}, L{Container}, L{Object}, ...) is measured by
+walking everything they reference, except the driver:
+
+    python setup.py benchmark --footprint --count=100000
+
+or C{python -m test.footprint --help} from the top of the source tree.
+
+The results are written as JSON, in the format of L{test.benchmarks}:
+
+    {"python": "2.7.18", "libcloud": "0.5.0-dev", "time": 1300000000.0,
+     "results": [{"name": "ec2_list_images", "count": 100000,
+                  "items": 100000, "bytes": 98000000,
+                  "bytes_per_item": 980.0, "objects": 1100000,
+                  "types": {"dict": {"count": 200000,
+                                     "bytes": 56000000}, ...}}, ...]}
+
+C{bytes} is the size of the returned list and of everything only reachable
+through it, as reported by C{sys.getsizeof}. It doesn't include the
+allocator overhead. Objects shared between the items (e.g. a L{Container}
+referenced by all its objects) are counted once.
+"""
+import gc
+import sys
+import time
+import types
+
+import libcloud
+
+from libcloud.common.base import ConnectionKey
+
+from test.benchmarks import (DEFAULT_COUNT, EC2ListNodes, EC2ListImages,
+                             EC2ListSizes, EC2ListLocations,
+                             CloudFilesListContainers,
+                             CloudFilesListContainerObjects, write_report)
+
+FOOTPRINTS = [
+    EC2ListNodes,
+    EC2ListImages,
+    EC2ListSizes,
+    EC2ListLocations,
+    CloudFilesListContainers,
+    CloudFilesListContainerObjects
+]
+
+# Objects owned by the interpreter or the drivers rather than the items
+SHARED_TYPES = (type, types.ModuleType, types.FunctionType,
+                types.BuiltinFunctionType, types.MethodType,
+                types.ClassType, ConnectionKey)
+
+def get_footprint(root, exclude=()):
+    """
+    Return the total size of C{root} and of the objects it references,
+    and the number of objects and their size per type, as
+    C{(size, {type name: [count, size]})}.
+
+    The objects in C{exclude} and the ones only reachable through them are
+    not counted.
+    """
+    seen = set([id(o) for o in exclude])
+    pending = [root]
+    total = 0
+    by_type = {}
+
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+
+        size = sys.getsizeof(obj)
+        total += size
+        stats = by_type.setdefault(type(obj).__name__, [0, 0])
+        stats[0] += 1
+        stats[1] += size
+        pending.extend(gc.get_referents(obj))
+
+    return total, by_type
+
+def measure_footprint(benchmark_cls, count=DEFAULT_COUNT):
+    """
+    Run a benchmark and return the footprint of its result as a C{dict}.
+    """
+    benchmark = benchmark_cls()
+    try:
+        benchmark.setup(count)
+        items = benchmark.call()
+    finally:
+        benchmark.teardown()
+
+    size, by_type = get_footprint(items, exclude=(benchmark.driver,))
+    result = {'name': benchmark.name, 'count': count, 'items': len(items),
+              'bytes': size,
+              'objects': sum([stats[0] for stats in by_type.values()]),
+              'types': dict([(name, {'count': stats[0], 'bytes': stats[1]})
+                             for name, stats in by_type.items()])}
+    if items:
+        result['bytes_per_item'] = float(size) / len(items)
+    else:
+        result['bytes_per_item'] = None
+    return result
+
+def run_footprints(count=DEFAULT_COUNT, names=None):
+    """
+    Measure the footprints (all of them or the ones in C{names}) and
+    return the report C{dict}.
+    """
+    results = []
+    for benchmark_cls in FOOTPRINTS:
+        if names and benchmark_cls.name not in names:
+            continue
+        results.append(measure_footprint(benchmark_cls, count))
+
+    return {'python': '.'.join([str(v) for v in sys.version_info[:3]]),
+            'libcloud': libcloud.__version__,
+            'time': time.time(),
+            'results': results}
+
+def main(argv=None):
+    from optparse import OptionParser
+
+    parser = OptionParser(usage='%prog [options] [benchmark ...]')
+    parser.add_option('-c', '--count', type='int', default=DEFAULT_COUNT,
+                      help='number of entries in each response')
+    parser.add_option('-o', '--output', default=None,
+                      help='file the JSON report is written to')
+    options, names = parser.parse_args(argv)
+
+    write_report(run_footprints(options.count, names), options.output)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
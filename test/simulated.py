@@ -0,0 +1,321 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Simulated network for load testing drivers without a cloud account.
+
+Wraps a L{MockHttp} class (or L{ReplayHttp}) so its responses take time
+and sometimes fail:
+
+    from test.simulated import Route, Simulation, simulate
+
+    simulation = Simulation([
+        Route('GET /servers', latency=0.2, jitter=0.05),
+        Route('PUT ', bandwidth=1024 * 1024, reset_rate=0.01),
+        Route('', latency=0.05, throttle_rate=0.1, retry_after=1)
+    ], seed=1)
+    EC2NodeDriver.connectionCls.conn_classes = (
+        None, simulate(EC2MockHttp, simulation))
+
+Routes are searched in order, the first one whose pattern matches the
+start of C{"<method> <path>"} is used. C{simulation.stats} counts what
+happened so far.
+"""
+import errno
+import httplib
+import random
+import re
+import socket
+import threading
+import time
+
+from test import MockResponse
+
+__all__ = [
+    "Route",
+    "Simulation",
+    "SimulatedConnection",
+    "simulate"
+    ]
+
+DISTRIBUTIONS = ['uniform', 'normal', 'exponential']
+
+class Route(object):
+    """
+    Behaviour of the requests matching a pattern.
+    """
+
+    def __init__(self, pattern='', latency=0, jitter=0,
+                 distribution='uniform', bandwidth=None, error_rate=0,
+                 reset_rate=0, throttle_rate=0,
+                 throttle_status=httplib.SERVICE_UNAVAILABLE,
+                 retry_after=None):
+        """
+        @type pattern: C{str}
+        @param pattern: Regular expression matched against the start of
+                        C{"<method> <path>"}.
+
+        @type latency: C{float}
+        @param latency: Seconds until the response headers arrive (the
+                        mean for the C{normal} and C{exponential}
+                        distributions).
+
+        @type jitter: C{float}
+        @param jitter: Maximum deviation from C{latency} for the C{uniform}
+                       distribution, standard deviation for C{normal}.
+
+        @type distribution: C{str}
+        @param distribution: One of L{DISTRIBUTIONS}.
+
+        @type bandwidth: C{int}
+        @param bandwidth: Bytes per second at which request and response
+                          bodies are transferred, unlimited if C{None}.
+
+        @type error_rate: C{float}
+        @param error_rate: Fraction of the connections which are refused.
+
+        @type reset_rate: C{float}
+        @param reset_rate: Fraction of the requests reset by the peer once
+                           they have been sent.
+
+        @type throttle_rate: C{float}
+        @param throttle_rate: Fraction of the requests answered with
+                              C{throttle_status} instead of the mocked
+                              response.
+
+        @type retry_after: C{int}
+        @param retry_after: Retry-After header of the throttled responses.
+        """
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError('Unknown distribution: %s' % (distribution))
+
+        self.pattern = pattern
+        self.latency = latency
+        self.jitter = jitter
+        self.distribution = distribution
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.reset_rate = reset_rate
+        self.throttle_rate = throttle_rate
+        self.throttle_status = throttle_status
+        self.retry_after = retry_after
+        self._regex = re.compile(pattern)
+
+    def matches(self, method, path):
+        return self._regex.match('%s %s' % (method, path)) is not None
+
+    def sample_latency(self, rand):
+        """
+        Return the latency of a request drawn from the route's distribution.
+        """
+        if self.distribution == 'normal':
+            latency = rand.gauss(self.latency, self.jitter)
+        elif self.distribution == 'exponential':
+            if self.latency:
+                latency = rand.expovariate(1.0 / self.latency)
+            else:
+                latency = 0
+        else:
+            latency = self.latency + rand.uniform(-self.jitter, self.jitter)
+        return max(latency, 0)
+
+    def __repr__(self):
+        return '<Route: pattern=%r, latency=%s>' % (self.pattern,
+                                                    self.latency)
+
+class Simulation(object):
+    """
+    Routes and shared state of the simulated connections.
+
+    @ivar stats: Number of C{requests}, refused connections (C{errors}),
+                 C{resets}, C{throttled} responses and C{timeouts}.
+    """
+
+    def __init__(self, routes=None, default=None, seed=None,
+                 sleep=time.sleep):
+        """
+        @type routes: C{list} of L{Route}
+        @param routes: Routes, searched in order.
+
+        @type default: L{Route}
+        @param default: Route of the requests no other route matches,
+                        defaults to an instant and reliable one.
+
+        @type seed: C{int}
+        @param seed: Seed of the random generator, for repeatable runs.
+
+        @type sleep: C{callable}
+        @param sleep: Used to wait, tests can pass a function which only
+                      records the delays.
+        """
+        self.routes = routes or []
+        self.default = default or Route()
+        self.sleep = sleep
+        self.stats = dict.fromkeys(['requests', 'errors', 'resets',
+                                    'throttled', 'timeouts'], 0)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def get_route(self, method, url):
+        path = url.split('?', 1)[0]
+        for route in self.routes:
+            if route.matches(method, path):
+                return route
+        return self.default
+
+    def random(self):
+        self._lock.acquire()
+        try:
+            return self._random.random()
+        finally:
+            self._lock.release()
+
+    def sample_latency(self, route):
+        self._lock.acquire()
+        try:
+            return route.sample_latency(self._random)
+        finally:
+            self._lock.release()
+
+    def count(self, name):
+        self._lock.acquire()
+        try:
+            self.stats[name] += 1
+        finally:
+            self._lock.release()
+
+    def transfer(self, route, size):
+        """
+        Wait for C{size} bytes to be transferred on C{route}.
+        """
+        if route.bandwidth and size:
+            self.sleep(float(size) / route.bandwidth)
+
+class SimulatedResponse(object):
+    """
+    Response whose body is read at the bandwidth of its route.
+    """
+
+    def __init__(self, response, simulation, route):
+        self._response = response
+        self._simulation = simulation
+        self._route = route
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+    def read(self, *args, **kwargs):
+        data = self._response.read(*args, **kwargs)
+        self._simulation.transfer(self._route, len(data))
+        return data
+
+class SimulatedConnection():
+    """
+    Mixin which delays and breaks the requests of a mock connection
+    according to C{simulation}.
+
+    Raw requests (C{putrequest}, C{send}, ...) are buffered and passed to
+    the mocked C{request} in one go, so raw transfers can be simulated on
+    top of any L{MockHttp}.
+    """
+    simulation = None
+    connection_cls = None
+    timeout = None
+
+    _route = None
+    _pending = None
+    _throttled = None
+
+    def request(self, method, url, body=None, headers=None):
+        self._begin(method, url)
+        if body and isinstance(body, basestring):
+            self.simulation.transfer(self._route, len(body))
+        self._simulation_request(method, url, body, headers)
+
+    def putrequest(self, method, url, *args, **kwargs):
+        self._begin(method, url)
+        self._pending = (method, url, {}, [])
+
+    def putheader(self, header, *values):
+        self._pending[2][header] = '\r\n\t'.join([str(v) for v in values])
+
+    def endheaders(self, *args, **kwargs):
+        pass
+
+    def send(self, data):
+        if self._pending is None:
+            raise httplib.CannotSendRequest()
+        self.simulation.transfer(self._route, len(data))
+        self._pending[3].append(data)
+
+    def getresponse(self):
+        if self._pending is not None:
+            (method, url, headers, body), self._pending = self._pending, None
+            self._simulation_request(method, url, ''.join(body), headers)
+
+        simulation, route = self.simulation, self._route
+        latency = simulation.sample_latency(route)
+        if self.timeout is not None and latency > self.timeout:
+            simulation.sleep(self.timeout)
+            simulation.count('timeouts')
+            raise socket.timeout('timed out')
+        if latency:
+            simulation.sleep(latency)
+
+        if self._throttled is not None:
+            response, self._throttled = self._throttled, None
+            return response
+
+        if simulation.random() < route.reset_rate:
+            simulation.count('resets')
+            raise socket.error(errno.ECONNRESET,
+                               'Connection reset by peer (simulated)')
+
+        response = self.connection_cls.getresponse(self)
+        return SimulatedResponse(response, simulation, route)
+
+    def _begin(self, method, url):
+        simulation = self.simulation
+        simulation.count('requests')
+        self._route = route = simulation.get_route(method, url)
+        self._throttled = None
+
+        if simulation.random() < route.error_rate:
+            simulation.count('errors')
+            raise socket.error(errno.ECONNREFUSED,
+                               'Connection refused (simulated)')
+
+    def _simulation_request(self, method, url, body, headers):
+        simulation, route = self.simulation, self._route
+        if simulation.random() < route.throttle_rate:
+            simulation.count('throttled')
+            headers = {}
+            if route.retry_after is not None:
+                headers['retry-after'] = str(route.retry_after)
+            self._throttled = MockResponse(route.throttle_status,
+                                           'Throttled (simulated)', headers,
+                                           httplib.responses.get(
+                                               route.throttle_status))
+            return
+
+        self.connection_cls.request(self, method, url, body, headers)
+
+def simulate(connection_cls, simulation):
+    """
+    Return a subclass of the mock C{connection_cls} run through
+    C{simulation}, to be used in C{conn_classes}.
+    """
+    return type('Simulated%s' % (connection_cls.__name__),
+                (SimulatedConnection, connection_cls),
+                {'connection_cls': connection_cls, 'simulation': simulation})
@@ -22,6 +22,7 @@ import httplib
 
 import libcloud.utils
 
+from libcloud.common import pool
 from libcloud.common.types import LibcloudError
 from libcloud.storage.base import Container, Object
 from libcloud.storage.types import ContainerAlreadyExistsError
@@ -33,9 +34,10 @@ from libcloud.storage.drivers.cloudfiles import CloudFilesStorageDriver
 from libcloud.storage.drivers.dummy import DummyIterator
 
 from test import MockHttp, MockRawResponse # pylint: disable-msg=E0611
+from test import RequestCountMixin       # pylint: disable-msg=E0611
 from test.file_fixtures import StorageFileFixtures # pylint: disable-msg=E0611
 
-class CloudFilesTests(unittest.TestCase):
+class CloudFilesTests(unittest.TestCase, RequestCountMixin):
 
     def setUp(self):
         CloudFilesStorageDriver.connectionCls.conn_classes = (
@@ -82,6 +84,44 @@ class CloudFilesTests(unittest.TestCase):
         self.assertEqual(obj.size, 1160520)
         self.assertEqual(obj.container.name, 'test_container')
 
+    def test_iter_container_objects(self):
+        container = Container(
+            name='test_container', extra={}, driver=self.driver)
+        objects = self.driver.iter_container_objects(container=container)
+        self.assertEqual(objects.next().name, 'foo test 1')
+        self.assertEqual([obj.name for obj in objects],
+                         [obj.name for obj in
+                          self.driver.list_container_objects(container)][1:])
+
+    def test_iter_container_objects_no_content(self):
+        CloudFilesMockHttp.type = 'NO_CONTENT'
+        container = Container(
+            name='test_container', extra={}, driver=self.driver)
+        pool.close_all()
+        objects = self.driver.iter_container_objects(container=container)
+        self.assertEqual(list(objects), [])
+
+        # The connection went back to the pool
+        connection = self.driver.connection.connection
+        connection_pool = pool.get_pool(CloudFilesMockHttp, connection.host,
+                                        connection.port, True)
+        self.assertEqual(len(connection_pool), 1)
+        self.assertTrue(connection_pool.get() is connection)
+
+    def test_iter_container_objects_unexpected_status(self):
+        CloudFilesMockHttp.type = 'CREATED'
+        container = Container(
+            name='test_container', extra={}, driver=self.driver)
+        pool.close_all()
+        objects = self.driver.iter_container_objects(container=container)
+        self.assertRaises(LibcloudError, list, objects)
+
+        # The streamed response was closed and its connection released
+        connection = self.driver.connection.connection
+        connection_pool = pool.get_pool(CloudFilesMockHttp, connection.host,
+                                        connection.port, True)
+        self.assertEqual(len(connection_pool), 1)
+
     def test_get_container(self):
         container = self.driver.get_container(container_name='test_container')
         self.assertEqual(container.name, 'test_container')
@@ -89,7 +129,9 @@ class CloudFilesTests(unittest.TestCase):
         self.assertEqual(container.extra['size'], 1234568)
 
     def test_get_object(self):
-        obj = self.driver.get_object(container_name='test_container',
+        # HEAD of the container and of the object
+        obj = self.assertMaxRequests(2, self.driver.get_object,
+                                     container_name='test_container',
                                      object_name='test_object')
         self.assertEqual(obj.container.name, 'test_container')
         self.assertEqual(obj.size, 555)
@@ -419,6 +461,20 @@ class CloudFilesMockHttp(MockHttp):
                 self.base_headers,
                 httplib.responses[httplib.OK])
 
+    def _v1_MossoCloudFS_test_container_NO_CONTENT(self, method, url, body,
+                                                   headers):
+        return (httplib.NO_CONTENT,
+                '',
+                self.base_headers,
+                httplib.responses[httplib.NO_CONTENT])
+
+    def _v1_MossoCloudFS_test_container_CREATED(self, method, url, body,
+                                                headers):
+        return (httplib.CREATED,
+                '',
+                self.base_headers,
+                httplib.responses[httplib.CREATED])
+
     def _v1_MossoCloudFS_test_container(self, method, url, body, headers):
         if method == 'GET':
             # list_container_objects
@@ -0,0 +1,104 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sys
+import unittest
+
+from libcloud.common import hooks
+from libcloud.common.accounting import Tracker
+from libcloud.compute.base import NodeDriver
+from libcloud.compute.drivers.linode import LinodeNodeDriver
+
+from test import RequestCountMixin
+from test.compute.test_linode import LinodeMockHttp
+
+class AccountingTests(unittest.TestCase, RequestCountMixin):
+
+    def setUp(self):
+        LinodeNodeDriver.connectionCls.conn_classes = (None, LinodeMockHttp)
+        LinodeMockHttp.use_param = 'api_action'
+        self.driver = LinodeNodeDriver('foo')
+
+    def test_request_tree(self):
+        tracker = Tracker().start()
+        try:
+            node = self.driver.list_nodes()[0]
+            self.driver.reboot_node(node)
+        finally:
+            tracker.stop()
+
+        self.assertEqual([call.method for call in tracker.calls],
+                         ['list_nodes', 'reboot_node'])
+        self.assertEqual(tracker.count_requests(), 3)
+        self.assertEqual(tracker.count_requests('list_nodes'), 2)
+        lines = tracker.format().splitlines()
+        self.assertEqual(lines[0], 'list_nodes: 2 requests')
+        self.assertEqual(lines[3], 'reboot_node: 1 request')
+
+    def test_nested_calls(self):
+        tracker = Tracker().start()
+        try:
+            self.driver.create_node(name='Test',
+                                    location=self.driver.list_locations()[0],
+                                    size=self.driver.list_sizes()[0],
+                                    image=self.driver.list_images()[6],
+                                    auth=None)
+        except Exception:
+            pass
+        tracker.stop()
+
+        call = tracker.calls[-1]
+        self.assertEqual(call.method, 'create_node')
+        self.assertEqual(call.parent, None)
+        self.assertEqual(hooks.get_current_call(), None)
+        self.assertEqual(len(list(call.iter_requests())),
+                         len(call.requests) +
+                         sum([len(list(c.iter_requests()))
+                              for c in call.children]))
+
+    def test_max_requests(self):
+        self.assertMaxRequests(2, self.driver.list_nodes)
+        self.assertRaises(AssertionError, self.assertMaxRequests, 1,
+                          self.driver.list_nodes)
+
+    def test_methods_are_only_wrapped_while_tracking(self):
+        self.assertFalse(hasattr(NodeDriver.__dict__['list_nodes'],
+                                 '__wrapped__'))
+        tracker = Tracker().start()
+        self.assertTrue(hasattr(NodeDriver.__dict__['list_nodes'],
+                                '__wrapped__'))
+        tracker.stop()
+        self.assertFalse(hasattr(NodeDriver.__dict__['list_nodes'],
+                                 '__wrapped__'))
+
+    def test_driver_classes_defined_later_are_wrapped(self):
+        tracker = Tracker().start()
+        try:
+            class LaterDriver(LinodeNodeDriver):
+                def list_nodes(self):
+                    return []
+
+            driver = LaterDriver('foo')
+            self.assertEqual(driver.list_nodes(), [])
+        finally:
+            tracker.stop()
+
+        self.assertEqual([call.method for call in tracker.calls],
+                         ['list_nodes'])
+        self.assertFalse(hasattr(LaterDriver.__dict__['list_nodes'],
+                                 '__wrapped__'))
+        self.assertFalse('__getattribute__' in NodeDriver.__dict__)
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
@@ -0,0 +1,73 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sys
+import unittest
+
+from libcloud.compute.drivers.ec2 import EC2NodeDriver
+from libcloud.compute.drivers.rackspace import RackspaceNodeDriver
+
+from test import benchmarks, footprint
+
+class BenchmarksTests(unittest.TestCase):
+
+    def test_scale_blocks(self):
+        def update(lines, i):
+            lines[0] = 'id %d' % (i)
+
+        body = benchmarks.scale_blocks('id a\nfoo bar\n\nid b\n', 3, update)
+        self.assertEqual(body, 'id 0\nfoo bar\n\nid 1\n\nid 2\nfoo bar')
+
+    def test_benchmarks_parse_every_item(self):
+        # Keep the benchmarks working, the numbers don't matter here
+        connection_classes = [EC2NodeDriver.connectionCls,
+                              RackspaceNodeDriver.connectionCls]
+        conn_classes = [cls.__dict__.get('conn_classes')
+                        for cls in connection_classes]
+        report = benchmarks.run_benchmarks(count=30, repeat=1,
+                                           isolated=False)
+        # The mocks of the benchmarks don't leak into other tests
+        self.assertEqual([cls.__dict__.get('conn_classes')
+                          for cls in connection_classes], conn_classes)
+        self.assertEqual(len(report['results']),
+                         len([b for b in benchmarks.BENCHMARKS
+                              if b.available()]))
+        for result in report['results']:
+            self.assertEqual(result['items'], 30, result['name'])
+            self.assertTrue(result['seconds'] >= 0)
+
+    def test_footprint(self):
+        class Item(object):
+            def __init__(self, driver, extra):
+                self.driver = driver
+                self.extra = extra
+
+        driver = Item(None, {'big': 'x' * 10000})
+        shared = {}
+        items = [Item(driver, shared), Item(driver, shared)]
+        size, by_type = footprint.get_footprint(items, exclude=(driver,))
+        # The driver isn't counted, the shared dict is counted once
+        self.assertEqual(by_type['Item'][0], 2)
+        self.assertEqual(by_type['dict'][0], 3)
+        self.assertTrue(size < 10000)
+
+    def test_footprints(self):
+        report = footprint.run_footprints(count=30)
+        for result in report['results']:
+            self.assertTrue(result['items'] > 0, result['name'])
+            self.assertTrue(result['bytes_per_item'] > 0)
+            self.assertTrue('dict' in result['types'])
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
@@ -0,0 +1,138 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import sys
+import tempfile
+import threading
+import unittest
+import httplib
+
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+
+from libcloud.common import pool
+from libcloud.common.base import ConnectionKey
+
+from test.cassette import Cassette, RecordingHTTPConnection, ReplayHttp
+
+class FakeDriver(object):
+    name = 'fake'
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    count = 0
+
+    def do_GET(self):
+        RequestHandler.count += 1
+        body = 'response %d to %s' % (RequestHandler.count, self.path)
+        self.send_response(httplib.OK)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Foo', 'bar')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class CassetteTests(unittest.TestCase):
+
+    def setUp(self):
+        pool.close_all()
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        self.connection = ConnectionKey('foo', secure=False)
+        self.connection.driver = FakeDriver()
+
+    def tearDown(self):
+        pool.close_all()
+        os.unlink(self.path)
+
+    def _record(self):
+        RequestHandler.count = 0
+        server = HTTPServer(('127.0.0.1', 0), RequestHandler)
+        thread = threading.Thread(target=server.handle_request)
+        thread.start()
+
+        RecordingHTTPConnection.cassette = Cassette(self.path)
+        self.connection.conn_classes = (RecordingHTTPConnection, None)
+        self.connection.host = '127.0.0.1'
+        self.connection.port = (server.server_port, None)
+        try:
+            for timestamp in ('1', '2'):
+                self.connection.request('/test', params={'Action': 'List',
+                                                         'Timestamp':
+                                                         timestamp})
+        finally:
+            # Close the keep-alive connection so the server thread exits
+            pool.close_all()
+            thread.join()
+            server.server_close()
+        RecordingHTTPConnection.cassette.save()
+
+    def test_record_and_replay(self):
+        self._record()
+
+        ReplayHttp.cassette = Cassette(self.path).load()
+        self.connection.conn_classes = (ReplayHttp, None)
+        params = {'Action': 'List', 'Timestamp': '3'}
+
+        response = self.connection.request('/test', params=params)
+        self.assertEqual(response.body, 'response 1 to /test?Action=List&'
+                                        'Timestamp=1')
+        self.assertEqual(response.headers['x-foo'], 'bar')
+        response = self.connection.request('/test', params=params)
+        self.assertEqual(response.body[:10], 'response 2')
+        # The last response is played again
+        response = self.connection.request('/test', params=params)
+        self.assertEqual(response.body[:10], 'response 2')
+
+    def test_volatile_params_are_not_recorded(self):
+        self._record()
+        cassette = Cassette(self.path).load()
+        self.assertEqual(cassette.interactions[0]['request']['query'],
+                         [['Action', ['List']]])
+
+    def test_secrets_are_not_recorded(self):
+        cassette = Cassette(secret_headers=['X-Auth-Token'])
+        cassette.record('GET', '/test?api_key=s3cr3t&a=b', None, httplib.OK,
+                        {'x-auth-token': 't0k3n', 'x-foo': 'bar'},
+                        'key s3cr3t token t0k3n', 'OK')
+        interaction = cassette.interactions[0]
+        self.assertEqual(interaction['request']['query'],
+                         [('a', ['b']), ('api_key', ['FILTERED'])])
+        self.assertEqual(interaction['response']['headers'],
+                         {'x-auth-token': 'FILTERED', 'x-foo': 'bar'})
+        self.assertEqual(interaction['response']['body'],
+                         'key FILTERED token FILTERED')
+
+        # Requests made with other credentials still match
+        self.assertEqual(cassette.play('GET', '/test?a=b&api_key=other',
+                                       None)[1],
+                         'key FILTERED token FILTERED')
+
+    def test_unknown_request(self):
+        cassette = Cassette()
+        cassette.record('GET', '/test', None, httplib.OK, {}, 'body', 'OK')
+        self.assertEqual(cassette.play('GET', '/test', None)[1], 'body')
+        self.assertRaises(KeyError, cassette.play, 'POST', '/test', None)
+        self.assertRaises(KeyError, cassette.play, 'GET', '/test?a=b', None)
+
+    def test_binary_body(self):
+        cassette = Cassette()
+        cassette.record('GET', '/test', None, httplib.OK, {}, '\xff\x00',
+                        'OK')
+        self.assertEqual(cassette.play('GET', '/test', None)[1], '\xff\x00')
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
@@ -0,0 +1,126 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sys
+import gzip
+import zlib
+import unittest
+import httplib
+
+from cStringIO import StringIO
+
+from libcloud.common.base import ConnectionKey, DecodingResponse
+from libcloud.common.base import TransferStats
+
+from test import MockHttp, MockResponse  # pylint: disable-msg=E0611
+
+BODY = '<DescribeImagesResponse>%s</DescribeImagesResponse>' % (
+    '<item><imageId>ami-be3adfd7</imageId></item>' * 500)
+
+def gzip_encode(data):
+    buf = StringIO()
+    fp = gzip.GzipFile(fileobj=buf, mode='wb')
+    fp.write(data)
+    fp.close()
+    return buf.getvalue()
+
+class FakeDriver(object):
+    name = 'fake'
+
+class CompressionMockHttp(MockHttp):
+    request_headers = None
+
+    def _gzip(self, method, url, body, headers):
+        CompressionMockHttp.request_headers = headers
+        return (httplib.OK, gzip_encode(BODY), {'content-encoding': 'gzip'},
+                httplib.responses[httplib.OK])
+
+    def _plain(self, method, url, body, headers):
+        CompressionMockHttp.request_headers = headers
+        return (httplib.OK, BODY, {}, httplib.responses[httplib.OK])
+
+class DecodingResponseTests(unittest.TestCase):
+
+    def _response(self, body, encoding):
+        return MockResponse(httplib.OK, body, {'Content-Encoding': encoding})
+
+    def test_gzip(self):
+        stats = TransferStats()
+        wire = gzip_encode(BODY)
+        response = DecodingResponse(self._response(wire, 'gzip'), stats)
+        self.assertEqual(response.read(), BODY)
+        self.assertEqual(stats.wire_bytes, len(wire))
+        self.assertEqual(stats.decoded_bytes, len(BODY))
+
+    def test_deflate(self):
+        response = DecodingResponse(
+            self._response(zlib.compress(BODY), 'deflate'))
+        self.assertEqual(response.read(), BODY)
+
+    def test_raw_deflate(self):
+        compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+        wire = compressor.compress(BODY) + compressor.flush()
+        response = DecodingResponse(self._response(wire, 'deflate'))
+        self.assertEqual(response.read(), BODY)
+
+    def test_identity(self):
+        stats = TransferStats()
+        response = DecodingResponse(MockResponse(httplib.OK, BODY), stats)
+        self.assertEqual(response.read(), BODY)
+        self.assertEqual(stats.wire_bytes, stats.decoded_bytes)
+
+    def test_read_amt(self):
+        response = DecodingResponse(self._response(gzip_encode(BODY), 'gzip'))
+        response.chunk_size = 100
+        chunks = []
+        while True:
+            chunk = response.read(1000)
+            if not chunk:
+                break
+            self.assertTrue(len(chunk) <= 1000)
+            chunks.append(chunk)
+        self.assertEqual(''.join(chunks), BODY)
+
+    def test_delegates_attributes(self):
+        response = DecodingResponse(MockResponse(httplib.OK, BODY))
+        self.assertEqual(response.status, httplib.OK)
+
+class ConnectionKeyCompressionTests(unittest.TestCase):
+
+    def setUp(self):
+        self.connection = ConnectionKey('foo', host='localhost')
+        self.connection.conn_classes = (CompressionMockHttp,
+                                        CompressionMockHttp)
+        self.connection.driver = FakeDriver()
+
+    def test_gzip_response_is_decoded(self):
+        response = self.connection.request('/gzip')
+        self.assertEqual(response.body, BODY)
+        self.assertEqual(CompressionMockHttp.request_headers['Accept-Encoding'],
+                         'gzip, deflate')
+
+        stats = self.connection.transfer_stats
+        self.assertEqual(stats.decoded_bytes, len(BODY))
+        self.assertTrue(stats.wire_bytes < stats.decoded_bytes)
+
+    def test_compression_disabled(self):
+        self.connection.allow_compression = False
+        response = self.connection.request('/plain')
+        self.assertEqual(response.body, BODY)
+        self.assertFalse('Accept-Encoding' in
+                         CompressionMockHttp.request_headers)
+        self.assertEqual(self.connection.transfer_stats.decoded_bytes, 0)
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
@@ -0,0 +1,187 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sys
+import threading
+import unittest
+import httplib
+
+from libcloud.common.base import ConnectionKey
+from libcloud.common.concurrency import Future, WorkerPool, AsyncDriver
+from libcloud.common.concurrency import get_request_pool
+from libcloud.common.types import LibcloudError
+from libcloud.compute.drivers.dummy import DummyNodeDriver
+
+from test import MockHttp           # pylint: disable-msg=E0611
+
+class FakeDriver(object):
+    name = 'fake'
+
+class ManyMockHttp(MockHttp):
+    threads = set()
+
+    def _ok(self, method, url, body, headers):
+        ManyMockHttp.threads.add(threading.currentThread())
+        return (httplib.OK, url, {}, httplib.responses[httplib.OK])
+
+    def _fail(self, method, url, body, headers):
+        raise httplib.BadStatusLine('')
+
+class FutureTests(unittest.TestCase):
+
+    def test_result(self):
+        future = Future()
+        future.set_result(42)
+        self.assertTrue(future.done())
+        self.assertEqual(future.result(), 42)
+        self.assertEqual(future.exception(), None)
+
+    def test_exception_is_reraised(self):
+        future = Future()
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            future.set_exception(sys.exc_info())
+        self.assertRaises(ValueError, future.result)
+        self.assertTrue(isinstance(future.exception(), ValueError))
+
+    def test_timeout(self):
+        future = Future()
+        self.assertRaises(LibcloudError, future.result, 0.01)
+
+    def test_callbacks(self):
+        called = []
+        future = Future()
+        future.add_done_callback(called.append)
+        self.assertEqual(called, [])
+        future.set_result(1)
+        self.assertEqual(called, [future])
+
+        future.add_done_callback(called.append)
+        self.assertEqual(called, [future, future])
+
+class WorkerPoolTests(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = WorkerPool(size=2)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_submit(self):
+        future = self.pool.submit(lambda a, b=0: a + b, 1, b=2)
+        self.assertEqual(future.result(1), 3)
+
+    def test_calls_run_concurrently(self):
+        condition = threading.Condition()
+        started = []
+
+        # Every call waits for the other one to start
+        def call(value):
+            condition.acquire()
+            try:
+                started.append(value)
+                condition.notifyAll()
+                if len(started) < 2:
+                    condition.wait(1)
+                return len(started)
+            finally:
+                condition.release()
+
+        futures = [self.pool.submit(call, i) for i in range(2)]
+        self.assertEqual([f.result(2) for f in futures], [2, 2])
+
+    def test_pool_is_bounded(self):
+        for i in range(10):
+            self.pool.submit(lambda: None)
+        self.assertTrue(len(self.pool._workers) <= 2)
+
+class AsyncDriverTests(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = WorkerPool(size=2)
+        self.driver = AsyncDriver(DummyNodeDriver(0), pool=self.pool)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_public_methods_return_futures(self):
+        future = self.driver.list_nodes()
+        self.assertTrue(isinstance(future, Future))
+        self.assertEqual([node.name for node in future.result(1)],
+                         ['dummy-1', 'dummy-2'])
+
+    def test_attributes_are_passed_through(self):
+        self.assertEqual(self.driver.name, 'Dummy Node Provider')
+
+    def test_classes_are_passed_through(self):
+        self.assertTrue(self.driver.connectionCls is
+                        self.driver.driver.connectionCls)
+
+    def test_exceptions_are_delivered_through_future(self):
+        future = self.driver.destroy_node(None)
+        self.assertTrue(future.exception(1) is not None)
+
+class RequestManyTests(unittest.TestCase):
+
+    def setUp(self):
+        ManyMockHttp.threads = set()
+        self.connection = ConnectionKey('foo', host='localhost')
+        self.connection.conn_classes = (ManyMockHttp, ManyMockHttp)
+        self.connection.keep_alive = False
+        self.connection.driver = FakeDriver()
+
+    def test_responses_are_in_order(self):
+        requests = ['/ok'] * 3 + [{'action': '/ok', 'params': {'a': '1'}}]
+        responses = self.connection.request_many(requests)
+        self.assertEqual([r.body for r in responses],
+                         ['/ok', '/ok', '/ok', '/ok?a=1'])
+        self.assertTrue(len(ManyMockHttp.threads) <= 4)
+
+    def test_max_concurrency_one_runs_inline(self):
+        self.connection.request_many(['/ok', '/ok'], max_concurrency=1)
+        self.assertEqual(ManyMockHttp.threads,
+                         set([threading.currentThread()]))
+
+    def test_threads_are_shared_between_calls(self):
+        self.connection.request_many(['/ok'] * 4)
+        self.connection.request_many(['/ok'] * 4)
+        workers = set(get_request_pool()._workers)
+        self.assertTrue(ManyMockHttp.threads <= workers)
+
+    def test_nested_calls_run_inline(self):
+        nested = set()
+
+        def request(action, **kwargs):
+            if action == '/nested':
+                nested.add(threading.currentThread())
+                self.connection.request_many(['/ok', '/ok'])
+                action = '/ok'
+            return ConnectionKey.request(self.connection, action, **kwargs)
+
+        self.connection.request = request
+        self.connection.request_many(['/nested', '/nested'])
+        self.assertEqual(ManyMockHttp.threads, nested)
+
+    def test_errors(self):
+        self.assertRaises(httplib.BadStatusLine,
+                          self.connection.request_many, ['/ok', '/fail'])
+
+        responses = self.connection.request_many(['/fail', '/ok'],
+                                                 return_exceptions=True)
+        self.assertTrue(isinstance(responses[0], httplib.BadStatusLine))
+        self.assertEqual(responses[1].body, '/ok')
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
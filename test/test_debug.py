@@ -0,0 +1,172 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import sys
+import gzip
+import threading
+import unittest
+import warnings
+import httplib
+
+from cStringIO import StringIO
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+
+try:
+    import json
+except:
+    import simplejson as json
+
+import libcloud
+from libcloud.common.base import LoggingConnection, LoggingHTTPConnection
+from libcloud.common.debug import DebugLogger
+
+BODY = 'x' * 100
+
+class RequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(httplib.OK)
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def do_PUT(self):
+        length = int(self.headers['Content-Length'])
+        self.rfile.read(length)
+        self.send_response(httplib.CREATED)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+class DebugLoggerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.fo = StringIO()
+        self.logger = DebugLogger(self.fo, max_body_size=10)
+
+    def _entries(self):
+        self.logger.flush()
+        return [json.loads(line) for line in self.fo.getvalue().splitlines()]
+
+    def test_format(self):
+        self.logger.log({'method': 'POST', 'url': 'http://localhost:80/test',
+                         'request_headers': {'Host': 'localhost'},
+                         'request_body': 'body'})
+        entry = self._entries()[0]
+        self.assertEqual(entry['request_body'], 'body')
+        self.assertEqual(entry['curl'], "curl -i -X POST -H "
+                         "'Host: localhost' --data-binary body "
+                         "http://localhost:80/test")
+
+    def test_compressed_body_is_decoded_and_truncated(self):
+        buf = StringIO()
+        fp = gzip.GzipFile(fileobj=buf, mode='wb')
+        fp.write('hello world, hello world')
+        fp.close()
+
+        self.logger.log({'method': 'GET', 'url': 'http://localhost:80/',
+                         'response_headers': {'content-encoding': 'gzip'},
+                         'response_body': buf.getvalue()[:30]})
+        self.assertEqual(self._entries()[0]['response_body'], 'hello worl')
+
+    def test_sampling(self):
+        self.logger.sample_rate = 0
+        self.assertFalse(self.logger.sample())
+        self.logger.sample_rate = 1
+        self.assertTrue(self.logger.sample())
+
+    def test_invalid_sample_rate_setting(self):
+        os.environ['LIBCLOUD_DEBUG_SAMPLE_RATE'] = 'half'
+        try:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                rate = libcloud._getenv_float('LIBCLOUD_DEBUG_SAMPLE_RATE',
+                                              1.0)
+        finally:
+            del os.environ['LIBCLOUD_DEBUG_SAMPLE_RATE']
+        self.assertEqual(rate, 1.0)
+        self.assertEqual(len(caught), 1)
+
+        os.environ['LIBCLOUD_DEBUG_SAMPLE_RATE'] = '0.25'
+        try:
+            self.assertEqual(
+                libcloud._getenv_float('LIBCLOUD_DEBUG_SAMPLE_RATE', 1.0),
+                0.25)
+        finally:
+            del os.environ['LIBCLOUD_DEBUG_SAMPLE_RATE']
+
+    def test_entries_are_dropped_when_queue_is_full(self):
+        logger = DebugLogger(self.fo, max_queue_size=1)
+        # Don't start the writer thread
+        logger._writer = 'stopped'
+        logger.log({})
+        logger.log({})
+        self.assertEqual(logger.dropped, 1)
+
+class LoggingConnectionTests(unittest.TestCase):
+
+    def setUp(self):
+        self.fo = StringIO()
+        self.logger = DebugLogger(self.fo, max_body_size=10)
+        LoggingConnection.logger = self.logger
+
+        self.server = HTTPServer(('127.0.0.1', 0), RequestHandler)
+        self.thread = threading.Thread(target=self.server.handle_request)
+        self.thread.start()
+        self.connection = LoggingHTTPConnection('127.0.0.1',
+                                                self.server.server_port)
+
+    def tearDown(self):
+        LoggingConnection.logger = None
+        self.thread.join()
+        self.server.server_close()
+
+    def _entries(self):
+        self.logger.flush()
+        return [json.loads(line) for line in self.fo.getvalue().splitlines()]
+
+    def test_request(self):
+        self.connection.request('GET', '/test', headers={'X-Foo': 'bar'})
+        response = self.connection.getresponse()
+        self.assertEqual(self._entries(), [])
+
+        self.assertEqual(response.read(), BODY)
+        entry = self._entries()[0]
+        self.assertEqual(entry['method'], 'GET')
+        self.assertEqual(entry['url'], 'http://127.0.0.1:%d/test' %
+                         (self.server.server_port))
+        self.assertEqual(entry['status'], httplib.OK)
+        self.assertEqual(entry['request_headers']['X-Foo'], 'bar')
+        self.assertTrue('X-LC-Request-ID' in entry['request_headers'])
+        self.assertEqual(entry['response_body'], BODY[:10])
+        self.assertEqual(entry['response_body_size'], len(BODY))
+
+    def test_streamed_upload(self):
+        self.connection.putrequest('PUT', '/upload')
+        self.connection.putheader('Content-Length', '20')
+        self.connection.endheaders()
+        self.connection.send('a' * 10)
+        self.connection.send('b' * 10)
+        self.connection.getresponse().read()
+
+        entry = self._entries()[0]
+        self.assertEqual(entry['method'], 'PUT')
+        self.assertEqual(entry['status'], httplib.CREATED)
+        self.assertEqual(entry['request_body_size'], 20)
+        self.assertEqual(entry['request_body'], None)
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
@@ -0,0 +1,159 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sys
+import threading
+import unittest
+import warnings
+import httplib
+
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+
+from libcloud.common import hooks
+from libcloud.common import pool
+from libcloud.common.base import ConnectionKey, LibcloudHTTPConnection
+
+from test import MockHttp           # pylint: disable-msg=E0611
+
+class FakeDriver(object):
+    name = 'fake'
+
+class HooksMockHttp(MockHttp):
+    closed = False
+
+    def putrequest(self, method, url, *args, **kwargs):
+        self._raw_request = (method, url)
+
+    def putheader(self, header, *values):
+        pass
+
+    def endheaders(self, *args, **kwargs):
+        self.request(*self._raw_request)
+
+    def close(self):
+        self.closed = True
+
+    def _test(self, method, url, body, headers):
+        return (httplib.OK, 'test body', {}, httplib.responses[httplib.OK])
+
+    def _error(self, method, url, body, headers):
+        return (httplib.NOT_FOUND, 'not found', {},
+                httplib.responses[httplib.NOT_FOUND])
+
+class RequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(httplib.OK)
+        self.send_header('Content-Length', '5')
+        self.end_headers()
+        self.wfile.write('hello')
+
+    def log_message(self, *args):
+        pass
+
+class HooksTests(unittest.TestCase):
+
+    def setUp(self):
+        pool.close_all()
+        self.records = []
+        hooks.add_listener(self.records.append)
+        self.connection = ConnectionKey('foo', host='localhost')
+        self.connection.conn_classes = (HooksMockHttp, HooksMockHttp)
+        self.connection.driver = FakeDriver()
+
+    def tearDown(self):
+        hooks.remove_listener(self.records.append)
+        pool.close_all()
+
+    def test_record(self):
+        self.connection.request('/test', data='payload', method='POST')
+        self.assertEqual(len(self.records), 1)
+
+        record = self.records[0]
+        self.assertEqual(record.driver, 'fake')
+        self.assertEqual(record.action, '/test')
+        self.assertEqual(record.method, 'POST')
+        self.assertEqual(record.status, httplib.OK)
+        self.assertEqual(record.attempts, 1)
+        self.assertEqual(record.bytes_sent, len('payload'))
+        self.assertEqual(record.bytes_received, len('test body'))
+        self.assertEqual(record.error, None)
+        self.assertEqual(sorted(record.timings.keys()),
+                         ['body', 'sign', 'wait'])
+        self.assertTrue(record.duration >= 0)
+
+    def test_error_is_recorded(self):
+        self.assertRaises(Exception, self.connection.request, '/error')
+        self.assertEqual(len(self.records), 1)
+        self.assertEqual(self.records[0].status, httplib.NOT_FOUND)
+        self.assertTrue(self.records[0].error is not None)
+
+    def test_no_listener(self):
+        hooks.remove_listener(self.records.append)
+        self.assertFalse(hooks.has_listeners())
+        self.connection.request('/test')
+        self.assertEqual(self.records, [])
+        self.assertEqual(self.connection.connection.record, None)
+
+    def test_failing_listener_does_not_fail_request(self):
+        def listener(record):
+            raise ValueError('boom')
+
+        hooks.add_listener(listener)
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                self.assertEqual(self.connection.request('/test').body,
+                                 'test body')
+        finally:
+            hooks.remove_listener(listener)
+
+    def test_raw_response_is_recorded_when_read(self):
+        response = self.connection.request('/test', method='PUT', raw=True)
+        self.assertEqual(self.records, [])
+        self.assertEqual(response.read(), 'test body')
+        self.assertEqual(len(self.records), 1)
+        self.assertEqual(self.records[0].status, httplib.OK)
+        self.assertEqual(response.status, httplib.OK)
+        self.assertEqual(len(self.records), 1)
+
+    def test_raw_response_is_recorded_when_closed(self):
+        response = self.connection.request('/test', method='PUT', raw=True)
+        response.close()
+        response.close()
+        self.assertEqual(len(self.records), 1)
+        self.assertEqual(self.records[0].status, None)
+        self.assertTrue(self.connection.connection.closed)
+
+    def test_connection_phases(self):
+        server = HTTPServer(('127.0.0.1', 0), RequestHandler)
+        thread = threading.Thread(target=server.handle_request)
+        thread.start()
+
+        self.connection.conn_classes = (LibcloudHTTPConnection,
+                                        LibcloudHTTPConnection)
+        self.connection.host = '127.0.0.1'
+        self.connection.port = (server.server_port, server.server_port)
+        self.connection.secure = 0
+        self.connection.keep_alive = False
+        try:
+            self.assertEqual(self.connection.request('/').body, 'hello')
+        finally:
+            thread.join()
+            server.server_close()
+
+        self.assertEqual(sorted(self.records[0].timings.keys()),
+                         ['body', 'connect', 'resolve', 'sign', 'wait'])
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
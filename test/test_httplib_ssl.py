@@ -14,11 +14,14 @@
 # limitations under the License.
 
 import sys
+import ssl
 import unittest
 import os.path
 
 import libcloud.security
+from libcloud.common import resolver
 from libcloud.httplib_ssl import LibcloudHTTPSConnection
+from libcloud.httplib_ssl import get_ssl_context, get_hostname_pattern
 
 class TestHttpLibSSLTests(unittest.TestCase):
 
@@ -103,6 +106,18 @@ class TestHttpLibSSLTests(unittest.TestCase):
         libcloud.security.VERIFY_SSL_CERT = False
         self.httplib_object._setup_verify()
 
+    def test_connect_uses_resolver(self):
+        def create_connection(address, *args, **kwargs):
+            raise ValueError(address)
+
+        self.httplib_object.verify = False
+        original = resolver.create_connection
+        resolver.create_connection = create_connection
+        try:
+            self.assertRaises(ValueError, self.httplib_object.connect)
+        finally:
+            resolver.create_connection = original
+
     def test_setup_ca_cert(self):
         # @TODO: catch warnings
         self.httplib_object.verify = False
@@ -121,5 +136,37 @@ class TestHttpLibSSLTests(unittest.TestCase):
         self.assertFalse(self.httplib_object.ca_cert)
         self.assertFalse(self.httplib_object.verify)
 
+    def test_setup_ca_cert_is_cached(self):
+        self.httplib_object.verify = True
+        libcloud.security.CA_CERTS_PATH = [os.path.abspath(__file__)]
+        self.httplib_object._setup_ca_cert()
+
+        # Lookups for the same CA_CERTS_PATH don't touch the filesystem
+        exists = os.path.exists
+        os.path.exists = lambda path: False
+        try:
+            self.httplib_object.ca_cert = None
+            self.httplib_object._setup_ca_cert()
+        finally:
+            os.path.exists = exists
+
+        self.assertEqual(self.httplib_object.ca_cert,
+                         os.path.abspath(__file__))
+
+    def test_get_hostname_pattern_is_cached(self):
+        pattern = get_hostname_pattern('*.python.org')
+        self.assertTrue(get_hostname_pattern('*.python.org') is pattern)
+        self.assertTrue(pattern.search('www.python.org'))
+        self.assertFalse(pattern.search('www.pythonXorg'))
+
+    def test_get_ssl_context_is_cached(self):
+        ca_cert = '/etc/ssl/certs/ca-certificates.crt'
+        if not getattr(ssl, 'SSLContext', None) or not os.path.exists(ca_cert):
+            return
+
+        context = get_ssl_context(ca_cert)
+        self.assertTrue(get_ssl_context(ca_cert) is context)
+        self.assertEqual(context.verify_mode, ssl.CERT_REQUIRED)
+
 if __name__ == '__main__':
     sys.exit(unittest.main())
@@ -0,0 +1,90 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import sys
+import unittest
+import warnings
+
+from cStringIO import StringIO
+
+import libcloud
+from libcloud.common import jsoncodec
+
+BODY = ('{"count": 3, "objects": [{"name": "a", "bytes": 12345}, '
+        '1234567890, "caf\\u00e9", [true, null], -1.5e3], "end": {}}')
+
+class JSONCodecTests(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = jsoncodec.get_backend()
+
+    def tearDown(self):
+        jsoncodec.set_backend(self.backend.name)
+
+    def test_default_backend(self):
+        self.assertEqual(jsoncodec.set_backend().name,
+                         jsoncodec.get_available_backends()[0])
+        self.assertTrue('json' in jsoncodec.get_available_backends())
+
+    def test_backends_decode_alike(self):
+        for name in jsoncodec.get_available_backends():
+            jsoncodec.set_backend(name)
+            data = jsoncodec.loads(BODY)
+            self.assertEqual(data['objects'][2], u'caf\xe9', name)
+            self.assertEqual(jsoncodec.loads(bytearray(BODY)), data, name)
+            self.assertEqual(jsoncodec.loads(buffer(BODY)), data, name)
+            self.assertEqual(jsoncodec.load(StringIO(BODY), chunk_size=5),
+                             data, name)
+            self.assertEqual(jsoncodec.loads(jsoncodec.dumps(data)), data,
+                             name)
+            self.assertRaises(ValueError, jsoncodec.loads, '{"a": ')
+
+    def test_iter_array(self):
+        expected = jsoncodec.loads(BODY)['objects']
+        for chunk_size in (1, 3, 7, 1024):
+            items = list(jsoncodec.iter_array(StringIO(BODY), 'objects',
+                                              chunk_size))
+            self.assertEqual(items, expected)
+
+        # Numbers split across chunks
+        items = jsoncodec.iter_array(StringIO(' [ 12345 ,6789]\n'),
+                                     chunk_size=2)
+        self.assertEqual(list(items), [12345, 6789])
+
+    def test_iter_array_errors(self):
+        self.assertRaises(ValueError, list,
+                          jsoncodec.iter_array(StringIO('{"a": 1}')))
+        self.assertRaises(ValueError, list,
+                          jsoncodec.iter_array(StringIO('[1 2]')))
+        self.assertRaises(ValueError, list,
+                          jsoncodec.iter_array(StringIO('[1, 2'), None, 2))
+
+    def test_unknown_backend(self):
+        self.assertRaises(ValueError, jsoncodec.set_backend, 'cjson')
+        self.assertEqual(jsoncodec.get_backend(), self.backend)
+
+    def test_unknown_backend_setting(self):
+        os.environ['LIBCLOUD_JSON_CODEC'] = 'cjson'
+        try:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                libcloud._init_once()
+        finally:
+            del os.environ['LIBCLOUD_JSON_CODEC']
+        self.assertEqual(len(caught), 1)
+        self.assertEqual(jsoncodec.get_backend(), self.backend)
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
@@ -0,0 +1,148 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sys
+import threading
+import unittest
+import httplib
+
+from libcloud.common import metrics
+from libcloud.common.base import ConnectionKey
+from libcloud.storage.drivers.dummy import DummyStorageDriver
+
+from test import MockHttp           # pylint: disable-msg=E0611
+
+LABELS = (('provider', 'fake'), ('operation', 'GET /test'))
+
+class FakeDriver(object):
+    name = 'fake'
+
+class MetricsMockHttp(MockHttp):
+
+    def _test(self, method, url, body, headers):
+        return (httplib.OK, 'test', {}, httplib.responses[httplib.OK])
+
+    def _servers_1234(self, method, url, body, headers):
+        return (httplib.NOT_FOUND, 'missing', {},
+                httplib.responses[httplib.NOT_FOUND])
+
+class FakeConnection(object):
+    def __init__(self):
+        self.connection = self
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(data)
+
+class FakeRawResponse(object):
+    def __init__(self):
+        self.connection = FakeConnection()
+
+class RegistryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = metrics.Registry()
+        self.registry.counter('requests', 'Requests.')
+        self.registry.histogram('latency', 'Latency.', buckets=(0.1, 1))
+
+    def test_histogram(self):
+        for value in (0.05, 0.1, 0.5, 2):
+            self.registry.observe('latency', LABELS, value)
+
+        sample = self.registry.snapshot()['latency']['samples'][0]
+        self.assertEqual(sample['labels'], dict(LABELS))
+        self.assertEqual(sample['buckets'], [[0.1, 2], [1, 3]])
+        self.assertEqual(sample['count'], 4)
+        self.assertEqual(sample['sum'], 2.65)
+
+    def test_threads_are_merged(self):
+        def work():
+            for i in range(100):
+                self.registry.inc('requests', LABELS)
+
+        threads = [threading.Thread(target=work) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.registry.inc('requests', LABELS)
+
+        samples = self.registry.snapshot()['requests']['samples']
+        self.assertEqual(samples[0]['value'], 401)
+        # The shards of the finished threads have been folded
+        self.assertEqual(len(self.registry._shards), 1)
+
+    def test_prometheus(self):
+        self.registry.inc('requests', (('provider', 'a "b"'),), 2)
+        self.registry.observe('latency', (), 0.5)
+        self.assertEqual(self.registry.to_prometheus().splitlines(), [
+            '# HELP latency Latency.',
+            '# TYPE latency histogram',
+            'latency_bucket{le="0.1"} 0',
+            'latency_bucket{le="1"} 1',
+            'latency_bucket{le="+Inf"} 1',
+            'latency_sum 0.5',
+            'latency_count 1',
+            '# HELP requests Requests.',
+            '# TYPE requests counter',
+            'requests{provider="a \\"b\\""} 2'])
+
+class MetricsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = metrics.enable()
+        self.connection = ConnectionKey('foo', secure=False)
+        self.connection.driver = FakeDriver()
+        self.connection.conn_classes = (MetricsMockHttp, None)
+
+    def tearDown(self):
+        metrics.disable()
+
+    def _value(self, name, **labels):
+        for sample in self.registry.snapshot()[name]['samples']:
+            if sample['labels'] == labels:
+                return sample
+        return None
+
+    def test_requests(self):
+        self.connection.request('/test')
+        self.connection.request('/test')
+        self.assertRaises(Exception, self.connection.request,
+                          '/servers/1234')
+
+        sample = self._value(metrics.REQUESTS, provider='fake',
+                             operation='GET /test', status_class='2xx')
+        self.assertEqual(sample['value'], 2)
+        sample = self._value(metrics.REQUEST_DURATION, provider='fake',
+                             operation='GET /servers/{id}',
+                             status_class='4xx')
+        self.assertEqual(sample['count'], 1)
+
+    def test_upload(self):
+        driver = DummyStorageDriver('key', 'secret')
+        driver._stream_data(FakeRawResponse(), iter(['a' * 10, 'b' * 5]))
+        sample = self._value(metrics.TRANSFER_BYTES, provider=driver.name,
+                             direction='upload')
+        self.assertEqual(sample['value'], 15)
+
+    def test_disable(self):
+        metrics.disable()
+        self.connection.request('/test')
+        self.assertEqual(metrics.get_registry(), None)
+        self.assertEqual(self._value(metrics.REQUESTS, provider='fake',
+                                     operation='GET /test',
+                                     status_class='2xx'), None)
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
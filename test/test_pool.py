@@ -0,0 +1,249 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import sys
+import errno
+import socket
+import unittest
+import httplib
+
+from libcloud.common import pool
+from libcloud.common.base import ConnectionKey
+from libcloud.common.retry import RetryPolicy
+
+from test import MockHttp           # pylint: disable-msg=E0611
+
+class FakeDriver(object):
+    name = 'fake'
+
+class PoolMockHttp(MockHttp):
+    closed = 0
+
+    def close(self):
+        PoolMockHttp.closed += 1
+
+    def _test(self, method, url, body, headers):
+        return (httplib.OK, 'test', {}, httplib.responses[httplib.OK])
+
+class StaleMockHttp(PoolMockHttp):
+    """
+    Fails the first request after a socket has been attached, like a
+    keep-alive connection which has been closed by the server.
+    """
+    sock = None
+
+    def request(self, method, url, body=None, headers=None, raw=False):
+        if self.sock is not None:
+            self.sock = None
+            raise httplib.BadStatusLine('')
+        self.sock = 'open'
+        return super(StaleMockHttp, self).request(method, url, body, headers)
+
+class SocketMockHttp(PoolMockHttp):
+    """
+    Attaches an idle socket to the connection on its first request, so it
+    is handed out again by the pool.
+    """
+    sock = None
+
+    def attach_socket(self):
+        self.sock, self._peer = socket.socketpair()
+
+    def close(self):
+        PoolMockHttp.close(self)
+        if self.sock is not None:
+            self.sock.close()
+            self._peer.close()
+            self.sock = None
+
+class TimeoutMockHttp(SocketMockHttp):
+    """
+    Times out waiting for the response once a socket has been attached,
+    after the request has been sent.
+    """
+    requests = 0
+
+    def request(self, method, url, body=None, headers=None, raw=False):
+        TimeoutMockHttp.requests += 1
+        if self.sock is None:
+            self.attach_socket()
+            return super(TimeoutMockHttp, self).request(method, url, body,
+                                                        headers)
+        self._response = None
+
+    def getresponse(self):
+        if self._response is None:
+            raise socket.timeout('timed out')
+        return self._response
+
+class ResetMockHttp(SocketMockHttp):
+    """
+    Like L{StaleMockHttp} but the request can't be sent at all.
+    """
+
+    def request(self, method, url, body=None, headers=None, raw=False):
+        if self.sock is not None:
+            raise socket.error(errno.ECONNRESET, 'Connection reset by peer')
+        self.attach_socket()
+        return super(ResetMockHttp, self).request(method, url, body, headers)
+
+class ConnectionPoolTests(unittest.TestCase):
+
+    def setUp(self):
+        PoolMockHttp.closed = 0
+        self.pool = pool.ConnectionPool(conn_cls=PoolMockHttp,
+                                        host='localhost', port=80,
+                                        max_size=2, max_idle_time=60)
+
+    def test_get_creates_connection(self):
+        connection = self.pool.get()
+        self.assertTrue(isinstance(connection, PoolMockHttp))
+        self.assertEqual(connection.host, 'localhost')
+        self.assertEqual(connection.port, 80)
+
+    def test_put_and_get_reuses_connection(self):
+        connection = self.pool.get()
+        self.pool.put(connection)
+        self.assertEqual(len(self.pool), 1)
+        self.assertTrue(self.pool.get() is connection)
+        self.assertEqual(len(self.pool), 0)
+
+    def test_put_closes_connection_when_full(self):
+        connections = [self.pool.get() for i in range(3)]
+        for connection in connections:
+            self.pool.put(connection)
+        self.assertEqual(len(self.pool), 2)
+        self.assertEqual(PoolMockHttp.closed, 1)
+
+    def test_idle_connection_is_evicted(self):
+        connection = self.pool.get()
+        self.pool.put(connection)
+        self.pool.max_idle_time = -1
+        self.assertFalse(self.pool.get() is connection)
+        self.assertEqual(PoolMockHttp.closed, 1)
+
+    def test_dropped_connection_is_evicted(self):
+        if not hasattr(socket, 'socketpair'):
+            return
+        local, remote = socket.socketpair()
+        connection = self.pool.get()
+        connection.sock = local
+        self.pool.put(connection)
+        remote.close()
+        self.assertFalse(self.pool.get() is connection)
+        local.close()
+
+    def test_high_file_descriptor_is_not_dropped(self):
+        if not hasattr(socket, 'socketpair'):
+            return
+        try:
+            import resource
+        except ImportError:
+            return
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft == resource.RLIM_INFINITY or soft < 2048:
+            return
+
+        # select can't watch file descriptors past 1024
+        filler = [os.dup(0) for i in range(1100)]
+        try:
+            local, remote = socket.socketpair()
+        finally:
+            for fd in filler:
+                os.close(fd)
+        connection = self.pool.get()
+        connection.sock = local
+        self.pool.put(connection)
+        self.assertTrue(local.fileno() >= 1024)
+        self.assertTrue(self.pool.get() is connection)
+        local.close()
+        remote.close()
+
+    def test_close(self):
+        self.pool.put(self.pool.get())
+        self.pool.close()
+        self.assertEqual(len(self.pool), 0)
+        self.assertEqual(PoolMockHttp.closed, 1)
+
+    def test_get_pool_is_shared(self):
+        pool1 = pool.get_pool(PoolMockHttp, 'localhost', 80, 0)
+        pool2 = pool.get_pool(PoolMockHttp, 'localhost', 80, 0)
+        pool3 = pool.get_pool(PoolMockHttp, 'localhost', 80, 1)
+        self.assertTrue(pool1 is pool2)
+        self.assertFalse(pool1 is pool3)
+
+class ConnectionKeyPoolTests(unittest.TestCase):
+
+    def setUp(self):
+        pool.close_all()
+        PoolMockHttp.closed = 0
+        self.connection = ConnectionKey('foo', host='localhost')
+        self.connection.conn_classes = (PoolMockHttp, PoolMockHttp)
+        self.connection.driver = FakeDriver()
+
+    def tearDown(self):
+        pool.close_all()
+
+    def test_connection_is_reused(self):
+        self.connection.request('/test')
+        first = self.connection.connection
+        self.connection.request('/test')
+        self.assertTrue(self.connection.connection is first)
+
+    def test_keep_alive_disabled(self):
+        self.connection.keep_alive = False
+        self.connection.request('/test')
+        first = self.connection.connection
+        self.connection.request('/test')
+        self.assertFalse(self.connection.connection is first)
+
+    def test_stale_connection_is_retried(self):
+        self.connection.conn_classes = (StaleMockHttp, StaleMockHttp)
+        self.assertEqual(self.connection.request('/test').body, 'test')
+        self.assertEqual(self.connection.request('/test').body, 'test')
+        self.assertEqual(PoolMockHttp.closed, 1)
+
+    def test_reset_on_send_is_retried(self):
+        if not hasattr(socket, 'socketpair'):
+            return
+        self.connection.conn_classes = (ResetMockHttp, ResetMockHttp)
+        self.connection.request('/test', method='POST')
+        self.assertEqual(self.connection.request('/test',
+                                                 method='POST').body, 'test')
+        self.assertEqual(PoolMockHttp.closed, 1)
+
+    def test_timeout_after_send_is_not_resent(self):
+        if not hasattr(socket, 'socketpair'):
+            return
+        TimeoutMockHttp.requests = 0
+        self.connection.conn_classes = (TimeoutMockHttp, TimeoutMockHttp)
+        self.connection.request('/test', method='POST')
+        self.assertRaises(socket.timeout, self.connection.request, '/test',
+                          method='POST')
+        self.assertEqual(TimeoutMockHttp.requests, 2)
+
+    def test_timeout_after_send_goes_through_retry_policy(self):
+        if not hasattr(socket, 'socketpair'):
+            return
+        TimeoutMockHttp.requests = 0
+        self.connection.conn_classes = (TimeoutMockHttp, TimeoutMockHttp)
+        self.connection.retry_policy = RetryPolicy(max_retries=1,
+                                                   backoff_base=0)
+        self.connection.request('/test')
+        self.assertEqual(self.connection.request('/test').body, 'test')
+        self.assertEqual(TimeoutMockHttp.requests, 3)
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
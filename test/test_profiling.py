@@ -0,0 +1,120 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sys
+import unittest
+
+from cStringIO import StringIO
+
+from libcloud.common import hooks
+from libcloud.common import profiling
+from libcloud.compute.base import NodeDriver
+from libcloud.compute.drivers.dummy import DummyNodeDriver
+from libcloud.compute.drivers.linode import LinodeNodeDriver
+
+from test.compute.test_linode import LinodeMockHttp
+
+class RebootingLinodeNodeDriver(LinodeNodeDriver):
+
+    def ex_reboot_all(self):
+        for node in self.list_nodes():
+            self.reboot_node(node)
+
+class ProfilingTests(unittest.TestCase):
+
+    def setUp(self):
+        LinodeNodeDriver.connectionCls.conn_classes = (None, LinodeMockHttp)
+        LinodeMockHttp.use_param = 'api_action'
+        self.driver = LinodeNodeDriver('foo')
+        self.profiler = profiling.enable()
+
+    def tearDown(self):
+        profiling.disable()
+
+    def test_requests_are_charged_to_the_method(self):
+        self.assertEqual(len(self.driver.list_nodes()), 1)
+
+        stats = self.profiler.get_stats(self.driver.name, 'list_nodes')
+        self.assertEqual(stats.calls, 1)
+        self.assertEqual(stats.errors, 0)
+        # linode.list and the batch of linode.ip.list
+        self.assertEqual(stats.requests, 2)
+        self.assertTrue(stats.wall_time >= stats.request_time)
+        self.assertTrue(stats.request_time >= stats.parse_time > 0)
+
+    def test_repeated_calls(self):
+        node = self.driver.list_nodes()[0]
+        self.driver.reboot_node(node)
+        self.driver.reboot_node(node)
+
+        stats = self.profiler.get_stats(self.driver.name, 'list_nodes')
+        self.assertEqual(stats.calls, 1)
+        self.assertEqual(stats.requests, 2)
+        stats = self.profiler.get_stats(self.driver.name, 'reboot_node')
+        self.assertEqual(stats.calls, 2)
+        self.assertEqual(stats.requests, 2)
+        self.assertEqual(sorted([s.method for s in self.profiler.report()]),
+                         ['list_nodes', 'reboot_node'])
+
+    def test_nested_calls(self):
+        calls = []
+        hooks.add_call_listener(calls.append)
+        try:
+            RebootingLinodeNodeDriver('foo').ex_reboot_all()
+        finally:
+            hooks.remove_call_listener(calls.append)
+
+        call = calls[-1]
+        self.assertEqual(call.method, 'ex_reboot_all')
+        self.assertEqual(call.parent, None)
+        self.assertEqual(call.requests, [])
+        self.assertEqual([c.method for c in call.children],
+                         ['list_nodes', 'reboot_node'])
+        self.assertEqual(len(list(call.iter_requests())), 3)
+
+        # Inclusive stats, the requests go to the innermost method
+        stats = self.profiler.get_stats(self.driver.name, 'ex_reboot_all')
+        self.assertEqual(stats.calls, 1)
+        self.assertEqual(stats.requests, 0)
+        stats = self.profiler.get_stats(self.driver.name, 'reboot_node')
+        self.assertEqual(stats.calls, 1)
+        self.assertEqual(stats.requests, 1)
+
+    def test_errors_and_private_methods(self):
+        driver = DummyNodeDriver(0)
+        self.assertRaises(Exception, driver.destroy_node, None)
+        self.driver._to_nodes([])
+        stats = self.profiler.get_stats(driver.name, 'destroy_node')
+        self.assertEqual(stats.errors, 1)
+        self.assertEqual([s.method for s in self.profiler.report()],
+                         ['destroy_node'])
+
+    def test_dump(self):
+        self.driver.list_nodes()
+        fo = StringIO()
+        profiling.dump(fo)
+        lines = fo.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(' list_nodes ' in lines[1])
+
+    def test_disable(self):
+        profiling.disable()
+        self.assertFalse(hasattr(NodeDriver.__dict__['list_nodes'],
+                                 '__wrapped__'))
+        self.assertFalse(hooks.has_listeners())
+        self.driver.list_nodes()
+        self.assertEqual(profiling.get_profiler(), None)
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
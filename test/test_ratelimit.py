@@ -0,0 +1,119 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sys
+import unittest
+import httplib
+
+from libcloud.common.base import ConnectionKey
+from libcloud.common.ratelimit import TokenBucket, RateLimiter
+
+from test import MockHttp           # pylint: disable-msg=E0611
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class FakeDriver(object):
+    name = 'fake'
+    type = 'fake'
+
+class RecordingLimiter(RateLimiter):
+    def __init__(self):
+        RateLimiter.__init__(self, rate=1)
+        self.calls = []
+
+    def acquire(self, driver_type, host, name=None):
+        self.calls.append((driver_type, host, name))
+        return 0
+
+class RateLimitMockHttp(MockHttp):
+    def _test(self, method, url, body, headers):
+        return (httplib.OK, 'test', {}, httplib.responses[httplib.OK])
+
+class TokenBucketTests(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.bucket = TokenBucket(rate=2, burst=3, clock=self.clock)
+
+    def test_burst(self):
+        for i in range(3):
+            self.assertEqual(self.bucket.reserve(), 0)
+        self.assertEqual(self.bucket.reserve(), 0.5)
+
+    def test_waiting_callers_are_queued(self):
+        for i in range(3):
+            self.bucket.reserve()
+        self.assertEqual(self.bucket.reserve(), 0.5)
+        self.assertEqual(self.bucket.reserve(), 1.0)
+
+    def test_refill(self):
+        for i in range(3):
+            self.bucket.reserve()
+        self.clock.now += 1
+        self.assertEqual(self.bucket.reserve(), 0)
+        self.assertEqual(self.bucket.reserve(), 0)
+        self.assertEqual(self.bucket.reserve(), 0.5)
+
+    def test_refill_is_capped_at_burst(self):
+        self.clock.now += 60
+        for i in range(3):
+            self.assertEqual(self.bucket.reserve(), 0)
+        self.assertTrue(self.bucket.reserve() > 0)
+
+class RateLimiterTests(unittest.TestCase):
+
+    def setUp(self):
+        self.limiter = RateLimiter(rate=10, burst=10,
+                                   action_rates={'RunInstances': (1, 1)},
+                                   clock=FakeClock())
+
+    def test_buckets_are_keyed_by_endpoint(self):
+        bucket = self.limiter.get_bucket('ec2', 'us-east-1')
+        self.assertTrue(self.limiter.get_bucket('ec2', 'us-east-1') is bucket)
+        self.assertFalse(self.limiter.get_bucket('ec2', 'eu-west-1') is bucket)
+        self.assertFalse(self.limiter.get_bucket('rackspace', 'us-east-1')
+                         is bucket)
+
+    def test_action_rates(self):
+        default = self.limiter.get_bucket('ec2', 'host')
+        self.assertTrue(self.limiter.get_bucket('ec2', 'host',
+                                                'DescribeImages') is default)
+
+        bucket = self.limiter.get_bucket('ec2', 'host', 'RunInstances')
+        self.assertFalse(bucket is default)
+        self.assertEqual(bucket.rate, 1)
+        self.assertEqual(bucket.burst, 1)
+
+class ConnectionKeyRateLimitTests(unittest.TestCase):
+
+    def setUp(self):
+        self.connection = ConnectionKey('foo', host='localhost')
+        self.connection.conn_classes = (RateLimitMockHttp, RateLimitMockHttp)
+        self.connection.driver = FakeDriver()
+        self.connection.rate_limiter = RecordingLimiter()
+
+    def test_requests_are_rate_limited(self):
+        self.connection.request('/test')
+        self.connection.request('/test', method='POST')
+        self.assertEqual(self.connection.rate_limiter.calls,
+                         [('fake', 'localhost', 'GET'),
+                          ('fake', 'localhost', 'POST')])
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
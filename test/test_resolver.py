@@ -0,0 +1,165 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import sys
+import socket
+import unittest
+
+from libcloud.common import resolver
+from libcloud.common.resolver import Resolver, create_connection
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class StubGetaddrinfo(object):
+    """
+    Resolves every host name to a fixed list of IPv4 addresses.
+    """
+
+    def __init__(self, addresses):
+        self.addresses = addresses
+        self.calls = 0
+
+    def __call__(self, host, port, family=0, socktype=0):
+        self.calls += 1
+        return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, '',
+                 address) for address in self.addresses]
+
+def listen():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(5)
+    return server
+
+class ResolverTests(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.getaddrinfo = StubGetaddrinfo([('10.0.0.1', 80)])
+        self.resolver = Resolver(ttl=60, getaddrinfo=self.getaddrinfo,
+                                 clock=self.clock)
+
+    def test_addresses_are_cached(self):
+        first = self.resolver.resolve('example.com', 80)
+        self.assertTrue(self.resolver.resolve('example.com', 80) is first)
+        self.assertEqual(self.getaddrinfo.calls, 1)
+
+        self.resolver.resolve('example.org', 80)
+        self.assertEqual(self.getaddrinfo.calls, 2)
+
+    def test_ttl(self):
+        self.resolver.resolve('example.com', 80)
+        self.clock.now += 61
+        self.resolver.resolve('example.com', 80)
+        self.assertEqual(self.getaddrinfo.calls, 2)
+
+    def test_invalidate(self):
+        self.resolver.resolve('example.com', 80)
+        self.resolver.invalidate('example.com')
+        self.resolver.resolve('example.com', 80)
+        self.assertEqual(self.getaddrinfo.calls, 2)
+
+    def test_families_are_interleaved(self):
+        addresses = [(socket.AF_INET6, 1), (socket.AF_INET6, 2),
+                     (socket.AF_INET6, 3), (socket.AF_INET, 4)]
+        self.assertEqual([a[1] for a in resolver._interleave(addresses)],
+                         [1, 4, 2, 3])
+
+class CreateConnectionTests(unittest.TestCase):
+
+    def setUp(self):
+        self.server = listen()
+        self.address = self.server.getsockname()
+        self.sockets = [self.server]
+
+    def tearDown(self):
+        for sock in self.sockets:
+            sock.close()
+
+    def _resolver(self, addresses):
+        return Resolver(getaddrinfo=StubGetaddrinfo(addresses))
+
+    def test_connect(self):
+        sock = create_connection(('example.com', 80), timeout=5,
+                                 resolver=self._resolver([self.address]))
+        self.sockets.append(sock)
+        self.assertEqual(sock.getpeername(), self.address)
+        self.assertEqual(sock.gettimeout(), 5)
+
+    def test_refused_address_is_skipped(self):
+        closed = listen()
+        refused = closed.getsockname()
+        closed.close()
+
+        sock = create_connection(
+            ('example.com', 80), timeout=5,
+            resolver=self._resolver([refused, self.address]))
+        self.sockets.append(sock)
+        self.assertEqual(sock.getpeername(), self.address)
+
+    def test_slow_address_is_raced(self):
+        # A listening socket with a full backlog doesn't answer new SYNs
+        slow = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        slow.bind(('127.0.0.1', 0))
+        slow.listen(0)
+        self.sockets.append(slow)
+        for i in range(3):
+            client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            client.setblocking(0)
+            client.connect_ex(slow.getsockname())
+            self.sockets.append(client)
+
+        sock = create_connection(
+            ('example.com', 80), timeout=5, attempt_delay=0.01,
+            resolver=self._resolver([slow.getsockname(), self.address]))
+        self.sockets.append(sock)
+        self.assertEqual(sock.getpeername(), self.address)
+
+    def test_high_file_descriptors(self):
+        try:
+            import resource
+        except ImportError:
+            return
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft == resource.RLIM_INFINITY or soft < 2048:
+            return
+
+        # select can't watch file descriptors past 1024
+        filler = [os.dup(self.server.fileno()) for i in range(1100)]
+        try:
+            sock = create_connection(('example.com', 80), timeout=5,
+                                     resolver=self._resolver([self.address]))
+        finally:
+            for fd in filler:
+                os.close(fd)
+        self.sockets.append(sock)
+        self.assertTrue(sock.fileno() >= 1024)
+        self.assertEqual(sock.getpeername(), self.address)
+
+    def test_all_addresses_fail(self):
+        closed = listen()
+        refused = closed.getsockname()
+        closed.close()
+
+        self.assertRaises(socket.error, create_connection,
+                          ('example.com', 80), 5, None,
+                          self._resolver([refused]))
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
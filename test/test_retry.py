@@ -0,0 +1,156 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sys
+import socket
+import unittest
+import httplib
+
+from libcloud.common.base import ConnectionKey
+from libcloud.common.retry import RetryPolicy
+
+from test import MockHttp           # pylint: disable-msg=E0611
+
+class FakeDriver(object):
+    name = 'fake'
+
+class FakeSocket(object):
+    timeout = None
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+class RetryMockHttp(MockHttp):
+    """
+    Fails the first C{failures} requests, either with a status code or with
+    a socket error.
+    """
+    failures = 0
+    failure_status = None
+    requests = 0
+    connects = 0
+
+    def connect(self):
+        RetryMockHttp.connects += 1
+        self.sock = FakeSocket()
+
+    def request(self, method, url, body=None, headers=None, raw=False):
+        RetryMockHttp.requests += 1
+        if RetryMockHttp.requests <= RetryMockHttp.failures:
+            if RetryMockHttp.failure_status is None:
+                raise socket.error('Connection reset by peer')
+            self._response = self.responseCls(
+                RetryMockHttp.failure_status, 'throttled',
+                {'retry-after': '0'}, 'Service Unavailable')
+            return
+        return super(RetryMockHttp, self).request(method, url, body, headers)
+
+    def _test(self, method, url, body, headers):
+        return (httplib.OK, 'test', {}, httplib.responses[httplib.OK])
+
+class RetryPolicyTests(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = RetryPolicy(max_retries=2, backoff_base=1,
+                                  backoff_max=4, retry_budget=2,
+                                  budget_ratio=0.5)
+
+    def test_throttling_is_retried_for_all_methods(self):
+        self.assertTrue(self.policy.should_retry('POST', 0, status=503))
+
+    def test_transient_errors_only_retried_for_idempotent_methods(self):
+        self.assertTrue(self.policy.should_retry('GET', 0, status=502))
+        self.assertFalse(self.policy.should_retry('POST', 0, status=502))
+        self.assertFalse(self.policy.should_retry('POST', 0,
+                                                  error=socket.error()))
+
+    def test_client_errors_are_not_retried(self):
+        self.assertFalse(self.policy.should_retry('GET', 0, status=404))
+
+    def test_max_retries(self):
+        self.assertFalse(self.policy.should_retry('GET', 2, status=503))
+
+    def test_retry_budget(self):
+        self.assertTrue(self.policy.should_retry('GET', 0, status=503))
+        self.assertTrue(self.policy.should_retry('GET', 0, status=503))
+        self.assertFalse(self.policy.should_retry('GET', 0, status=503))
+
+        self.policy.record_success()
+        self.assertFalse(self.policy.should_retry('GET', 0, status=503))
+        self.policy.record_success()
+        self.assertTrue(self.policy.should_retry('GET', 0, status=503))
+
+    def test_get_delay(self):
+        for attempt in range(5):
+            delay = self.policy.get_delay(attempt)
+            self.assertTrue(0 <= delay <= min(4, 2 ** attempt))
+
+        self.assertEqual(self.policy.get_delay(0, retry_after='3'), 3)
+        self.assertEqual(self.policy.get_delay(0, retry_after='120'), 4)
+
+class ConnectionKeyRetryTests(unittest.TestCase):
+
+    def setUp(self):
+        RetryMockHttp.failures = 0
+        RetryMockHttp.failure_status = None
+        RetryMockHttp.requests = 0
+        RetryMockHttp.connects = 0
+        self.connection = ConnectionKey('foo', host='localhost')
+        self.connection.conn_classes = (RetryMockHttp, RetryMockHttp)
+        self.connection.keep_alive = False
+        self.connection.driver = FakeDriver()
+        self.connection.retry_policy = RetryPolicy(backoff_base=0)
+
+    def test_no_retry_policy(self):
+        self.connection.retry_policy = None
+        RetryMockHttp.failures = 1
+        self.assertRaises(socket.error, self.connection.request, '/test')
+
+    def test_socket_error_is_retried(self):
+        RetryMockHttp.failures = 2
+        self.assertEqual(self.connection.request('/test').body, 'test')
+        self.assertEqual(RetryMockHttp.requests, 3)
+
+    def test_socket_error_not_retried_for_post(self):
+        RetryMockHttp.failures = 1
+        self.assertRaises(socket.error, self.connection.request, '/test',
+                          method='POST')
+
+    def test_throttling_is_retried(self):
+        RetryMockHttp.failures = 1
+        RetryMockHttp.failure_status = httplib.SERVICE_UNAVAILABLE
+        response = self.connection.request('/test', method='POST')
+        self.assertEqual(response.body, 'test')
+        self.assertEqual(RetryMockHttp.requests, 2)
+
+    def test_retries_exhausted(self):
+        RetryMockHttp.failures = 10
+        RetryMockHttp.failure_status = httplib.SERVICE_UNAVAILABLE
+        self.assertRaises(Exception, self.connection.request, '/test')
+        self.assertEqual(RetryMockHttp.requests, 4)
+
+    def test_timeout(self):
+        self.connection.timeout = 5
+        self.connection.request('/test')
+        self.assertEqual(self.connection.connection.timeout, 5)
+        self.assertEqual(RetryMockHttp.connects, 0)
+
+    def test_connect_and_read_timeout(self):
+        self.connection.request('/test', timeout=(2, 10))
+        self.assertEqual(self.connection.connection.timeout, 2)
+        self.assertEqual(self.connection.connection.sock.timeout, 10)
+        self.assertEqual(RetryMockHttp.connects, 1)
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
@@ -0,0 +1,113 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sys
+import random
+import socket
+import unittest
+import httplib
+
+from libcloud.common import pool
+from libcloud.common.base import ConnectionKey
+from libcloud.common.retry import RetryPolicy
+
+from test import MockHttp
+from test.simulated import Route, Simulation, simulate
+
+class FakeDriver(object):
+    name = 'fake'
+
+class SimulatedMockHttp(MockHttp):
+    uploaded = None
+
+    def _test(self, method, url, body, headers):
+        return (httplib.OK, 'test', {}, httplib.responses[httplib.OK])
+
+    def _upload(self, method, url, body, headers):
+        SimulatedMockHttp.uploaded = body
+        return (httplib.CREATED, 'x' * 100, {},
+                httplib.responses[httplib.CREATED])
+
+class SimulationTests(unittest.TestCase):
+
+    def setUp(self):
+        pool.close_all()
+        self.sleeps = []
+        self.connection = ConnectionKey('foo', secure=False)
+        self.connection.driver = FakeDriver()
+
+    def tearDown(self):
+        pool.close_all()
+
+    def _simulate(self, *routes, **kwargs):
+        simulation = Simulation(list(routes), sleep=self.sleeps.append,
+                                seed=1, **kwargs)
+        self.connection.conn_classes = (simulate(SimulatedMockHttp,
+                                                 simulation), None)
+        return simulation
+
+    def test_route_latency(self):
+        self._simulate(Route('GET /other', latency=5),
+                       Route('GET /test', latency=0.5))
+        response = self.connection.request('/test')
+        self.assertEqual(response.body, 'test')
+        self.assertEqual(self.sleeps, [0.5])
+
+    def test_latency_distributions(self):
+        rand = random.Random(1)
+        for i in range(100):
+            latency = Route(latency=1, jitter=0.5).sample_latency(rand)
+            self.assertTrue(0.5 <= latency <= 1.5)
+            latency = Route(latency=0.1, jitter=1,
+                            distribution='normal').sample_latency(rand)
+            self.assertTrue(latency >= 0)
+        self.assertRaises(ValueError, Route, distribution='foo')
+
+    def test_timeout(self):
+        simulation = self._simulate(Route(latency=10))
+        self.assertRaises(socket.timeout, self.connection.request, '/test',
+                          timeout=2)
+        self.assertEqual(self.sleeps, [2])
+        self.assertEqual(simulation.stats['timeouts'], 1)
+
+    def test_errors_and_resets(self):
+        simulation = self._simulate(Route(error_rate=1))
+        self.assertRaises(socket.error, self.connection.request, '/test')
+        self.assertEqual(simulation.stats['errors'], 1)
+
+        simulation = self._simulate(Route(reset_rate=1))
+        self.assertRaises(socket.error, self.connection.request, '/test')
+        self.assertEqual(simulation.stats['resets'], 1)
+
+    def test_throttled_requests_are_retried(self):
+        simulation = self._simulate(Route(throttle_rate=0.5, retry_after=0))
+        self.connection.retry_policy = RetryPolicy(max_retries=10)
+        for i in range(10):
+            self.assertEqual(self.connection.request('/test').body, 'test')
+        self.assertTrue(simulation.stats['throttled'] > 0)
+        self.assertEqual(simulation.stats['requests'],
+                         10 + simulation.stats['throttled'])
+
+    def test_raw_transfer_bandwidth(self):
+        self._simulate(Route('PUT /upload', bandwidth=100))
+        response = self.connection.request('/upload', method='PUT', raw=True)
+        response.connection.connection.send('a' * 50)
+        response.connection.connection.send('b' * 50)
+        self.assertEqual(response.status, httplib.CREATED)
+        self.assertEqual(response.response.read(), 'x' * 100)
+        self.assertEqual(SimulatedMockHttp.uploaded, 'a' * 50 + 'b' * 50)
+        self.assertEqual(self.sleeps, [0.5, 0.5, 1])
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
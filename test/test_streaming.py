@@ -0,0 +1,168 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sys
+import unittest
+import httplib
+
+from libcloud.common import pool
+from libcloud.common.base import ConnectionKey, StreamingResponse
+
+from test import MockHttp, MockResponse  # pylint: disable-msg=E0611
+
+NAMESPACE = 'http://ec2.amazonaws.com/doc/2010-08-31/'
+
+XML_BODY = ('<DescribeImagesResponse xmlns="%s"><imagesSet>%s</imagesSet>'
+            '</DescribeImagesResponse>' % (NAMESPACE, ''.join([
+                '<item><imageId>ami-%d</imageId><blockDeviceMapping><item>'
+                '<deviceName>/dev/sda%d</deviceName></item>'
+                '</blockDeviceMapping></item>' % (i, i) for i in range(50)])))
+
+JSON_BODY = ('{"ERRORARRAY": [], "NESTED": {"DATA": [1]}, '
+             '"DATA": [%s], "ACTION": "linode.list"}' %
+             ', '.join(['{"LINODEID": %d, "LABEL": "node-%d"}' % (i, i)
+                        for i in range(50)]))
+
+class FakeDriver(object):
+    name = 'fake'
+
+class StreamingMockResponse(MockResponse):
+    def isclosed(self):
+        return self.body.tell() == len(self.body.getvalue())
+
+class StreamingMockHttp(MockHttp):
+    responseCls = StreamingMockResponse
+    closed = False
+
+    def request(self, method, url, body=None, headers=None, raw=False):
+        if self._response is not None and not self._response.isclosed():
+            raise httplib.CannotSendRequest()
+        return super(StreamingMockHttp, self).request(method, url, body,
+                                                      headers)
+
+    def close(self):
+        self.closed = True
+        self._response = None
+
+    def _xml(self, method, url, body, headers):
+        return (httplib.OK, XML_BODY, {}, httplib.responses[httplib.OK])
+
+    def _json(self, method, url, body, headers):
+        return (httplib.OK, JSON_BODY, {}, httplib.responses[httplib.OK])
+
+    def _large_json(self, method, url, body, headers):
+        body = '[%s]' % (', '.join([JSON_BODY] * 100))
+        return (httplib.OK, body, {}, httplib.responses[httplib.OK])
+
+    def _error(self, method, url, body, headers):
+        return (httplib.BAD_REQUEST, 'bad request', {},
+                httplib.responses[httplib.BAD_REQUEST])
+
+class StreamingResponseTests(unittest.TestCase):
+
+    def _response(self, body, chunk_size=7):
+        response = StreamingResponse(MockResponse(httplib.OK, body))
+        response.chunk_size = chunk_size
+        return response
+
+    def test_iter(self):
+        self.assertEqual(''.join(self._response(XML_BODY)), XML_BODY)
+
+    def test_iter_lines(self):
+        body = 'a 1\r\n\nb 22\nc %s\nd' % ('x' * 20)
+        self.assertEqual(list(self._response(body).iter_lines()),
+                         ['a 1', '', 'b 22', 'c %s' % ('x' * 20), 'd'])
+        self.assertEqual(list(self._response('a\n').iter_lines()), ['a'])
+
+    def test_iterparse(self):
+        items = []
+        for item in self._response(XML_BODY).iterparse('imagesSet/item',
+                                                        NAMESPACE):
+            items.append(item.findtext('{%s}imageId' % (NAMESPACE)))
+        self.assertEqual(items, ['ami-%d' % (i) for i in range(50)])
+
+    def test_iterparse_matches_full_path(self):
+        response = self._response(XML_BODY)
+        path = 'imagesSet/item/blockDeviceMapping/item'
+        devices = [item.findtext('{%s}deviceName' % (NAMESPACE))
+                   for item in response.iterparse(path, NAMESPACE)]
+        self.assertEqual(devices, ['/dev/sda%d' % (i) for i in range(50)])
+
+    def test_iter_json_array(self):
+        response = self._response(JSON_BODY)
+        items = list(response.iter_json_array('DATA'))
+        self.assertEqual(len(items), 50)
+        self.assertEqual(items[-1], {'LINODEID': 49, 'LABEL': 'node-49'})
+
+    def test_iter_json_array_top_level(self):
+        response = self._response('[1, 22, 333, {"a": [4]}]', chunk_size=1)
+        self.assertEqual(list(response.iter_json_array()),
+                         [1, 22, 333, {'a': [4]}])
+
+    def test_iter_json_array_empty_and_missing(self):
+        self.assertEqual(list(self._response('[ ]').iter_json_array()), [])
+        self.assertEqual(list(self._response('{"a": 1}').iter_json_array('b')),
+                         [])
+
+    def test_iter_json_array_truncated(self):
+        response = self._response('[1, {"a": ')
+        self.assertRaises(ValueError, list, response.iter_json_array())
+
+class ConnectionKeyStreamingTests(unittest.TestCase):
+
+    def setUp(self):
+        pool.close_all()
+        self.connection = ConnectionKey('foo', host='localhost')
+        self.connection.conn_classes = (StreamingMockHttp, StreamingMockHttp)
+        self.connection.driver = FakeDriver()
+
+    def tearDown(self):
+        pool.close_all()
+
+    def test_stream(self):
+        response = self.connection.request('/xml', stream=True)
+        self.assertTrue(isinstance(response, StreamingResponse))
+        self.assertEqual(response.body, None)
+
+        connection_pool = pool.get_pool(StreamingMockHttp, 'localhost', 443,
+                                        1)
+        self.assertEqual(len(connection_pool), 0)
+        self.assertEqual(len(list(response.iterparse('imagesSet/item',
+                                                     NAMESPACE))), 50)
+        self.assertEqual(len(connection_pool), 1)
+
+    def test_iter_json_array_releases_connection(self):
+        response = self.connection.request('/json', stream=True)
+        self.assertEqual(len(list(response.iter_json_array('DATA'))), 50)
+        first = self.connection.connection
+        self.assertFalse(first.closed)
+
+        response = self.connection.request('/json', stream=True)
+        self.assertTrue(self.connection.connection is first)
+        self.assertEqual(len(list(response.iter_json_array('DATA'))), 50)
+
+    def test_iter_json_array_closes_unread_connection(self):
+        # Larger than a chunk, so the body can't be read at once
+        response = self.connection.request('/large_json', stream=True)
+        items = response.iter_json_array()
+        items.next()
+        items.close()
+        self.assertTrue(self.connection.connection.closed)
+
+    def test_stream_error(self):
+        self.assertRaises(Exception, self.connection.request, '/error',
+                          stream=True)
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
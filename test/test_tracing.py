@@ -0,0 +1,107 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sys
+import unittest
+
+from cStringIO import StringIO
+
+try:
+    import json
+except:
+    import simplejson as json
+
+from libcloud.common import hooks
+from libcloud.common import tracing
+from libcloud.compute.drivers.dummy import DummyNodeDriver
+from libcloud.compute.drivers.linode import LinodeNodeDriver
+
+from test.compute.test_linode import LinodeMockHttp
+
+class PollingDriver(DummyNodeDriver):
+
+    def ex_wait_for_nodes(self):
+        hooks.sleep(0.01, 'task')
+        return self.list_nodes()
+
+class TracingTests(unittest.TestCase):
+
+    def setUp(self):
+        LinodeNodeDriver.connectionCls.conn_classes = (None, LinodeMockHttp)
+        LinodeMockHttp.use_param = 'api_action'
+        self.driver = LinodeNodeDriver('foo')
+        self.sink = tracing.MemorySink()
+        tracing.enable(self.sink)
+
+    def tearDown(self):
+        tracing.disable()
+
+    def test_request_spans(self):
+        self.driver.list_nodes()
+
+        self.assertEqual(len(self.sink.spans), 1)
+        span = self.sink.spans[0]
+        self.assertEqual((span.name, span.kind), ('list_nodes', 'call'))
+        self.assertEqual([child.kind for child in span.children],
+                         ['request', 'request'])
+
+        request = span.children[0]
+        self.assertEqual(request.attributes['operation'], 'linode.list')
+        self.assertEqual(request.attributes['status'], 200)
+        phases = [child.name for child in request.children]
+        self.assertEqual(phases, ['sign', 'wait', 'body'])
+        for child in span.iter_spans():
+            self.assertEqual(child.trace_id, span.trace_id)
+            self.assertTrue(child.start >= span.start)
+
+    def test_sleep_spans(self):
+        driver = PollingDriver(0)
+        driver.ex_wait_for_nodes()
+
+        span = self.sink.spans[0]
+        self.assertEqual([(child.name, child.kind) for child in span.children],
+                         [('task', 'sleep'), ('list_nodes', 'call')])
+        self.assertTrue(span.children[0].duration >= 0.01)
+        self.assertTrue(span.duration >= span.children[0].duration)
+
+    def test_requests_outside_calls(self):
+        self.driver.connection.request('/', params={'api_action':
+                                                    'linode.list'})
+        self.assertEqual(self.sink.spans[0].kind, 'request')
+
+    def test_sinks(self):
+        fo = StringIO()
+        tracing.enable(tracing.JSONSink(fo))
+        self.driver.list_nodes()
+        data = json.loads(fo.getvalue())
+        self.assertEqual(data['name'], 'list_nodes')
+        self.assertEqual(data['parent_id'], None)
+        self.assertEqual(data['children'][0]['parent_id'], data['span_id'])
+
+        fo = StringIO()
+        tracing.enable(tracing.TextSink(fo))
+        self.driver.list_nodes()
+        lines = fo.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith('list_nodes '))
+        self.assertTrue(lines[1].startswith('  GET / (linode.list) 200 '))
+
+    def test_disable(self):
+        tracing.disable()
+        self.driver.list_nodes()
+        self.assertEqual(self.sink.spans, [])
+        self.assertEqual(tracing.get_tracer(), None)
+        self.assertFalse(hooks.has_listeners())
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
@@ -19,6 +19,8 @@ import unittest
 import warnings
 import os.path
 
+from xml.etree import ElementTree as ET
+
 # In Python > 2.7 DeprecationWarnings are disabled by default
 warnings.simplefilter('default')
 
@@ -88,5 +90,22 @@ class TestUtils(unittest.TestCase):
         libcloud.utils.in_development_warning('test_module')
         self.assertEqual(len(WARNINGS_BUFFER), 1)
 
+    def test_fixxpath(self):
+        xpath = libcloud.utils.fixxpath('a/b', 'urn:test')
+        self.assertEqual(xpath, '{urn:test}a/{urn:test}b')
+        self.assertTrue(libcloud.utils.fixxpath('a/b', 'urn:test') is xpath)
+
+    def test_findtexts(self):
+        element = ET.XML('<item xmlns="urn:test" xmlns:o="urn:other">'
+                         '<id>1</id><state><name>running</name></state>'
+                         '<tags><tag>a</tag><tag>b</tag></tags>'
+                         '<empty/><o:extra>x</o:extra></item>')
+        texts = libcloud.utils.findtexts(element, 'urn:test')
+        for xpath in ('id', 'state/name', 'tags/tag', 'empty', 'missing'):
+            self.assertEqual(texts.get(xpath),
+                             libcloud.utils.findtext(element, xpath,
+                                                     'urn:test'))
+        self.assertEqual(texts['{urn:other}extra'], 'x')
+
 if __name__ == '__main__':
     sys.exit(unittest.main())
@@ -0,0 +1,85 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import sys
+import unittest
+import warnings
+
+from cStringIO import StringIO
+
+import libcloud
+from libcloud.common import xmlparser
+from libcloud.utils import findtexts
+
+NAMESPACE = 'http://ec2.amazonaws.com/doc/2010-08-31/'
+
+BODY = ('<DescribeImagesResponse xmlns="%s"><imagesSet><item>'
+        '<imageId>ami-1</imageId><!-- comment --><imageState>available'
+        '</imageState></item></imagesSet></DescribeImagesResponse>'
+        % (NAMESPACE))
+
+class XMLParserTests(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = xmlparser.get_backend()
+
+    def tearDown(self):
+        xmlparser.set_backend(self.backend.name)
+
+    def test_default_backend(self):
+        self.assertEqual(xmlparser.set_backend().name,
+                         xmlparser.get_available_backends()[0])
+        self.assertTrue('ElementTree' in xmlparser.get_available_backends())
+
+    def test_backends_parse_alike(self):
+        for name in xmlparser.get_available_backends():
+            xmlparser.set_backend(name)
+            root = xmlparser.fromstring(BODY)
+            self.assertEqual(root.tag,
+                             '{%s}DescribeImagesResponse' % (NAMESPACE))
+            item = root.find('{%s}imagesSet/{%s}item' % (NAMESPACE,
+                                                         NAMESPACE))
+            self.assertEqual(findtexts(item, NAMESPACE),
+                             {'imageId': 'ami-1',
+                              'imageState': 'available'}, name)
+
+            events = [(event, element.tag) for event, element in
+                      xmlparser.iterparse(StringIO(BODY),
+                                          events=('start', 'end'))]
+            self.assertEqual(len(events), 10, name)
+
+    def test_parse_errors(self):
+        for name in xmlparser.get_available_backends():
+            xmlparser.set_backend(name)
+            self.assertRaises(xmlparser.PARSE_ERRORS, xmlparser.fromstring,
+                              '<a><b></a>')
+
+    def test_unknown_backend(self):
+        self.assertRaises(ValueError, xmlparser.set_backend, 'sax')
+        self.assertEqual(xmlparser.get_backend(), self.backend)
+
+    def test_unknown_backend_setting(self):
+        os.environ['LIBCLOUD_XML_PARSER'] = 'sax'
+        try:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                libcloud._init_once()
+        finally:
+            del os.environ['LIBCLOUD_XML_PARSER']
+        self.assertEqual(len(caught), 1)
+        self.assertEqual(xmlparser.get_backend(), self.backend)
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())